@@ -0,0 +1,209 @@
+"""Headless batch digitizer.
+
+Runs preprocessing, calibration, automatic extraction and optional interpolation over a
+directory (or glob) of chart images without opening the GUI, fanning the images out
+over a process pool.
+
+Example:
+    python batch_digitize.py "scans/*.png" --calibration spec.json --interpolate spline -o out
+
+The calibration spec is a JSON file with the real coordinates of four reference points and
+either their image coordinates or ``"automatic": true``. In automatic mode the four real points
+are the bottom-left, bottom-right, top-left and top-right corners of the plot frame, which are
+taken from the best-ranked quad of detected corners (Calibration.rank_quads):
+
+    {"image_points": [[50, 350], [550, 350], [50, 50], [550, 50]],
+     "real_points": [[0, 0], [10, 0], [0, 5], [10, 5]]}
+
+An optional ``"plot_area"``, either ``[x, y, width, height]`` in image pixels or ``"automatic"``
+to take it from the detected axis frame, restricts preprocessing, corner detection and
+extraction to that region of each image. An optional ``"blob_filters"`` object sets any of
+DataExtraction.BLOB_FILTERS, e.g. ``{"min_area": 10, "max_aspect": 3}``; filters other than
+min_area need ``--backend components``.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from image_processing import IMAGE_EXTENSIONS, ImageProcessor, Roi, loader
+from calibration import Calibration
+from data_extraction import DataExtraction
+from interpolation import Interpolation
+from export import DataExporter
+
+PREPROCESSING_STEPS = {
+    'equalize': ImageProcessor.equalize_histogram,
+    'denoise': ImageProcessor.denoise_image,
+}
+INTERPOLATION_METHODS = ['linear', 'spline', 'polynomial', 'akima', 'pchip', 'quadratic', 'piecewise_linear']
+
+
+def collect_images(source):
+    """Returns the sorted image paths in a directory or matching a glob pattern."""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source)
+    return sorted(path for path in paths if path.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def collect_pages(images):
+    """Returns (path, page) jobs, one per page of each image; page counts come from the file headers."""
+    jobs = []
+    for path in images:
+        try:
+            pages = loader.page_count(path)
+        except (ValueError, OSError):
+            pages = 1  # Unreadable files still get a job, which reports the error
+        jobs.extend((path, page) for page in range(pages))
+    return jobs
+
+
+def load_calibration_spec(filepath):
+    """Loads and validates a calibration spec file."""
+    with open(filepath) as file:
+        spec = json.load(file)
+    if len(spec.get('real_points', [])) != 4:
+        raise ValueError("The calibration spec needs exactly 4 real_points.")
+    if not spec.get('automatic') and len(spec.get('image_points', [])) != 4:
+        raise ValueError("The calibration spec needs exactly 4 image_points or \"automatic\": true.")
+    plot_area = spec.get('plot_area')
+    if plot_area is not None and plot_area != 'automatic' and len(plot_area) != 4:
+        raise ValueError("The plot_area needs to be [x, y, width, height] or \"automatic\".")
+    unknown = set(spec.get('blob_filters', {})) - set(DataExtraction.BLOB_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown blob_filters: {', '.join(sorted(unknown))}.")
+    return spec
+
+
+def digitize_image(filepath, spec, output_dir, preprocessing=(), interpolation_method=None, formats=('csv',),
+                   tile_size=1024, tile_workers=1, page=0, backend='contours'):
+    """Digitizes a single image, or one page of a multi-page file, and writes its data points.
+
+    Runs inside a worker process.
+    """
+    start = time.perf_counter()
+    result = {'image': f"{filepath}[{page + 1}]" if page else filepath, 'points': 0, 'outputs': [], 'error': None}
+    try:
+        image_processor = ImageProcessor(tile_size, tile_workers)
+        image_processor.load_image(filepath, page)
+        calibration = Calibration()
+        plot_area = spec.get('plot_area')
+        if plot_area == 'automatic':
+            image = image_processor.image
+            corners, lines = calibration.cached_features(image, image_processor.image_key())
+            roi = calibration.plot_area(corners, image.shape, lines)
+            if roi is None:
+                raise ValueError("No axis frame found to take the plot area from.")
+            image_processor.set_roi(roi)
+        elif plot_area is not None:
+            image_processor.set_roi(Roi(*(int(value) for value in plot_area)))
+        for step in preprocessing:
+            PREPROCESSING_STEPS[step](image_processor)
+
+        if spec.get('automatic'):
+            image = image_processor.image
+            corners, lines = calibration.cached_features(image, image_processor.image_key(), roi=image_processor.roi)
+            quads, _ = calibration.rank_quads(corners, image.shape, lines)
+            if not len(quads):
+                raise ValueError("No calibration quad found among the detected corners.")
+            image_points = quads[0]
+        else:
+            image_points = spec['image_points']
+        calibration.set_calibration(image_points, spec['real_points'])
+
+        extraction = DataExtraction(calibration, backend)
+        extraction.set_blob_filters(**spec.get('blob_filters', {}))
+        extraction.automatic_extraction(image_processor.image, image_processor.roi)
+        points = extraction.temp_points
+        calibration.transform_points(points)
+        real_coordinates = points.real_coordinates
+
+        if interpolation_method and len(points) >= 2:
+            interpolation = Interpolation(calibration)
+            interpolation.set_method(interpolation_method)
+            interpolation.interpolate_data(points)
+            real_coordinates = interpolation.interpolated_points.real_coordinates
+
+        exporter = DataExporter()
+        stem = os.path.splitext(os.path.basename(filepath))[0]
+        if image_processor.info.pages > 1:
+            stem = f"{stem}_p{page + 1}"
+        for output_format in formats:
+            output_path = os.path.join(output_dir, f"{stem}.{output_format}")
+            if output_format == 'csv':
+                exporter.export_to_csv(real_coordinates, output_path)
+            else:
+                exporter.export_to_json(real_coordinates, output_path)
+            result['outputs'].append(output_path)
+        result['points'] = len(real_coordinates)
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_batch(images, spec, output_dir, workers=None, **options):
+    """Digitizes the images over a process pool, one job per page, and returns the per-page results."""
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(digitize_image, image, spec, output_dir, page=page, **options)
+                   for image, page in collect_pages(images)]
+        for future in as_completed(futures):
+            result = future.result()
+            status = f"error: {result['error']}" if result['error'] else f"{result['points']} points"
+            print(f"{result['image']}: {status} in {result['seconds']:.2f}s")
+            results.append(result)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Digitize a batch of chart images without the GUI.")
+    parser.add_argument('source', help="Directory of images or a glob pattern")
+    parser.add_argument('-c', '--calibration', required=True, help="Calibration spec JSON file")
+    parser.add_argument('-o', '--output', default='output', help="Directory for the exported data")
+    parser.add_argument('-f', '--format', choices=['csv', 'json', 'both'], default='csv', help="Export format")
+    parser.add_argument('-p', '--preprocess', nargs='*', default=[], choices=sorted(PREPROCESSING_STEPS),
+                        help="Preprocessing steps, applied in order")
+    parser.add_argument('-i', '--interpolate', choices=INTERPOLATION_METHODS, help="Interpolation method")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--tile-size', type=int, default=1024, help="Tile size for the tiled preprocessing filters")
+    parser.add_argument('--tile-workers', type=int, default=1,
+                        help="Threads per image for the tiled preprocessing filters (default: 1, as images already "
+                             "run in parallel)")
+    parser.add_argument('--backend', choices=DataExtraction.BACKENDS, default='contours',
+                        help="Blob extraction backend; 'components' is faster on noisy scans and applies every "
+                             "blob filter of the spec (default: contours)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    images = collect_images(args.source)
+    if not images:
+        print(f"No images found in {args.source}.")
+        return 1
+    spec = load_calibration_spec(args.calibration)
+    formats = ('csv', 'json') if args.format == 'both' else (args.format,)
+
+    start = time.perf_counter()
+    results = run_batch(images, spec, args.output, workers=args.workers, preprocessing=args.preprocess,
+                        interpolation_method=args.interpolate, formats=formats,
+                        tile_size=args.tile_size, tile_workers=args.tile_workers, backend=args.backend)
+    elapsed = time.perf_counter() - start
+
+    failures = sum(1 for result in results if result['error'])
+    image_seconds = sum(result['seconds'] for result in results)
+    print(f"Processed {len(results)} images ({failures} failed) in {elapsed:.2f}s: "
+          f"{len(results) / elapsed:.2f} images/s, {image_seconds / len(results):.2f}s per image on average.")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
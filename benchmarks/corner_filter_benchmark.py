@@ -0,0 +1,53 @@
+"""Benchmarks the corner-to-line distance filter used by corner refinement.
+
+Compares the per-corner, per-segment Python loop that corner refinement used to run against
+the batched NumPy pass in Calibration.near_lines_mask. Run from the repository root:
+
+    python -m benchmarks.corner_filter_benchmark
+"""
+import time
+
+import numpy as np
+
+from calibration import Calibration
+
+
+def loop_near_lines(calibration, corners, lines, threshold=5):
+    """The previous path: one point_line_distance call per (corner, segment) pair."""
+    mask = np.zeros(len(corners), dtype=bool)
+    for index, (x, y) in enumerate(corners):
+        for line in lines:
+            x1, y1, x2, y2 = line[0]
+            if calibration.point_line_distance(x, y, x1, y1, x2, y2) < threshold:
+                mask[index] = True
+                break
+    return mask
+
+
+def time_call(function, *args, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(segment_counts=(100, 1000, 10000), corner_count=100, image_size=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    calibration = Calibration()
+    corners = rng.uniform(0, image_size, (corner_count, 2))
+    print(f"{'segments':>10} {'loop (s)':>12} {'batched (s)':>12} {'speedup':>10}")
+    for segment_count in segment_counts:
+        lines = rng.integers(0, image_size, (segment_count, 1, 4)).astype(np.int32)
+        repeat = 1 if segment_count >= 10000 else 3
+        loop_time, loop_mask = time_call(loop_near_lines, calibration, corners, lines, repeat=repeat)
+        batched_time, batched_mask = time_call(calibration.near_lines_mask, corners, lines)
+        if not np.array_equal(loop_mask, batched_mask):
+            raise AssertionError("Batched and loop filters disagree.")
+        print(f"{segment_count:>10} {loop_time:>12.4f} {batched_time:>12.4f} {loop_time / batched_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
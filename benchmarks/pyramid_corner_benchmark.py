@@ -0,0 +1,55 @@
+"""Benchmarks coarse-to-fine pyramid corner detection against the single full-resolution pass.
+
+Draws a large, clean synthetic chart whose plot frame corners are known, runs Calibration.detect_features
+with pyramid_levels set to 0 (the single full-resolution pass) and to deeper pyramids, and reports
+the time spent on each level and the distance from each frame corner to the nearest detected
+corner. Run from the repository root:
+
+    python -m benchmarks.pyramid_corner_benchmark [width height]
+"""
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from calibration import Calibration
+
+
+def synthetic_chart(width, height):
+    """Returns a clean chart with a plot frame, ticks and a curve, and its frame corners."""
+    image = np.full((height, width, 3), 245, np.uint8)
+    left, top, right, bottom = width // 10, height // 10, width * 9 // 10, height * 9 // 10
+    for x in np.linspace(left, right, 11).astype(int):
+        cv2.line(image, (x, bottom), (x, bottom + height // 80), (0, 0, 0), 4)
+    for y in np.linspace(top, bottom, 9).astype(int):
+        cv2.line(image, (left - width // 80, y), (left, y), (0, 0, 0), 4)
+    xs = np.arange(left, right)
+    ys = (top + bottom) / 2 + (bottom - top) / 3 * np.sin((xs - left) / (right - left) * 4 * np.pi)
+    cv2.polylines(image, [np.column_stack([xs, ys]).astype(np.int32)], False, (200, 60, 0), 6, cv2.LINE_AA)
+    cv2.rectangle(image, (left, top), (right, bottom), (0, 0, 0), 6)
+    frame = np.array([[left, bottom], [right, bottom], [left, top], [right, top]], dtype=np.float64)
+    return image, frame
+
+
+def main(width=4000, height=3000):
+    image, frame = synthetic_chart(width, height)
+    print(f"{width}x{height} chart")
+    print(f"{'levels':>7} {'total (s)':>10} {'per level (s), coarse to fine':>34} {'frame corner error (px)':>26}")
+    reference = None
+    for levels in (0, 1, 2, 3):
+        calibration = Calibration()
+        calibration.corner_params['pyramid_levels'] = levels
+        timings = {}
+        start = time.perf_counter()
+        corners, _ = calibration.detect_features(image, timings=timings)
+        total = time.perf_counter() - start
+        errors = np.array([np.min(np.hypot(*(corners - corner).T)) if len(corners) else np.inf for corner in frame])
+        reference = reference or total
+        per_level = ' '.join(f"{level}:{timings[level]:.3f}" for level in sorted(timings, reverse=True))
+        print(f"{levels:>7} {total:>10.3f} {per_level:>34} {np.array2string(errors, precision=2):>26}"
+              f"  ({reference / total:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(*(int(argument) for argument in sys.argv[1:]))
@@ -0,0 +1,80 @@
+"""Benchmarks the spatial queries of PointSet against the linear scans they replace.
+
+Times click hit-testing (the old +-3 px box test over every detected point), rectangle
+selection (a mask over every point) and bulk deletion (one ``remove`` per selected point,
+each compacting the arrays) against ``nearest``, ``rows_in_rect`` and ``delete_ids``. The
+first query pays for building the grid index; that cost is shown on its own. Run from the
+repository root:
+
+    python -m benchmarks.spatial_index_benchmark
+"""
+import time
+
+import numpy as np
+
+from point import PointSet
+
+
+def time_call(function, *args, repeat=5):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def scan_hit(points, x, y, radius=3):
+    coordinates = points.image_coordinates
+    hits = np.flatnonzero((np.abs(coordinates[:, 0] - x) <= radius) & (np.abs(coordinates[:, 1] - y) <= radius))
+    return int(hits[0]) if len(hits) else -1
+
+
+def scan_rect(points, x0, y0, x1, y1):
+    coordinates = points.image_coordinates
+    return np.flatnonzero((coordinates[:, 0] >= x0) & (coordinates[:, 0] <= x1) &
+                          (coordinates[:, 1] >= y0) & (coordinates[:, 1] <= y1))
+
+
+def remove_each(points, rows):
+    for point in [points[int(row)] for row in rows]:
+        points.remove(point)
+
+
+def main(sizes=(10_000, 100_000, 300_000), extent=4000.0, selection=200.0, seed=0):
+    rng = np.random.default_rng(seed)
+    print(f"{'points':>10} {'index build':>12} {'hit scan':>10} {'hit grid':>10} {'rect scan':>10} {'rect grid':>10} "
+          f"{'selected':>9} {'remove each':>12} {'delete ids':>11}")
+    for size in sizes:
+        coordinates = rng.random((size, 2)) * extent
+        points = PointSet.from_arrays(coordinates)
+        start = time.perf_counter()
+        points.spatial_index()
+        build_time = time.perf_counter() - start
+
+        x, y = coordinates[size // 2]
+        hit_scan, _ = time_call(scan_hit, points, x + 1, y + 1)
+        hit_grid, _ = time_call(points.nearest, x + 1, y + 1, 3)
+        rect = (x, y, x + selection, y + selection)
+        rect_scan, expected = time_call(scan_rect, points, *rect)
+        rect_grid, rows = time_call(points.rows_in_rect, *rect)
+        assert np.array_equal(expected, rows)
+
+        # Both deletes start from the same set and remove the same rectangle's points
+        each = PointSet.from_arrays(coordinates)
+        start = time.perf_counter()
+        remove_each(each, rows)
+        remove_time = time.perf_counter() - start
+        start = time.perf_counter()
+        points.delete_ids(points.ids[rows])
+        delete_time = time.perf_counter() - start
+        assert np.array_equal(each.image_coordinates, points.image_coordinates)
+
+        print(f"{size:>10} {build_time:>11.4f}s {hit_scan * 1e3:>8.3f}ms {hit_grid * 1e3:>8.3f}ms "
+              f"{rect_scan * 1e3:>8.3f}ms {rect_grid * 1e3:>8.3f}ms {len(rows):>9} {remove_time:>11.4f}s "
+              f"{delete_time:>10.4f}s")
+
+
+if __name__ == '__main__':
+    main()
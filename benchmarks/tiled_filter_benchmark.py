@@ -0,0 +1,62 @@
+"""Benchmarks the tiled executor against whole-frame calls of the heavy preprocessing filters.
+
+Runs denoising and edge detection on a synthetic scan once as a single OpenCV call and once
+through TiledExecutor, checks that the stitched output matches the single call and reports the
+speedup. Edge detection is also run on a long weak edge that is only strong at one end, which
+hysteresis must follow across every tile it crosses. Run from the repository root:
+
+    python -m benchmarks.tiled_filter_benchmark [width height tile_size workers]
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from image_processing import Operation, TiledExecutor
+from image_processing.operations import OPERATIONS
+
+
+def synthetic_scan(width, height, seed=0):
+    """Returns a noisy line drawing of the given size."""
+    rng = np.random.default_rng(seed)
+    image = np.full((height, width, 3), 230, np.uint8)
+    for _ in range(width * height // 10000):
+        start = tuple(rng.integers(0, (width, height)).tolist())
+        end = tuple(rng.integers(0, (width, height)).tolist())
+        cv2.line(image, start, end, tuple(rng.integers(0, 200, 3).tolist()), 2)
+    return cv2.add(image, rng.integers(0, 30, image.shape).astype(np.uint8))
+
+
+def weak_edge(width, height, strong_rows=50):
+    """Returns a vertical step between Canny's default thresholds, above the high one in its top rows only."""
+    image = np.full((height, width), 100, np.uint8)
+    image[:, width // 2:] = 130
+    image[:strong_rows, width // 2:] = 200
+    return image
+
+
+def time_call(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main(width=2000, height=1500, tile_size=512, workers=None):
+    image = synthetic_scan(width, height)
+    executor = TiledExecutor(tile_size, workers)
+    print(f"{width}x{height} image, {tile_size} px tiles, {executor.worker_count()} workers "
+          f"(OpenCV threads: {cv2.getNumThreads()}, cores: {os.cpu_count()})")
+    print(f"{'filter':>16} {'single (s)':>12} {'tiled (s)':>12} {'speedup':>10} {'differing px':>14}")
+    cases = [('denoise', 'denoise', image), ('edge_detection', 'edge_detection', image),
+             ('weak edge', 'edge_detection', weak_edge(width, height))]
+    for label, name, source in cases:
+        single_time, single = time_call(OPERATIONS[name], source)
+        tiled_time, tiled = time_call(Operation(name).run, source, executor, {})
+        differing = np.count_nonzero(np.any((single != tiled).reshape(height, width, -1), axis=2))
+        print(f"{label:>16} {single_time:>12.3f} {tiled_time:>12.3f} {single_time / tiled_time:>9.2f}x {differing:>14}")
+
+
+if __name__ == '__main__':
+    main(*(int(argument) for argument in sys.argv[1:]))
@@ -1,59 +1,45 @@
+from collections import OrderedDict
+import threading
+import time
 import cv2
 import numpy as np
-from PyQt5.QtCore import QPointF
-from PyQt5.QtWidgets import QDialog
-from point import Point
-from ui.calibration_dialog import CalibrationDialog
-import random
-class Calibration:
+from scipy.spatial import cKDTree
+from image_processing.pipeline import image_digest
+from image_processing.roi import Roi
+from observable import Observable
+from point import Coordinates, Point, PointSet
+from progress import ProgressReporter
+class Calibration(Observable):
     """Class to manage calibration of images to real-world coordinates."""
 
-    def __init__(self, main_window):
-        self.main_window = main_window
+    CORNER_DETECTION_STAGES = ('preprocessing', 'edges', 'lines', 'intersections', 'corners', 'refinement')
+    CORNER_CACHE_SIZE = 8
+
+    def __init__(self):
+        super().__init__()
         self.calibration_points = []
         self.transformation_matrix = None
         self.inverse_transformation_matrix = None
         self.calibration_done = False
-        self.automatic_calibration_mode = False
-        self.calibration_cancelled = False
-
-    def add_calibration_point(self, point: QPointF, automatic=False):
-        """Adds a calibration point and triggers dialog for real coordinates input."""
-        if len(self.calibration_points) < 4:  # Allow selecting 4 calibration points
-            point_obj = Point(point, point_type='calibration')
-            self.calibration_points.append(point_obj)
-
-            self.main_window.image_view.highlight_point(point_obj)
-            self.main_window.image_view.update_scene()
-            dialog = CalibrationDialog(self.main_window, automatic_calibration=automatic)
-            dialog.setWindowTitle(f"Enter Real Coordinates for Point {len(self.calibration_points)}")
-            result = dialog.exec()
-            if result == QDialog.Accepted:
-                real_x, real_y = dialog.real_coordinates
-                point_obj.set_real_coordinates(QPointF(real_x, real_y))
-                self.main_window.image_view.delete_highlight(point_obj)
-                self.main_window.image_view.draw_calibration_points(self.calibration_points)
-                if len(self.calibration_points) == 4:  # Calculate, refine transformation matrix
-                    self.calculate_transformation_matrix()
-                    self.refine_calibration()
-            elif result == 1000:  # Next point
-                self.calibration_points.pop()
-                self.main_window.image_view.delete_highlight(point_obj)
-                new_point = self.select_random_point()
-                if new_point is not None and not self.calibration_cancelled:
-                    self.add_calibration_point(new_point, automatic=True)
-            else:
-                self.calibration_points.pop()
-                self.main_window.image_view.delete_highlight(point_obj)
-                if automatic:
-                    self.calibration_cancelled = True  # Mark calibration as cancelled
-                    self.clear_calibration_points()
+        self.detected_corners = np.empty((0, 2), dtype=np.float64)
+        self.corner_params = {
+            'canny_low': 50, 'canny_high': 150,
+            'hough_threshold': 50, 'min_line_length': 50, 'max_line_gap': 10,
+            'max_corners': 100, 'quality_level': 0.01, 'min_distance': 10,
+            # Pyramid levels searched coarse to fine; None picks enough for the longer side to
+            # fit in coarse_size, so small images keep the single full-resolution pass
+            'pyramid_levels': None, 'coarse_size': 1600,
+        }
+        # (image key, corner params) -> detected corners, least recently used first. Detection
+        # runs on worker threads, so the cache is guarded by a lock.
+        self.corner_cache = OrderedDict()
+        self.corner_cache_lock = threading.Lock()
 
     def clear_calibration_points(self):
         """Clears all calibration points."""
-        self.main_window.image_view.clear_calibration_points()
         self.calibration_points = []
         self.calibration_done = False
+        self.notify('calibration_cleared')
 
     def calculate_transformation_matrix(self):
         """Calculates the transformation matrix based on calibration points."""
@@ -71,7 +57,28 @@ class Calibration:
         self.inverse_transformation_matrix = np.linalg.inv(self.transformation_matrix)
 
         self.calibration_done = True
-        self.main_window.interpolationAction.setEnabled(True)
+        self.notify('calibration_changed')
+
+    def set_calibration(self, image_points, real_points):
+        """Calibrates directly from four image/real coordinate pairs given as (4, 2) arrays."""
+        image_points = np.asarray(image_points, dtype=np.float64).reshape(-1, 2)
+        real_points = np.asarray(real_points, dtype=np.float64).reshape(-1, 2)
+        if len(image_points) != 4 or len(real_points) != 4:
+            raise ValueError("Exactly 4 calibration points are required to calculate the transformation matrix.")
+
+        self.calibration_points = [Point(Coordinates(*image_xy), Coordinates(*real_xy), point_type='calibration')
+                                   for image_xy, real_xy in zip(image_points, real_points)]
+        self.calculate_transformation_matrix()
+
+    @staticmethod
+    def frame_corners(corners):
+        """Picks the bottom-left, bottom-right, top-left and top-right corners from an (N, 2) array."""
+        corners = np.asarray(corners, dtype=np.float64).reshape(-1, 2)
+        if len(corners) < 4:
+            raise ValueError("At least 4 corners are required to locate the plot frame.")
+        diagonal = corners[:, 0] + corners[:, 1]
+        anti_diagonal = corners[:, 0] - corners[:, 1]
+        return corners[[np.argmin(anti_diagonal), np.argmax(diagonal), np.argmin(diagonal), np.argmax(anti_diagonal)]]
 
     def refine_calibration(self, iterations=500, termination_eps=1e-6):
         """Refines the calibration matrix using iterative optimization."""
@@ -89,41 +96,58 @@ class Calibration:
         self.inverse_transformation_matrix = np.linalg.inv(self.transformation_matrix)
 
         self.calibration_done = True
-        self.main_window.interpolationAction.setEnabled(True)
+        self.notify('calibration_changed')
 
     def transform_points(self, data_points):
         """Transforms data points using the calibration matrix."""
         if not self.calibration_done:
             raise RuntimeError("Calibration is not complete. Please complete calibration before transforming points.")
 
-        transformed_points = []
-        for point in data_points:
-            img_coords = np.array([[point.get_image_coordinates().x(), point.get_image_coordinates().y(), 1.0]],
-                                  dtype=np.float32)
-            real_coords = cv2.perspectiveTransform(np.array([img_coords]), self.transformation_matrix)
-            point.set_real_coordinates(QPointF(real_coords[0][0][0], real_coords[0][0][1]))
-            transformed_points.append(point)
+        if isinstance(data_points, PointSet):
+            data_points.real_coordinates[:] = self.image_to_real_array(data_points.image_coordinates)
+            data_points.mark_changed(moved=False)
+            return data_points
 
-        return transformed_points
+        image_coords = np.array(
+            [[p.get_image_coordinates().x(), p.get_image_coordinates().y()] for p in data_points],
+            dtype=np.float64).reshape(-1, 2)
+        real_coords = self.image_to_real_array(image_coords)
+        for point, (real_x, real_y) in zip(data_points, real_coords):
+            point.set_real_coordinates(Coordinates(real_x, real_y))
 
-    def inverse_transform_point(self, x, y):
-        """Transforms real-world coordinates back to image coordinates using the inverse calibration matrix."""
+        return list(data_points)
+
+    def image_to_real_array(self, image_points):
+        """Transforms an (N, 2) array of image coordinates to real-world coordinates."""
+        if not self.calibration_done:
+            raise RuntimeError("Calibration is not complete. Please complete calibration before transforming points.")
+
+        return self.apply_homography(self.transformation_matrix, image_points)
+
+    def real_to_image_array(self, real_points):
+        """Transforms an (N, 2) array of real-world coordinates back to image coordinates."""
         if self.inverse_transformation_matrix is None:
             raise ValueError("Inverse transformation matrix has not been calculated yet.")
 
-        real_coords = np.array([[x, y]], dtype=np.float32).reshape(-1, 1, 2)
-        img_coords = cv2.perspectiveTransform(real_coords, self.inverse_transformation_matrix)
+        return self.apply_homography(self.inverse_transformation_matrix, real_points)
 
-        return QPointF(img_coords[0][0][0], img_coords[0][0][1])
+    @staticmethod
+    def apply_homography(matrix, points):
+        """Applies a 3x3 homography to an (N, 2) array of points with one matrix multiply and one divide."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        matrix = np.asarray(matrix, dtype=np.float64)
+        projected = points @ matrix[:, :2].T + matrix[:, 2]
+        return projected[:, :2] / projected[:, 2:3]
+
+    def inverse_transform_point(self, x, y):
+        """Transforms real-world coordinates back to image coordinates using the inverse calibration matrix."""
+        img_x, img_y = self.real_to_image_array([[x, y]])[0]
+        return Coordinates(img_x, img_y)
 
     def image_to_real_coordinates(self, point):
         """Transforms image coordinates to real-world coordinates using the calibration matrix."""
-        if not self.calibration_done:
-            raise RuntimeError("Calibration is not complete. Please complete calibration before transforming points.")
-
-        img_coords = np.array([[point.x(), point.y()]], dtype=np.float32).reshape(-1, 1, 2)
-        real_coords = cv2.perspectiveTransform(img_coords, self.transformation_matrix)
-        return QPointF(real_coords[0][0][0], real_coords[0][0][1])
+        real_x, real_y = self.image_to_real_array([[point.x(), point.y()]])[0]
+        return Coordinates(real_x, real_y)
 
     def refine_calibration(self, iterations=500, termination_eps=1e-6):
         """Refines the calibration matrix using iterative optimization."""
@@ -142,10 +166,130 @@ class Calibration:
         self.inverse_transformation_matrix = np.linalg.inv(self.transformation_matrix)
 
         self.calibration_done = True
-        self.main_window.interpolationAction.setEnabled(True)
-    def advanced_corner_detection(self, image):
-        """Improves corner detection using optimized algorithms."""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        self.notify('calibration_changed')
+    def advanced_corner_detection(self, image, image_key=None, roi=None):
+        """Improves corner detection using optimized algorithms. Returns an (N, 2) array of corners."""
+        return self.set_detected_corners(self.cached_corners(image, image_key, roi=roi))
+
+    def corner_cache_key(self, image, image_key=None, roi=None):
+        """Returns the cache key of an image's corners; ``image_key`` saves hashing the pixels."""
+        roi = None if roi is None else tuple(roi.clipped(image.shape))
+        return image_key or image_digest(image), roi, tuple(sorted(self.corner_params.items()))
+
+    def cached_corners(self, image, image_key=None, progress=None, cancel=None, roi=None):
+        """Returns the corners of an image, running the detection pipeline only on a cache miss."""
+        return self.cached_features(image, image_key, progress, cancel, roi)[0]
+
+    def cached_features(self, image, image_key=None, progress=None, cancel=None, roi=None):
+        """Returns the (corners, lines) of an image, running the detection pipeline only on a cache miss.
+
+        ``image_key`` identifies the image content, e.g. ImageProcessor.image_key(); without it the
+        pixels are hashed. The ``roi`` is part of the key. Like detect_corners, this is safe off
+        the GUI thread.
+        """
+        key = self.corner_cache_key(image, image_key, roi)
+        with self.corner_cache_lock:
+            features = self.corner_cache.get(key)
+            if features is not None:
+                self.corner_cache.move_to_end(key)
+                return features
+        features = self.detect_features(image, progress, cancel, roi=roi)
+        for array in features:
+            array.flags.writeable = False  # Shared by every lookup
+        with self.corner_cache_lock:
+            self.corner_cache[key] = features
+            while len(self.corner_cache) > self.CORNER_CACHE_SIZE:
+                self.corner_cache.popitem(last=False)
+        return features
+
+    def clear_corner_cache(self):
+        """Forgets every cached corner detection result."""
+        with self.corner_cache_lock:
+            self.corner_cache.clear()
+
+    def set_detected_corners(self, corners):
+        """Stores the detected corners and notifies observers."""
+        self.detected_corners = np.asarray(corners, dtype=np.float64).reshape(-1, 2)
+        self.notify('corners_detected', corners=self.detected_corners)
+        return self.detected_corners
+
+    def detect_corners(self, image, progress=None, cancel=None, roi=None):
+        """Runs the corner detection pipeline without touching any state, so it is safe off the GUI thread."""
+        return self.detect_features(image, progress, cancel, roi=roi)[0]
+
+    def detect_features(self, image, progress=None, cancel=None, timings=None, roi=None):
+        """Runs the corner detection pipeline and returns the (N, 2) corners and the (M, 4) Hough line segments.
+
+        Large images are searched coarse to fine over ``pyramid_levels()`` levels: lines and
+        candidate corners are found on the smallest level, and the corners are then refined in
+        small windows on every finer level down to full resolution. ``timings``, if given, is
+        filled with the seconds spent on each pyramid level (0 is full resolution). With a ``roi``
+        only a view of that region is searched; the results are in full-image coordinates.
+        """
+        if roi is not None:
+            corners, lines = self.detect_features(roi.crop(image), progress, cancel, timings)
+            return roi.to_image(corners), lines + np.tile(roi.offset, 2)
+        timings = {} if timings is None else timings
+        reporter = ProgressReporter(self.CORNER_DETECTION_STAGES, progress, cancel)
+        reporter.stage('preprocessing')
+        start = time.perf_counter()
+        levels = self.pyramid_levels(image.shape)
+        pyramid = [image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)]
+        for _ in range(levels):
+            pyramid.append(cv2.pyrDown(pyramid[-1]))
+
+        corners, lines, intersections, threshold = self.detect_level(pyramid[-1], 2 ** levels, reporter)
+        if len(corners):
+            # Refining corner locations using cornerSubPix for sub-pixel accuracy
+            reporter.stage('refinement')
+            criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.01)
+            corners = cv2.cornerSubPix(threshold, np.float32(corners).reshape(-1, 1, 2), (5, 5), (-1, -1), criteria)
+
+            corners = corners.reshape(-1, 2).astype(np.float64)
+        timings[levels] = time.perf_counter() - start
+
+        # Each finer level only looks at small windows around the corners found so far
+        for level in range(levels - 1, -1, -1):
+            start = time.perf_counter()
+            reporter.check_cancelled()
+            corners = self.refine_in_windows(pyramid[level], (corners + 0.5) * 2 - 0.5)
+            timings[level] = time.perf_counter() - start
+
+        # Only keep corners that are close to detected lines and intersections. The 5 px threshold is
+        # in full-resolution pixels, so the check runs on the refined corners against the rescaled
+        # lines. Lines found on a coarse level are only located to within the detection blur radius
+        # plus half a pixel there (2.5 coarse pixels), which is added to the threshold.
+        threshold = 5
+        if levels:
+            lines, intersections = (lines + 0.5) * 2 ** levels - 0.5, (intersections + 0.5) * 2 ** levels - 0.5
+            threshold += 2.5 * 2 ** levels
+        if len(corners):
+            keep = (self.near_lines_mask(corners, lines, threshold) |
+                    self.near_intersections_mask(corners, intersections, threshold))
+            corners = corners[keep]
+        return corners, lines
+
+    def pyramid_levels(self, shape):
+        """Returns how many times an image is halved before detection.
+
+        That is ``corner_params['pyramid_levels']`` or, when it is None, just enough halvings for
+        the longer side to fit in ``corner_params['coarse_size']``.
+        """
+        levels = self.corner_params['pyramid_levels']
+        if levels is None:
+            levels, side = 0, max(shape[:2])
+            while side > self.corner_params['coarse_size']:
+                levels, side = levels + 1, side / 2
+        return levels
+
+    def detect_level(self, gray, scale, reporter):
+        """Finds the line segments and candidate corners on one pyramid level.
+
+        The length and distance parameters are divided by ``scale``, the level's downscale
+        factor. Returns the unrefined corners, the segments, their intersections and the
+        thresholded image, in level coordinates.
+        """
+        params = self.corner_params
         gray = cv2.GaussianBlur(gray, (5, 5), 0)
 
         # Enhanced contrast and adaptive thresholding
@@ -154,112 +298,255 @@ class Calibration:
         gray = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
 
         # Edge detection
-        edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+        reporter.stage('edges')
+        edges = cv2.Canny(gray, params['canny_low'], params['canny_high'], apertureSize=3)
 
         # Line detection using Hough Transform
-        lines = cv2.HoughLinesP(edges, 1, np.pi / 180, 50, minLineLength=50, maxLineGap=10)
-
-        line_img = np.zeros_like(image)
-        if lines is not None:
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                cv2.line(line_img, (x1, y1), (x2, y2), (255, 0, 0), 2)
+        reporter.stage('lines')
+        lines = cv2.HoughLinesP(edges, 1, np.pi / 180, max(10, round(params['hough_threshold'] / scale)),
+                                minLineLength=max(10, params['min_line_length'] / scale),
+                                maxLineGap=max(2, params['max_line_gap'] / scale))
+        lines = np.empty((0, 4)) if lines is None else lines.reshape(-1, 4).astype(np.float64)
 
         # Find line intersections
+        reporter.stage('intersections')
         intersections = self.find_intersections(lines)
 
         # Corner detection using Shi-Tomasi algorithm on the edge image
-        corners = cv2.goodFeaturesToTrack(edges, maxCorners=100, qualityLevel=0.01, minDistance=10)
-        corners = np.float32(corners)
-
-        # Refining corner locations using cornerSubPix for sub-pixel accuracy
+        reporter.stage('corners')
+        corners = cv2.goodFeaturesToTrack(edges, maxCorners=params['max_corners'], qualityLevel=params['quality_level'],
+                                          minDistance=max(3, params['min_distance'] / scale))
+        corners = np.empty((0, 2)) if corners is None else corners.reshape(-1, 2).astype(np.float64)
+        return corners, lines, intersections, gray
+
+    @staticmethod
+    def refine_in_windows(gray, corners, window=5):
+        """Refines corners with cornerSubPix on small windows of a grayscale level around each one.
+
+        Each window is blurred and thresholded like the detection input, with a margin wide enough
+        for those filters, so only the pixels near the corners are ever processed.
+        """
+        height, width = gray.shape
+        margin = 2 * window + 8  # cornerSubPix search window, adaptive threshold block and blur
         criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.01)
-        corners = cv2.cornerSubPix(gray, corners, (5, 5), (-1, -1), criteria)
-
-        # Only keep corners that are close to detected lines and intersections
-        refined_corners = []
-        for corner in corners:
-            x, y = corner.ravel()
-            if self.is_near_line(x, y, lines) or self.is_near_intersection(x, y, intersections):
-                refined_corners.append(QPointF(x, y))
-                self.main_window.image_view.draw_detected_corners(refined_corners)
-
-        self.main_window.image_view.set_image(image)
-        self.main_window.update_image()
+        refined = np.empty_like(corners)
+        for index, (x, y) in enumerate(corners):
+            x, y = min(max(x, 0.0), width - 1.0), min(max(y, 0.0), height - 1.0)
+            left, top = max(int(x) - margin, 0), max(int(y) - margin, 0)
+            patch = gray[top:min(int(y) + margin + 1, height), left:min(int(x) + margin + 1, width)]
+            patch = cv2.adaptiveThreshold(cv2.GaussianBlur(patch, (5, 5), 0), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                          cv2.THRESH_BINARY, 11, 2)
+            point = np.float32([[[x - left, y - top]]])
+            refined[index] = cv2.cornerSubPix(patch, point, (window, window), (-1, -1), criteria)[0, 0] + (left, top)
+        return refined
+
+    def plot_area(self, corners, image_shape, lines=None, margin=10, min_fraction=0.5):
+        """Returns the Roi of the axis frame, grown by ``margin`` pixels, or None when there is no frame.
+
+        The frame is the bounding box of the horizontal and vertical line segments at least
+        ``min_fraction`` as long as the longest of their orientation, which leaves out the short
+        strokes of titles and tick labels; without such segments the best-ranked quad is used.
+        The margin keeps the frame lines and ticks inside the region, so calibration can still
+        find the frame corners there.
+        """
+        lines = np.empty((0, 4)) if lines is None else np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+        dx, dy = np.abs(lines[:, 2] - lines[:, 0]), np.abs(lines[:, 3] - lines[:, 1])
+        frame = []
+        for length, across in ((dx, dy), (dy, dx)):
+            aligned = across <= 0.05 * length
+            if aligned.any():
+                frame.append(lines[aligned & (length >= min_fraction * length[aligned].max())])
+        if len(frame) == 2:
+            return Roi.around(np.concatenate(frame).reshape(-1, 2), image_shape, margin)
+        quads, _ = self.rank_quads(corners, image_shape, lines)
+        return Roi.around(quads[0], image_shape, margin) if len(quads) else None
+
+    def rank_quads(self, corners, image_shape=None, lines=None, per_quadrant=5):
+        """Scores candidate calibration quads and returns them best first, with their scores.
+
+        The corners are split into quadrants around their median and the ``per_quadrant`` corners
+        farthest out in each are kept, so every candidate has one bottom-left, bottom-right,
+        top-left and top-right corner, in the order the real points are given. All candidates are
+        scored in one vectorized pass; see ``score_quads``. The ranking has no random element, so
+        the same corners always give the same quads. Returns a (K, 4, 2) array and (K,) scores.
+        """
+        corners = np.asarray(corners, dtype=np.float64).reshape(-1, 2)
+        if len(corners) < 4:
+            return np.empty((0, 4, 2)), np.empty(0)
+        center = np.median(corners, axis=0)
+        left, bottom = corners[:, 0] < center[0], corners[:, 1] >= center[1]  # Image y grows downwards
+        slots = []
+        for quadrant, direction in (((left & bottom), (-1, 1)), ((~left & bottom), (1, 1)),
+                                    ((left & ~bottom), (-1, -1)), ((~left & ~bottom), (1, -1))):
+            candidates = corners[quadrant]
+            reach = (candidates - center) @ np.array(direction, dtype=np.float64)
+            slots.append(candidates[np.argsort(-reach, kind='stable')[:per_quadrant]])
+        if any(len(slot) == 0 for slot in slots):
+            return np.empty((0, 4, 2)), np.empty(0)
+        grid = np.meshgrid(*(np.arange(len(slot)) for slot in slots), indexing='ij')
+        quads = np.stack([slot[index.ravel()] for slot, index in zip(slots, grid)], axis=1)
+
+        scores = self.score_quads(quads, image_shape, lines)
+        order = np.argsort(-scores, kind='stable')
+        order = order[np.isfinite(scores[order])]
+        return quads[order], scores[order]
+
+    def score_quads(self, quads, image_shape=None, lines=None, samples_per_side=8, line_threshold=5):
+        """Scores (K, 4, 2) bottom-left, bottom-right, top-left, top-right quads; higher is better.
+
+        Equal-weight average of four terms in [0, 1]: the conditioning of the homography that
+        maps the quad onto a unit square; the area the quad covers; how closely its sides follow
+        the horizontal and vertical axes; and the share of points along its sides that lie on a
+        detected line. Non-convex or degenerate quads score -inf.
+        """
+        quads = np.asarray(quads, dtype=np.float64)
+        if image_shape is not None:
+            size = np.array([image_shape[1], image_shape[0]], dtype=np.float64)
+        else:
+            size = np.ptp(quads.reshape(-1, 2), axis=0).clip(min=1.0)
+        normalized = quads / size
+
+        # Conditioning of the DLT system mapping the normalized quad onto the unit square
+        unit = np.array([[0, 0], [1, 0], [0, 1], [1, 1]], dtype=np.float64)
+        x, y = normalized[..., 0], normalized[..., 1]
+        u, v = unit[:, 0], unit[:, 1]
+        zeros, ones = np.zeros_like(x), np.ones_like(x)
+        system = np.concatenate([
+            np.stack([x, y, ones, zeros, zeros, zeros, -u * x, -u * y], axis=-1),
+            np.stack([zeros, zeros, zeros, x, y, ones, -v * x, -v * y], axis=-1),
+        ], axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            condition = np.linalg.cond(system)
+        conditioning = np.clip(1.0 - np.log10(np.nan_to_num(condition, nan=np.inf)) / 8.0, 0.0, 1.0)
+
+        # Sides walked around the quad: bottom, right, top, left
+        ring = quads[:, [0, 1, 3, 2]]
+        following = np.roll(ring, -1, axis=1)
+        edges = following - ring
+        next_edges = np.roll(edges, -1, axis=1)
+        cross = edges[..., 0] * next_edges[..., 1] - edges[..., 1] * next_edges[..., 0]
+        convex = np.all(cross > 0, axis=1) | np.all(cross < 0, axis=1)
+        area = 0.5 * np.abs(np.sum(ring[..., 0] * following[..., 1] - following[..., 0] * ring[..., 1], axis=1))
+        spread = np.clip(area / np.prod(size), 0.0, 1.0)
+
+        # Bottom and top sides should run along x, right and left sides along y
+        lengths = np.hypot(edges[..., 0], edges[..., 1]).clip(min=1e-9)
+        along_axis = np.abs(np.stack([edges[:, 0, 0], edges[:, 1, 1], edges[:, 2, 0], edges[:, 3, 1]], axis=1))
+        alignment = np.mean((along_axis / lengths) ** 2, axis=1)
+
+        if lines is not None and len(lines):
+            steps = np.linspace(0.0, 1.0, samples_per_side)
+            points = ring[:, :, None, :] + steps[None, None, :, None] * edges[:, :, None, :]
+            distances = self.segment_distances(points.reshape(-1, 2), lines)
+            support = np.mean((distances < line_threshold).reshape(len(quads), -1), axis=1)
+        else:
+            support = np.ones(len(quads))
 
-        return refined_corners
+        scores = (conditioning + spread + alignment + support) / 4.0
+        scores[~convex | (area <= 0)] = -np.inf
+        return scores
 
     def is_near_line(self, x, y, lines, threshold=5):
         """Checks if a point (x, y) is near any of the detected lines."""
-        if lines is not None:
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                distance = self.point_line_distance(x, y, x1, y1, x2, y2)
-                if distance < threshold:
-                    return True
-        return False
+        return bool(self.near_lines_mask([[x, y]], lines, threshold)[0])
+
+    def near_lines_mask(self, points, lines, threshold=5, max_pairs_per_chunk=4_000_000):
+        """Returns a boolean mask of the (N, 2) points lying within threshold of any line segment."""
+        return self.segment_distances(points, lines, max_pairs_per_chunk) < threshold
+
+    def segment_distances(self, points, lines, max_pairs_per_chunk=4_000_000):
+        """Returns the distance from each of the (N, 2) points to its nearest line segment.
+
+        All points are evaluated against a block of segments in one NumPy pass; blocks are sized
+        so at most ``max_pairs_per_chunk`` point/segment pairs are held in memory at once.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        nearest = np.full(len(points), np.inf)
+        if lines is None or len(lines) == 0 or len(points) == 0:
+            return nearest
+
+        segments = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+        chunk_size = max(1, max_pairs_per_chunk // len(points))
+        px = points[:, 0:1]
+        py = points[:, 1:2]
+        for chunk_start in range(0, len(segments), chunk_size):
+            x1, y1, x2, y2 = segments[chunk_start:chunk_start + chunk_size].T
+            dx = x2 - x1
+            dy = y2 - y1
+            length_squared = dx * dx + dy * dy
+            # Degenerate segments have zero length; projecting onto their start point is exact
+            with np.errstate(divide='ignore', invalid='ignore'):
+                u = ((px - x1) * dx + (py - y1) * dy) / length_squared
+            u = np.clip(np.nan_to_num(u), 0.0, 1.0)
+            distances = np.hypot(px - (x1 + u * dx), py - (y1 + u * dy))
+            np.minimum(nearest, distances.min(axis=1), out=nearest)
+        return nearest
 
     def point_line_distance(self, px, py, x1, y1, x2, y2):
         """Calculates the minimum distance from a point to a line segment."""
+        x1, y1, x2, y2 = float(x1), float(y1), float(x2), float(y2)
         line_mag = np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
         if line_mag < 1e-10:
             return np.sqrt((px - x1) ** 2 + (py - y1) ** 2)
-        u = ((px - x1) * (x2 - x1) + (py - y1)) / line_mag ** 2
-        if u < 0 or u > 1:
-            ix = min(max(x1, x2), max(px, px))
-            iy = min(max(y1, y2), max(py, py))
-        else:
-            ix = x1 + u * (x2 - x1)
-            iy = y1 + u * (y2 - y1)
+        u = ((px - x1) * (x2 - x1) + (py - y1) * (y2 - y1)) / line_mag ** 2
+        u = min(max(u, 0.0), 1.0)
+        ix = x1 + u * (x2 - x1)
+        iy = y1 + u * (y2 - y1)
         return np.sqrt((px - ix) ** 2 + (py - iy) ** 2)
 
-    def find_intersections(self, lines):
-        """Finds intersections between lines."""
+    def find_intersections(self, lines, max_pairs_per_chunk=4_000_000):
+        """Finds the points where line segments actually cross. Returns an (M, 2) array.
+
+        Segment pairs are tested with NumPy broadcasting, a block of rows at a time, so the
+        memory used stays bounded by ``max_pairs_per_chunk`` however many lines Hough returns.
+        """
+        if lines is None or len(lines) < 2:
+            return np.empty((0, 2), dtype=np.float64)
+
+        segments = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+        starts = segments[:, :2]
+        directions = segments[:, 2:] - starts
+        count = len(segments)
+        chunk_size = max(1, max_pairs_per_chunk // count)
+
         intersections = []
-        if lines is not None:
-            for i in range(len(lines)):
-                for j in range(i + 1, len(lines)):
-                    x1, y1, x2, y2 = lines[i][0]
-                    x3, y3, x4, y4 = lines[j][0]
-                    denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
-                    if denom != 0:
-                        intersect_x = ((x1 * y2 - y1 * x2) * (x3 - x4) - (x1 - x2) * (x3 * y4 - y3 * x4)) / denom
-                        intersect_y = ((x1 * y2 - y1 * x2) * (y3 - y4) - (y1 - y2) * (x3 * y4 - y3 * x4)) / denom
-                        intersections.append((intersect_x, intersect_y))
-        return intersections
+        for chunk_start in range(0, count - 1, chunk_size):
+            rows = slice(chunk_start, min(chunk_start + chunk_size, count - 1))
+            # Row i is only paired with columns j > i, so each pair is tested once
+            p = starts[rows, None, :]
+            r = directions[rows, None, :]
+            q = starts[None, chunk_start + 1:, :]
+            s = directions[None, chunk_start + 1:, :]
+
+            denom = r[..., 0] * s[..., 1] - r[..., 1] * s[..., 0]
+            offset = q - p
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = (offset[..., 0] * s[..., 1] - offset[..., 1] * s[..., 0]) / denom
+                u = (offset[..., 0] * r[..., 1] - offset[..., 1] * r[..., 0]) / denom
+
+            row_index = np.arange(rows.start, rows.stop)[:, None]
+            column_index = np.arange(chunk_start + 1, count)[None, :]
+            mask = (denom != 0) & (column_index > row_index) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+            row_hits, column_hits = np.nonzero(mask)
+            intersections.append(p[row_hits, 0] + t[row_hits, column_hits, None] * r[row_hits, 0])
+
+        return np.concatenate(intersections).reshape(-1, 2)
+
+    def near_intersections_mask(self, points, intersections, threshold=5):
+        """Returns a boolean mask of the (N, 2) points lying within threshold of any intersection.
+
+        The intersections are indexed with a KD-tree, so each point costs a logarithmic lookup
+        instead of a scan over every intersection.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        intersections = np.asarray(intersections, dtype=np.float64).reshape(-1, 2)
+        if len(points) == 0 or len(intersections) == 0:
+            return np.zeros(len(points), dtype=bool)
+        distances, _ = cKDTree(intersections).query(points, distance_upper_bound=threshold)
+        return distances < threshold
 
     def is_near_intersection(self, x, y, intersections, threshold=5):
         """Checks if a point (x, y) is near any of the detected intersections."""
-        for intersect_x, intersect_y in intersections:
-            distance = np.sqrt((x - intersect_x) ** 2 + (y - intersect_y) ** 2)
-            if distance < threshold:
-                return True
-        return False
-
-    def automatic_calibration(self, image):
-        """Automatically calibrates the image using enhanced corner detection."""
-        print("Starting automatic calibration...")
-        self.automatic_calibration_mode = True
-        self.calibration_cancelled = False  # Reset cancellation flag
-        corners = self.advanced_corner_detection(image)
-
-        if len(corners) >= 10:
-            corners = random.sample(corners, 4)  # Take 4 random corners
-            self.calibration_points = []
-            for corner in corners:
-                if not self.calibration_cancelled:
-                    self.add_calibration_point(corner, automatic=True)
-            if len(self.calibration_points) == 4:
-                self.calculate_transformation_matrix()
-            else:
-                self.clear_calibration_points()
-        else:
-            print("Not enough corners detected for calibration.")
-        self.automatic_calibration_mode = False
-
-    def select_random_point(self):
-        """Selects a random point from detected corners for automatic calibration."""
-        corners = self.advanced_corner_detection(self.main_window.image_processor.image)
-        if corners:
-            return random.choice(corners)
-        return None
+        intersections = np.asarray(intersections, dtype=np.float64).reshape(-1, 2)
+        distances = np.hypot(intersections[:, 0] - x, intersections[:, 1] - y)
+        return bool(np.any(distances < threshold))
@@ -1,3 +1,4 @@
+from .curve_tracing import CurveTracer
 from .extraction import DataExtraction
 
-__all__ = ['DataExtraction']
\ No newline at end of file
+__all__ = ['CurveTracer', 'DataExtraction']
\ No newline at end of file
@@ -0,0 +1,246 @@
+import cv2
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Neighbour offsets (dy, dx) in the usual P2..P9 order of thinning algorithms:
+# N, NE, E, SE, S, SW, W, NW. Bit k of a neighbourhood code is set when neighbour k is on.
+NEIGHBOURS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+
+def thinning_tables():
+    """Returns the two 256-entry tables telling which neighbourhood codes each Guo-Hall pass removes.
+
+    Guo-Hall rather than Zhang-Suen, which erases two pixel thick runs entirely.
+    """
+    p2, p3, p4, p5, p6, p7, p8, p9 = ((np.arange(256)[:, None] >> np.arange(8)) & 1).astype(bool).T
+    crossings = ((~p2 & (p3 | p4)).astype(int) + (~p4 & (p5 | p6)) + (~p6 & (p7 | p8)) + (~p8 & (p9 | p2)))
+    n1 = (p9 | p2).astype(int) + (p3 | p4) + (p5 | p6) + (p7 | p8)
+    n2 = (p2 | p3).astype(int) + (p4 | p5) + (p6 | p7) + (p8 | p9)
+    neighbours = np.minimum(n1, n2)
+    removable = (crossings == 1) & (neighbours >= 2) & (neighbours <= 3)
+    first = removable & ~((p6 | p7 | ~p9) & p8)
+    second = removable & ~((p2 | p3 | ~p5) & p4)
+    return first, second
+
+
+THINNING_TABLES = thinning_tables()
+
+
+class CurveTracer:
+    """Traces the curves drawn in one color into ordered polylines.
+
+    A tolerance mask around the series color is built in CIE Lab, thinned to a one pixel wide
+    skeleton and split into segments at endpoints and junctions. Segment ends that continue each
+    other across a crossing or a gap of up to ``max_gap`` pixels, turning by at most ``max_turn``
+    degrees, are linked back into one polyline. Only the skeleton pixels are visited in Python,
+    so the cost is driven by the length of the curves rather than the size of the image.
+    """
+
+    def __init__(self, tolerance=20.0, max_gap=12, max_turn=60.0, min_length=15, spacing=4.0):
+        self.tolerance = tolerance  # Maximum CIE76 color difference from the series color
+        self.max_gap = max_gap  # Pixels bridged between segment ends
+        self.max_turn = max_turn  # Degrees
+        self.min_length = min_length  # Polylines shorter than this, in pixels, are dropped as noise
+        self.spacing = spacing  # Arc length, in pixels, between the points kept on each polyline
+
+    @staticmethod
+    def seed_color(image, x, y, radius=1):
+        """Returns the BGR series color around a clicked seed pixel, as the median of its neighbourhood."""
+        height, width = image.shape[:2]
+        x, y = int(round(x)), int(round(y))
+        patch = image[max(y - radius, 0):min(y + radius + 1, height), max(x - radius, 0):min(x + radius + 1, width)]
+        if patch.ndim == 2:
+            patch = patch[..., None].repeat(3, axis=2)
+        return tuple(int(value) for value in np.median(patch.reshape(-1, 3), axis=0))
+
+    def color_mask(self, image, color):
+        """Returns the binary mask of the pixels within ``tolerance`` of a BGR color in Lab space."""
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        # 8-bit Lab stores L * 255 / 100 and a, b offset by 128, so only L needs rescaling
+        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+        target = cv2.cvtColor(np.uint8([[color]]), cv2.COLOR_BGR2LAB)[0, 0].astype(np.float64)
+        # A cheap box test around the target leaves only a few candidates for the exact distance
+        reach = np.array([self.tolerance * 255 / 100, self.tolerance, self.tolerance])
+        mask = cv2.inRange(lab, np.clip(target - reach, 0, 255), np.clip(target + reach, 0, 255))
+        candidates = cv2.findNonZero(mask)
+        if candidates is None:
+            return mask
+        xs, ys = candidates.reshape(-1, 2).T
+        difference = lab[ys, xs].astype(np.float64) - target
+        difference[:, 0] *= 100 / 255
+        outside = np.einsum('ij,ij->i', difference, difference) > self.tolerance ** 2
+        mask[ys[outside], xs[outside]] = 0
+        return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((3, 3), np.uint8))
+
+    @staticmethod
+    def skeletonize(mask):
+        """Thins a binary mask to a one pixel wide skeleton, returned as a padded boolean image.
+
+        Guo-Hall thinning, evaluated only at the foreground pixels with a lookup table of
+        neighbourhood codes.
+        """
+        padded = np.pad(mask.astype(bool), 1)
+        ys, xs = np.nonzero(padded)
+        changed = True
+        while changed:
+            changed = False
+            for table in THINNING_TABLES:
+                code = np.zeros(len(ys), dtype=np.uint8)
+                for bit, (dy, dx) in enumerate(NEIGHBOURS):
+                    code |= padded[ys + dy, xs + dx].astype(np.uint8) << bit
+                remove = table[code]
+                if remove.any():
+                    padded[ys[remove], xs[remove]] = False
+                    ys, xs = ys[~remove], xs[~remove]
+                    changed = True
+        return padded
+
+    @staticmethod
+    def adjacency(skeleton):
+        """Returns the skeleton pixel coordinates and their (N, 8) neighbour indices, -1 for none.
+
+        Diagonal neighbours that are also reachable through a shared 4-neighbour are left out
+        (mixed adjacency), so staircase corners do not look like junctions.
+        """
+        ys, xs = np.nonzero(skeleton)
+        index = np.full(skeleton.shape, -1, dtype=np.int64)
+        index[ys, xs] = np.arange(len(ys))
+        neighbours = np.empty((len(ys), 8), dtype=np.int64)
+        for column, (dy, dx) in enumerate(NEIGHBOURS):
+            neighbour = index[ys + dy, xs + dx]
+            if dy and dx:
+                neighbour[skeleton[ys + dy, xs] | skeleton[ys, xs + dx]] = -1
+            neighbours[:, column] = neighbour
+        # Back to unpadded (x, y) image coordinates
+        return np.column_stack([xs - 1, ys - 1]).astype(np.float64), neighbours
+
+    @staticmethod
+    def segments(neighbours):
+        """Walks the skeleton graph into index paths between endpoints and junctions, plus closed loops."""
+        adjacent = [row[row >= 0].tolist() for row in neighbours]
+        degree = (neighbours >= 0).sum(axis=1)
+        visited = np.zeros(len(adjacent), dtype=bool)
+        paths = []
+
+        def walk(start, step):
+            path, previous, current = [start, step], start, step
+            while degree[current] == 2 and not visited[current]:
+                visited[current] = True
+                following = adjacent[current][0] if adjacent[current][0] != previous else adjacent[current][1]
+                previous, current = current, following
+                path.append(current)
+            return path
+
+        for node in np.flatnonzero(degree != 2).tolist():
+            visited[node] = True
+            for step in adjacent[node]:
+                if degree[step] == 2 and not visited[step]:
+                    paths.append(walk(node, step))
+                elif degree[step] != 2 and node < step:
+                    paths.append([node, step])
+            if degree[node] == 0:
+                paths.append([node])
+        for start in np.flatnonzero(~visited).tolist():  # Closed loops have no endpoint to start from
+            if not visited[start]:
+                visited[start] = True
+                paths.append(walk(start, adjacent[start][0]))
+        return paths
+
+    def link(self, polylines):
+        """Joins polylines whose ends continue each other across junctions and gaps; returns the joined list."""
+        if len(polylines) < 2:
+            return polylines
+        ends, directions = [], []
+        for polyline in polylines:
+            for end in (polyline[::-1], polyline):  # Start, then finish; each walked outwards
+                # Measured a few pixels back, where a junction no longer bends the skeleton
+                last = len(end) - 1
+                direction = end[max(last - 3, 0)] - end[max(last - 15, 0)]
+                if not direction.any():
+                    direction = end[-1] - end[0]
+                ends.append(end[-1])
+                directions.append(direction / (np.hypot(*direction) or 1.0))
+        ends, directions = np.array(ends), np.array(directions)
+        min_cos = np.cos(np.radians(self.max_turn))
+
+        candidates = []
+        for a, b in cKDTree(ends).query_pairs(self.max_gap):
+            if a // 2 == b // 2:
+                continue
+            turn = -directions[a] @ directions[b]
+            gap = ends[b] - ends[a]
+            length = np.hypot(*gap)
+            if turn < min_cos or (length > 2 and (directions[a] @ gap < min_cos * length or
+                                                  -directions[b] @ gap < min_cos * length)):
+                continue
+            candidates.append((length / self.max_gap + 1 - turn, a, b))
+
+        # Greedy matching of the best continuations; each end is used once and no cycle is closed
+        parent = list(range(len(polylines)))
+
+        def root(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        partner = {}
+        for _, a, b in sorted(candidates):
+            if a in partner or b in partner or root(a // 2) == root(b // 2):
+                continue
+            partner[a], partner[b] = b, a
+            parent[root(a // 2)] = root(b // 2)
+
+        joined, used = [], set()
+        for start in range(len(polylines)):
+            if start in used or (2 * start in partner and 2 * start + 1 in partner):
+                continue
+            # Begin at a polyline with a free end and follow the links from its other end
+            segment, entry = start, (2 * start if 2 * start not in partner else 2 * start + 1)
+            parts = []
+            while True:
+                used.add(segment)
+                polyline = polylines[segment]
+                parts.append(polyline if entry == 2 * segment else polyline[::-1])
+                exit_end = entry ^ 1
+                if exit_end not in partner:
+                    break
+                entry = partner[exit_end]
+                segment = entry // 2
+            joined.append(np.concatenate(parts))
+        return joined
+
+    def resample(self, polyline):
+        """Keeps the polyline points spaced about ``spacing`` pixels apart along its length, plus both ends."""
+        steps = np.hypot(*np.diff(polyline, axis=0).T)
+        distance = np.concatenate([[0.0], np.cumsum(steps)])
+        keep = np.unique(np.append(np.searchsorted(distance, np.arange(0.0, distance[-1], self.spacing)),
+                                   len(polyline) - 1))
+        return polyline[keep]
+
+    def trace(self, image, color):
+        """Returns the curves of the given BGR color as a list of ordered (N, 2) polylines of image coordinates."""
+        return self.polylines(self.skeletonize(self.color_mask(image, color)))
+
+    def polylines(self, skeleton):
+        """Turns a padded skeleton into ordered polylines, left to right, each running left to right."""
+        coordinates, neighbours = self.adjacency(skeleton)
+        junction = (neighbours >= 0).sum(axis=1) > 2
+        # Short segments touching a junction are the bridges and spurs thinning leaves where thick
+        # lines cross; dropping them leaves the arms of the crossing to be paired by direction
+        paths = [path for path in self.segments(neighbours)
+                 if len(path) >= self.max_gap or not (junction[path[0]] or junction[path[-1]])]
+        polylines = self.link([coordinates[path] for path in paths])
+        result = []
+        for polyline in polylines:
+            keep = np.ones(len(polyline), dtype=bool)
+            keep[1:] = np.any(np.diff(polyline, axis=0) != 0, axis=1)  # Junction pixels shared by joined parts
+            polyline = polyline[keep]
+            if len(polyline) < 2 or np.hypot(*np.diff(polyline, axis=0).T).sum() < self.min_length:
+                continue
+            if polyline[-1, 0] < polyline[0, 0]:
+                polyline = polyline[::-1]
+            result.append(self.resample(polyline))
+        result.sort(key=lambda polyline: polyline[0, 0])
+        return result
@@ -1,66 +1,177 @@
 import cv2
-from PyQt5.QtCore import QPointF
-from point import Point
+from observable import Observable
+from point import PointSet
+from progress import ProgressReporter
+from .curve_tracing import CurveTracer
 import numpy as np
 
-class DataExtraction:
-    def __init__(self, calibration, main_window):
-        self.data_points = []
-        self.temp_points = []  # points automatic extraction
+class DataExtraction(Observable):
+    DETECTION_STAGES = ('preprocessing', 'thresholding', 'blobs', 'centroids')
+    TRACING_STAGES = ('mask', 'skeleton', 'tracing')
+    BACKENDS = ('contours', 'components')
+    BLOB_FILTERS = ('min_area', 'max_area', 'min_size', 'max_size', 'max_aspect')
+
+    def __init__(self, calibration, backend='contours'):
+        super().__init__()
+        self.data_points = PointSet()
+        self.temp_points = PointSet()  # points automatic extraction
         self.calibration = calibration
-        self.main_window = main_window
-
-    def add_data_point(self, scene_pos):
-        """Add a data point at the given scene position."""
-        real_coordinates = self.calibration.image_to_real_coordinates(scene_pos)
-        point = Point(scene_pos, real_coordinates, point_type='data')
-        self.data_points.append(point)
-        self.main_window.image_view.draw_data_points(self.data_points)
-        if self.main_window.interpolation_mode:
-            self.main_window.interpolation.interpolate_data(self.data_points)
-        self.main_window.show_data_points()
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown extraction backend '{backend}'.")
+        self.backend = backend
+        # Blob filters; None disables a filter. Areas are those of the polygon through a blob's
+        # boundary pixel centres, as cv2.contourArea measures them, in both backends. Sizes are
+        # bounding box sides in pixels and the aspect is the ratio of the longer side to the
+        # shorter one. The default 'contours' backend only applies min_area.
+        self.min_area = 10  # Minimum area to filter out noise
+        self.max_area = None
+        self.min_size = None
+        self.max_size = None
+        self.max_aspect = None
+        self.curve_tracer = CurveTracer()
+
+    def set_blob_filters(self, backend=None, **filters):
+        """Sets the extraction backend and any of the ``BLOB_FILTERS``, e.g. from a settings dialog or a batch spec."""
+        if backend is not None:
+            if backend not in self.BACKENDS:
+                raise ValueError(f"Unknown extraction backend '{backend}'.")
+            self.backend = backend
+        for name, value in filters.items():
+            if name not in self.BLOB_FILTERS:
+                raise ValueError(f"Unknown blob filter '{name}'.")
+            if name == 'min_area' and value is None:
+                raise ValueError("The minimum area cannot be disabled.")
+            setattr(self, name, value)
+
+    def add_data_point(self, image_xy):
+        """Add a data point at the given (x, y) image position."""
+        image_xy = (float(image_xy[0]), float(image_xy[1]))
+        real_xy = self.calibration.image_to_real_array([image_xy])[0]
+        self.data_points.append(image_xy, real_xy, point_type='data')
+        self.notify('data_points_changed', points=self.data_points)
 
     def delete_data_point(self, index):
         """Deletes a data point at the given index."""
         if 0 <= index < len(self.data_points):
-            del self.data_points[index]
-            self.main_window.image_view.draw_data_points(self.data_points)
-            if self.main_window.interpolation_mode:
-                self.main_window.interpolation.interpolate_data(self.data_points)
-            self.main_window.show_data_points()
+            self.data_points.delete(index)
+            self.notify('data_points_changed', points=self.data_points)
+
+    def delete_data_points(self, point_ids):
+        """Deletes the data points with the given ids in one compaction and returns how many were deleted."""
+        deleted = self.data_points.delete_ids(point_ids)
+        if deleted:
+            self.notify('data_points_changed', points=self.data_points)
+        return deleted
 
     def get_data_points(self):
-        """Returns the list of data points."""
+        """Returns the data point set."""
         return self.data_points
 
     def clear_temp_points(self):
         """Clears the temporary points found during automatic extraction."""
-        self.temp_points = []
+        self.temp_points.clear()
     def clear_data_points(self):
         """Clears the data points"""
-        self.data_points = []
-    def automatic_extraction(self, image):
-        """Automatically detects data points from the image for visualization."""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        self.data_points.clear()
+    def add_traced_curves(self, polylines):
+        """Adds the points of traced polylines to the data points in one bulk insert and returns their ids."""
+        image_points = np.concatenate(polylines) if len(polylines) else np.empty((0, 2))
+        real_points = self.calibration.image_to_real_array(image_points)
+        ids = self.data_points.extend(image_points, real_points, point_type='data')
+        self.notify('data_points_changed', points=self.data_points)
+        return ids
+
+    def trace_curves(self, image, color, progress=None, cancel=None, roi=None):
+        """Runs the curve tracing pipeline for a BGR series color without touching any state, so it is safe off the GUI thread.
+
+        With a ``roi`` only that region is traced; the polylines are still in full-image coordinates.
+        """
+        reporter = ProgressReporter(self.TRACING_STAGES, progress, cancel)
+        reporter.stage('mask')
+        mask = self.curve_tracer.color_mask(image if roi is None else roi.crop(image), color)
+        reporter.stage('skeleton')
+        skeleton = self.curve_tracer.skeletonize(mask)
+        reporter.stage('tracing')
+        polylines = self.curve_tracer.polylines(skeleton)
+        return polylines if roi is None else [roi.to_image(polyline) for polyline in polylines]
+
+    def automatic_extraction(self, image, roi=None):
+        """Automatically detects data points from the image, or from its ``roi``, for visualization."""
+        self.set_detected_points(self.detect_points(image, roi=roi))
+        return image
+
+    def set_detected_points(self, points):
+        """Replaces the temporary points with an (N, 2) array of detected points and notifies observers."""
+        self.clear_temp_points()
+        self.temp_points.extend(points, point_type='detected')
+        self.notify('detected_points_changed', points=self.temp_points)
+
+    def detect_points(self, image, progress=None, cancel=None, roi=None):
+        """Runs the point detection pipeline without touching any state, so it is safe off the GUI thread.
+
+        With a ``roi`` the pipeline runs on a view of that region only, so titles, legends and
+        margins around the plot area neither cost time nor produce points; the points are
+        returned in full-image coordinates either way.
+        """
+        if roi is not None:
+            return roi.to_image(self.detect_points(roi.crop(image), progress, cancel))
+        reporter = ProgressReporter(self.DETECTION_STAGES, progress, cancel)
+        reporter.stage('preprocessing')
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         blurred = cv2.GaussianBlur(gray, (5, 5), 0)
 
         # Enhanced contrast and adaptive thresholding
+        reporter.stage('thresholding')
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
         gray = clahe.apply(blurred)
         threshold = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
 
-        # Finding contours
+        if self.backend == 'contours':
+            return self.contour_centroids(threshold, reporter)
+        return self.component_centroids(threshold, reporter)
+
+    def component_centroids(self, threshold, reporter):
+        """Returns the (N, 2) centroids of the connected components that pass the blob filters.
+
+        One connectedComponentsWithStats call measures every blob, so the filters are NumPy masks
+        over its stats rather than a Python loop over blobs. The areas match the contour areas of
+        the 'contours' backend: by Pick's theorem, the polygon through the boundary pixel centres
+        covers the pixel count less half the boundary pixels, less one. Blobs with holes are the
+        exception, as their contour encloses the holes.
+        """
+        reporter.stage('blobs')
+        count, labels, stats, centroids = cv2.connectedComponentsWithStats(threshold, connectivity=8)
+        stats, centroids = stats[1:], centroids[1:]  # Label 0 is the background
+
+        reporter.stage('centroids')
+        interior = cv2.erode(threshold, cv2.getStructuringElement(cv2.MORPH_CROSS, (3, 3)),
+                             borderType=cv2.BORDER_CONSTANT, borderValue=0)
+        boundary = np.bincount(labels[(threshold > 0) & (interior == 0)], minlength=count)[1:]
+        area = stats[:, cv2.CC_STAT_AREA] - boundary / 2 - 1
+        width, height = stats[:, cv2.CC_STAT_WIDTH], stats[:, cv2.CC_STAT_HEIGHT]
+        mask = area > self.min_area
+        if self.max_area is not None:
+            mask &= area <= self.max_area
+        if self.min_size is not None:
+            mask &= np.minimum(width, height) >= self.min_size
+        if self.max_size is not None:
+            mask &= np.maximum(width, height) <= self.max_size
+        if self.max_aspect is not None:
+            mask &= np.maximum(width, height) <= self.max_aspect * np.minimum(width, height)
+        return centroids[mask].astype(np.float64).reshape(-1, 2)
+
+    def contour_centroids(self, threshold, reporter):
+        """Returns the (N, 2) centroids of the outer contours above the minimum area, one contour at a time."""
+        reporter.stage('blobs')
         contours, _ = cv2.findContours(threshold, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
-        self.clear_temp_points()
+        reporter.stage('centroids')
+        centroids = []
         for contour in contours:
-            if cv2.contourArea(contour) > 10:  # Minimum area to filter out noise
+            if cv2.contourArea(contour) > self.min_area:
                 M = cv2.moments(contour)
                 if M["m00"] != 0:
                     cX = int(M["m10"] / M["m00"])
                     cY = int(M["m01"] / M["m00"])
-                    point = QPointF(cX, cY)
-                    self.temp_points.append(point)
-
-        self.main_window.image_view.draw_detected_points(self.temp_points)
-        return image
\ No newline at end of file
+                    centroids.append((cX, cY))
+        return np.array(centroids, dtype=np.float64).reshape(-1, 2)
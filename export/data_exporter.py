@@ -1,19 +1,20 @@
 import csv
 import json
-from PyQt5.QtCore import QPointF
+import numpy as np
 
 class DataExporter:
     """Class to handle exporting data points to CSV and JSON formats."""
 
     def export_to_csv(self, data_points, filepath):
-        """Exports data points to a CSV file."""
+        """Exports an (N, 2) array of data points to a CSV file."""
+        data_points = np.asarray(data_points, dtype=np.float64).reshape(-1, 2)
         try:
             with open(filepath, mode='w', newline='') as file:
                 writer = csv.writer(file)
                 writer.writerow(["X", "Y"])
-                for point in data_points:
-                    if isinstance(point, QPointF):
-                        writer.writerow([point.x(), point.y()])
+                for x, y in data_points.tolist():
+                    if x == x and y == y:  # NaN marks unknown coordinates
+                        writer.writerow([x, y])
                     else:
                         writer.writerow([None, None])
             print(f"Data successfully exported to {filepath}")
@@ -21,8 +22,10 @@ class DataExporter:
             print(f"Failed to export data to CSV: {e}")
 
     def export_to_json(self, data_points, filepath):
-        """Exports data points to a JSON file."""
-        data = [{"x": point.x(), "y": point.y()} for point in data_points if isinstance(point, QPointF)]
+        """Exports an (N, 2) array of data points to a JSON file."""
+        data_points = np.asarray(data_points, dtype=np.float64).reshape(-1, 2)
+        valid_points = data_points[~np.isnan(data_points).any(axis=1)]
+        data = [{"x": x, "y": y} for x, y in valid_points.tolist()]
         try:
             with open(filepath, 'w') as file:
                 json.dump(data, file, indent=4)
@@ -1,7 +1,19 @@
+from . import loader
 from .image_processor import ImageProcessor
+from .loader import IMAGE_EXTENSIONS, ImageInfo
+from .pipeline import ImagePipeline, Operation
+from .roi import Roi
+from .tiling import TiledExecutor
 
 
 __all__ = [
-    'ImageProcessor'
+    'ImageProcessor',
+    'ImageInfo',
+    'IMAGE_EXTENSIONS',
+    'loader',
+    'ImagePipeline',
+    'Operation',
+    'Roi',
+    'TiledExecutor'
 
-]
\ No newline at end of file
+]
@@ -1,19 +1,72 @@
 import cv2
+from . import loader
+from .pipeline import ImagePipeline
+from .tiling import TiledExecutor
 
 class ImageProcessor:
-    """Class to handle various image processing tasks."""
+    """Class to handle various image processing tasks.
 
-    def __init__(self):
+    The loaded image is kept as the source of an ImagePipeline; every processing method adds a
+    step to the pipeline and ``image`` holds its current output, so steps can be changed,
+    toggled or undone without reloading the file.
+
+    In preview mode the operations run on a proxy of the source downscaled to the viewport and
+    the result is kept in ``preview``, while ``image`` stays the last full-resolution output.
+    Committing replays the recorded steps at full resolution with ``render``.
+
+    Files go through ``loader``: .npy files and uncompressed TIFFs are memory-mapped, so the
+    full-resolution pixels are only read from disk once an operation or the display needs them,
+    and the preview proxy is decoded at reduced resolution straight from the file.
+
+    ``roi`` is the plot area, a Roi or None for the whole image. The filters only process that
+    region, and the detection and extraction pipelines are handed it to run on a view of it.
+    """
+
+    def __init__(self, tile_size=1024, tile_workers=None):
         self.image = None
         self.filepath = None
+        self.page = 0
+        self.info = None  # loader.ImageInfo of the loaded file, read from its header
+        self.roi = None
+        # Heavy local filters run over tile_size tiles on tile_workers threads (None: all cores)
+        self.executor = TiledExecutor(tile_size, tile_workers)
+        self.pipeline = ImagePipeline(executor=self.executor)
+        self.preview_pipeline = None
+        self.preview = None
+        self.preview_scale = (1.0, 1.0)  # (x, y) proxy size relative to the full-resolution image
 
-    def load_image(self, filepath):
-        """Loads an image from the specified file path."""
-        self.filepath = filepath
-        if filepath.lower().endswith(('.jpg', '.jpeg', '.png')):
-            self.image = cv2.imread(filepath)
-        else:
-            raise ValueError("Unsupported file format.")
+    def load_image(self, filepath, page=0):
+        """Loads an image, or one page of a multi-page file, from the specified file path."""
+        info = loader.probe(filepath)
+        if not 0 <= page < info.pages:
+            raise ValueError(f"Page {page} is out of range; the file has {info.pages} page(s).")
+        self.stop_preview()
+        self.filepath, self.page, self.info = filepath, page, info
+        self.roi = self.pipeline.roi = None
+        self.pipeline.clear()
+        self.pipeline.set_source(loader.read(filepath, page), loader.source_key(filepath, page))
+        self.image = self.pipeline.run()
+
+    def image_key(self):
+        """Returns a key identifying the content of ``image`` without hashing its pixels, or None.
+
+        It changes whenever the source or any enabled step changes, so results computed from the
+        image, such as detected corners, can be cached against it.
+        """
+        return self.pipeline.output_key() if self.image is not None else None
+
+    def set_roi(self, roi):
+        """Restricts the filters to a region of interest, or lifts the restriction with None, and reruns them."""
+        if roi is not None and self.image is not None:
+            roi = roi.clipped(self.image.shape)
+            if roi.is_empty():
+                raise ValueError("The region of interest does not overlap the image.")
+        self.roi = self.pipeline.roi = roi
+        if self.image is not None:
+            self.image = self.pipeline.run()
+        if self.previewing:
+            self.preview_pipeline.roi = roi
+            self.preview = self.preview_pipeline.run()
 
     def display_image(self):
         """Displays the currently loaded image."""
@@ -24,50 +77,118 @@ class ImageProcessor:
         else:
             print("Load an image first.")
 
-    def equalize_histogram(self):
-        """Applies histogram equalization to the image."""
+    @property
+    def previewing(self):
+        return self.preview_pipeline is not None
+
+    def active_pipeline(self):
+        """Returns the pipeline that interactive operations go to."""
+        return self.preview_pipeline if self.previewing else self.pipeline
+
+    def refresh(self):
+        """Reruns the active pipeline, reusing its cached step outputs."""
+        if self.previewing:
+            self.preview = self.preview_pipeline.run()
+        else:
+            self.image = self.pipeline.run()
+
+    def apply_operation(self, name, **params):
+        """Adds a processing step to the pipeline and updates the image."""
         if self.image is not None:
-            if len(self.image.shape) == 3:  # Color image
-                img_yuv = cv2.cvtColor(self.image, cv2.COLOR_BGR2YUV)
-                img_yuv[:, :, 0] = cv2.equalizeHist(img_yuv[:, :, 0])
-                self.image = cv2.cvtColor(img_yuv, cv2.COLOR_YUV2BGR)
-            elif len(self.image.shape) == 2:  # Grayscale image
-                self.image = cv2.equalizeHist(self.image)
-            else:
-                print("Unsupported image format for histogram equalization.")
+            self.active_pipeline().add(name, **params)
+            self.refresh()
         else:
             print("Load an image first.")
 
+    def set_operation_params(self, index, **params):
+        """Changes the parameters of a step; only that step and the ones after it are recomputed."""
+        self.active_pipeline().set_params(index, **params)
+        self.refresh()
+
+    def set_operation_enabled(self, index, enabled):
+        """Turns a step on or off."""
+        self.active_pipeline().set_enabled(index, enabled)
+        self.refresh()
+
+    def remove_operation(self, index):
+        """Removes a step from the pipeline."""
+        self.active_pipeline().remove(index)
+        self.refresh()
+
+    def undo_operation(self):
+        """Removes the most recent step, if there is one."""
+        if self.active_pipeline().operations:
+            self.remove_operation(len(self.active_pipeline().operations) - 1)
+
+    def start_preview(self, max_width, max_height):
+        """Switches to preview mode on a proxy of the source that fits in the given size."""
+        if self.image is None:
+            print("Load an image first.")
+            return
+        source = self.pipeline.source
+        height, width = source.shape[:2]
+        factor = min(1.0, max_width / width, max_height / height)
+        proxy_size = (max(1, round(width * factor)), max(1, round(height * factor)))
+        reduction = max((f for f in loader.REDUCED_FLAGS if f * factor <= 1.0), default=None)
+        if reduction and self.filepath is not None:
+            source = loader.read_reduced(self.filepath, reduction, self.page)  # Skips the full-size pixels
+        proxy = cv2.resize(source, proxy_size, interpolation=cv2.INTER_AREA)
+        scale = (proxy_size[0] / width, proxy_size[1] / height)  # Exact per axis after rounding
+        self.preview_pipeline = ImagePipeline(self.pipeline.max_cache_bytes // 4, self.executor, scale)
+        self.preview_pipeline.set_source(proxy)
+        self.preview_pipeline.roi = self.roi
+        self.preview_pipeline.operations = [operation.copy() for operation in self.pipeline.operations]
+        self.preview_scale = scale
+        self.preview = self.preview_pipeline.run()
+
+    def stop_preview(self):
+        """Leaves preview mode, discarding the steps that were not committed."""
+        self.preview_pipeline = None
+        self.preview = None
+        self.preview_scale = (1.0, 1.0)
+
+    def preview_operations(self):
+        """Returns a snapshot of the previewed steps, to be replayed at full resolution."""
+        return [operation.copy() for operation in self.preview_pipeline.operations]
+
+    def render(self, operations, progress=None, cancel=None):
+        """Runs steps on the full-resolution source without changing any state, so it is safe off the GUI thread."""
+        return self.pipeline.run(operations, progress, cancel)
+
+    def commit_preview(self, operations, image):
+        """Adopts replayed steps and their full-resolution output, and leaves preview mode."""
+        self.pipeline.operations = operations
+        self.image = image
+        self.stop_preview()
+
+    def clear(self):
+        """Forgets the loaded image, its steps and their cached outputs."""
+        self.image = None
+        self.filepath = None
+        self.page = 0
+        self.info = None
+        self.roi = None
+        self.stop_preview()
+        self.pipeline = ImagePipeline(self.pipeline.max_cache_bytes, self.executor)
+
+    def equalize_histogram(self):
+        """Applies histogram equalization to the image."""
+        self.apply_operation('equalize_histogram')
+
     def edge_detection(self):
         """Applies edge detection to the image."""
-        if self.image is not None:
-            self.image = cv2.Canny(self.image, 100, 200)
-        else:
-            print("Load an image first.")
+        self.apply_operation('edge_detection')
 
     def denoise_image(self):
         """Applies denoising to the image."""
-        if self.image is not None:
-            if len(self.image.shape) == 3:
-                self.image = cv2.fastNlMeansDenoisingColored(self.image, None, 10, 10, 7, 21)
-            elif len(self.image.shape) == 2:
-                self.image = cv2.fastNlMeansDenoising(self.image, None, 10, 7, 21)
-            else:
-                print("Unsupported image format for denoising.")
-        else:
-            print("Load an image first.")
+        self.apply_operation('denoise')
 
     def correct_perspective(self, pts1, pts2):
         """Corrects the perspective of the image given four points."""
         if self.image is not None:
-            matrix = cv2.getPerspectiveTransform(pts1, pts2)
-            width, height = self.image.shape[1], self.image.shape[0]
-            self.image = cv2.warpPerspective(self.image, matrix, (width, height))
+            self.apply_operation('correct_perspective', pts1=pts1, pts2=pts2)
 
     def rotate_image(self, angle):
         """Rotates the image by the specified angle."""
         if self.image is not None:
-            (h, w) = self.image.shape[:2]
-            center = (w // 2, h // 2)
-            matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
-            self.image = cv2.warpAffine(self.image, matrix, (w, h))
+            self.apply_operation('rotate', angle=angle)
@@ -0,0 +1,226 @@
+from collections import namedtuple
+import os
+import struct
+import cv2
+import numpy as np
+
+# Formats OpenCV decodes, plus NumPy arrays saved with np.save
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp', '.pbm', '.pgm', '.ppm', '.npy')
+MULTI_PAGE_EXTENSIONS = ('.tif', '.tiff')
+
+# Decoded files keep their own layout, grayscale or BGR, like the memory-mapped and multi-page
+# reads; with a fixed colour flag a grayscale file would decode differently depending on the path
+READ_FLAGS = cv2.IMREAD_ANYCOLOR
+
+# IMREAD_REDUCED_* flags by downscale factor; these decode straight to the reduced size (JPEG
+# skips the high-frequency DCT work), so the full-resolution buffer is never allocated. They are
+# combined with READ_FLAGS so a proxy has the same channels as the full-resolution image.
+REDUCED_FLAGS = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2 | READ_FLAGS,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4 | READ_FLAGS,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8 | READ_FLAGS,
+}
+
+ImageInfo = namedtuple('ImageInfo', ['width', 'height', 'channels', 'pages'])
+
+# TIFF field types: (struct code, size in bytes)
+TIFF_TYPES = {1: ('B', 1), 3: ('H', 2), 4: ('I', 4), 16: ('Q', 8)}
+PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+
+
+def is_supported(path):
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def check_supported(path):
+    if not is_supported(path):
+        raise ValueError("Unsupported file format.")
+
+
+def probe(path):
+    """Returns the ImageInfo of an image file from its header, without decoding the pixels."""
+    check_supported(path)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        shape, dtype = npy_header(path)
+        check_npy_image(path, shape, dtype)
+        return ImageInfo(shape[1], shape[0], shape[2] if len(shape) > 2 else 1, 1)
+    with open(path, 'rb') as file:
+        head = file.read(32)
+        if head.startswith(b'\x89PNG\r\n\x1a\n'):
+            width, height, _, color_type = struct.unpack('>IIBB', head[16:26])
+            return ImageInfo(width, height, PNG_CHANNELS.get(color_type, 3), 1)
+        if head.startswith(b'BM'):
+            width, height, _, bits = struct.unpack('<iiHH', head[18:30])
+            return ImageInfo(width, abs(height), max(1, bits // 8), 1)
+        if head[:4] in (b'II*\x00', b'MM\x00*'):
+            ifds = tiff_ifds(file)
+            first = ifds[0]
+            return ImageInfo(first[256][0], first[257][0], first.get(277, [1])[0], len(ifds))
+        if head.startswith(b'\xff\xd8'):
+            info = jpeg_info(file)
+            if info is not None:
+                return info
+    # Formats without a parser here fall back to a decode
+    image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError(f"Could not read image '{path}'.")
+    return ImageInfo(image.shape[1], image.shape[0], image.shape[2] if image.ndim > 2 else 1, 1)
+
+
+def npy_header(path):
+    """Returns the shape and dtype stored in a .npy header."""
+    with open(path, 'rb') as file:
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(file)
+        else:
+            shape, _, dtype = np.lib.format.read_array_header_2_0(file)
+    return shape, dtype
+
+
+def jpeg_info(file):
+    """Scans the JPEG markers for the start-of-frame segment and returns its ImageInfo."""
+    file.seek(2)
+    while True:
+        marker = file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:  # Standalone markers
+            continue
+        length = struct.unpack('>H', file.read(2))[0]
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            _, height, width, channels = struct.unpack('>BHHB', file.read(6))
+            return ImageInfo(width, height, channels, 1)
+        file.seek(length - 2, os.SEEK_CUR)
+
+
+def tiff_ifds(file):
+    """Returns the tags of every image file directory (page) of a TIFF as {tag: [values]} dicts."""
+    file.seek(0)
+    order = '<' if file.read(2) == b'II' else '>'
+    _, offset = struct.unpack(order + 'HI', file.read(6))
+    ifds = []
+    while offset and len(ifds) < 65536:
+        file.seek(offset)
+        count = struct.unpack(order + 'H', file.read(2))[0]
+        entries = file.read(12 * count)
+        offset = struct.unpack(order + 'I', file.read(4))[0]
+        tags = {}
+        for index in range(count):
+            tag, field_type, n, value = struct.unpack(order + 'HHI4s', entries[12 * index:12 * index + 12])
+            if field_type not in TIFF_TYPES:
+                continue
+            code, size = TIFF_TYPES[field_type]
+            if n * size > 4:  # The values live elsewhere and the field holds their offset
+                position = file.tell()
+                file.seek(struct.unpack(order + 'I', value)[0])
+                value = file.read(n * size)
+                file.seek(position)
+            tags[tag] = list(struct.unpack(f'{order}{n}{code}', value[:n * size]))
+        ifds.append(tags)
+    return ifds
+
+
+def tiff_memmap(path, page=0):
+    """Returns a read-only BGR or grayscale memory map of an uncompressed 8-bit TIFF page, or None.
+
+    Only pages stored as one contiguous run of chunky strips can be mapped; compressed, tiled,
+    planar and other layouts return None and are decoded instead.
+    """
+    with open(path, 'rb') as file:
+        order = '<' if file.read(2) == b'II' else '>'
+        ifds = tiff_ifds(file)
+    if page >= len(ifds):
+        return None
+    tags = ifds[page]
+    width, height = tags[256][0], tags[257][0]
+    channels = tags.get(277, [1])[0]
+    offsets, counts = tags.get(273), tags.get(279)
+    if (tags.get(259, [1])[0] != 1 or set(tags.get(258, [8])) != {8} or channels not in (1, 3)
+            or tags.get(284, [1])[0] != 1 or tags.get(262, [1])[0] not in (1, 2) or 322 in tags
+            or not offsets or not counts):
+        return None
+    contiguous = all(start + count == following for start, count, following in zip(offsets, counts, offsets[1:]))
+    if not contiguous or sum(counts) != width * height * channels:
+        return None
+    shape = (height, width, channels) if channels == 3 else (height, width)
+    image = np.memmap(path, dtype=np.uint8, mode='r', offset=offsets[0], shape=shape, order='C')
+    return image[..., ::-1] if channels == 3 else image  # RGB on disk, BGR as a view
+
+
+def check_npy_image(path, shape, dtype):
+    """Raises ValueError unless an array saved with np.save is an 8- or 16-bit grayscale or BGR image."""
+    if dtype not in (np.uint8, np.uint16):
+        raise ValueError(f"Unsupported pixel type {dtype} in '{path}'; expected uint8 or uint16.")
+    if not (len(shape) == 2 or len(shape) == 3 and shape[2] == 3):
+        raise ValueError(f"Unsupported image shape {shape} in '{path}'; expected (H, W) or (H, W, 3).")
+
+
+def npy_image(path):
+    """Returns a read-only memory map of an image saved with np.save."""
+    image = np.load(path, mmap_mode='r')
+    check_npy_image(path, image.shape, image.dtype)
+    return image
+
+
+def to_uint8(image):
+    """Returns an 8-bit image as is and scales a 16-bit one down to 8 bits, as OpenCV's decoders do."""
+    if image.dtype == np.uint16:
+        return (image >> 8).astype(np.uint8)
+    return image
+
+
+def read(path, page=0):
+    """Returns one page of an image file as an 8-bit BGR (or grayscale) array.
+
+    .npy files and uncompressed TIFFs come back as read-only memory maps, so their pixels are
+    only paged in from disk as they are touched; other formats are decoded with OpenCV. 16-bit
+    .npy files are converted to 8 bits, which reads them in full.
+    """
+    check_supported(path)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        return to_uint8(npy_image(path))
+    if extension in MULTI_PAGE_EXTENSIONS:
+        image = tiff_memmap(path, page)
+        if image is not None:
+            return image
+        if page:
+            ok, images = cv2.imreadmulti(path, start=page, count=1, flags=READ_FLAGS)
+            if not ok or not images:
+                raise ValueError(f"Could not read page {page} of '{path}'.")
+            return images[0]
+    image = cv2.imread(path, READ_FLAGS)
+    if image is None:
+        raise ValueError(f"Could not read image '{path}'.")
+    return image
+
+
+def read_reduced(path, factor, page=0):
+    """Returns a page downscaled by a factor of 2, 4 or 8 without materializing the full-resolution image."""
+    if factor not in REDUCED_FLAGS:
+        raise ValueError(f"Unsupported reduction factor {factor}.")
+    check_supported(path)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy' or extension in MULTI_PAGE_EXTENSIONS:
+        image = npy_image(path) if extension == '.npy' else tiff_memmap(path, page)
+        if image is not None:  # Strided view of the memory map, compacted so only those pixels are read
+            return to_uint8(np.ascontiguousarray(image[::factor, ::factor]))
+        if page:
+            return read(path, page)[::factor, ::factor].copy()
+    image = cv2.imread(path, REDUCED_FLAGS[factor])
+    if image is None:
+        raise ValueError(f"Could not read image '{path}'.")
+    return image
+
+
+def page_count(path):
+    """Returns the number of pages in an image file."""
+    return probe(path).pages
+
+
+def source_key(path, page=0):
+    """Returns a cheap key identifying a page of a file on disk, used instead of hashing its pixels."""
+    stat = os.stat(path)
+    return repr((os.path.abspath(path), page, stat.st_mtime_ns, stat.st_size))
@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+
+
+def equalize_histogram(image):
+    """Applies histogram equalization to the image."""
+    if len(image.shape) == 3:  # Color image
+        img_yuv = cv2.cvtColor(image, cv2.COLOR_BGR2YUV)
+        img_yuv[:, :, 0] = cv2.equalizeHist(img_yuv[:, :, 0])
+        return cv2.cvtColor(img_yuv, cv2.COLOR_YUV2BGR)
+    if len(image.shape) == 2:  # Grayscale image
+        return cv2.equalizeHist(image)
+    print("Unsupported image format for histogram equalization.")
+    return image
+
+
+def edge_detection(image, low_threshold=100, high_threshold=200):
+    """Applies edge detection to the image."""
+    return cv2.Canny(image, low_threshold, high_threshold)
+
+
+def edge_candidates(image, low_threshold=100, high_threshold=200):
+    """Returns Canny's weak and strong edge pixels before hysteresis, stacked as two channels.
+
+    Each channel is a Canny call with both thresholds equal, which keeps the pixels surviving
+    non-maximum suppression above that threshold and leaves hysteresis nothing to decide.
+    """
+    low, high = sorted((low_threshold, high_threshold))
+    return np.dstack((cv2.Canny(image, low, low), cv2.Canny(image, high, high)))
+
+
+def tiled_edge_detection(image, executor, low_threshold=100, high_threshold=200):
+    """Applies edge detection with the gradients and non-maximum suppression computed tile by tile.
+
+    Hysteresis follows weak edges arbitrarily far, so it runs once on the stitched candidates:
+    a weak pixel is an edge when its 8-connected component of weak pixels holds a strong one.
+    The result matches a whole-frame ``edge_detection``.
+    """
+    if not executor.splits(image.shape):
+        return edge_detection(image, low_threshold, high_threshold)
+    candidates = executor.run(edge_candidates, image, 2, low_threshold=low_threshold, high_threshold=high_threshold)
+    count, labels = cv2.connectedComponents(candidates[:, :, 0], connectivity=8)
+    connected = np.zeros(count, dtype=bool)
+    connected[labels[candidates[:, :, 1] > 0]] = True
+    connected[0] = False  # The background
+    return np.where(connected[labels], 255, 0).astype(np.uint8)
+
+
+def denoise(image, strength=10, color_strength=10, template_window=7, search_window=21):
+    """Applies non-local means denoising to the image."""
+    if len(image.shape) == 3:
+        return cv2.fastNlMeansDenoisingColored(image, None, strength, color_strength, template_window, search_window)
+    if len(image.shape) == 2:
+        return cv2.fastNlMeansDenoising(image, None, strength, template_window, search_window)
+    print("Unsupported image format for denoising.")
+    return image
+
+
+def correct_perspective(image, pts1, pts2):
+    """Corrects the perspective of the image given four source and destination points."""
+    matrix = cv2.getPerspectiveTransform(pts1, pts2)
+    width, height = image.shape[1], image.shape[0]
+    return cv2.warpPerspective(image, matrix, (width, height))
+
+
+def rotate(image, angle):
+    """Rotates the image by the specified angle."""
+    (h, w) = image.shape[:2]
+    center = (w // 2, h // 2)
+    matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
+    return cv2.warpAffine(image, matrix, (w, h))
+
+
+OPERATIONS = {
+    'equalize_histogram': equalize_histogram,
+    'edge_detection': edge_detection,
+    'denoise': denoise,
+    'correct_perspective': correct_perspective,
+    'rotate': rotate,
+}
+
+# Parameters holding image coordinates, which scale with the image when an operation runs on a proxy
+COORDINATE_PARAMS = {
+    'correct_perspective': ('pts1', 'pts2'),
+}
+
+# Operations that move pixels; they always run on the whole frame, as a region of interest would cut
+# through what they move. The filters run on the region only.
+GEOMETRIC_OPERATIONS = ('correct_perspective', 'rotate')
+
+# Support radius, in pixels, of the operations that only look at a bounded neighbourhood and so can
+# run tile by tile. Histogram equalization and the warps are global and always run whole-frame.
+HALOS = {
+    'denoise': lambda template_window=7, search_window=21, **params: search_window // 2 + template_window // 2,
+}
+
+# Operations with a local stage that runs tile by tile and a global stage that runs on the stitched
+# result, called as ``function(image, executor, **params)``. Canny's gradients and non-maximum
+# suppression only need 2 px around a pixel, but its hysteresis connects edges across the image.
+TILED_OPERATIONS = {
+    'edge_detection': tiled_edge_detection,
+}
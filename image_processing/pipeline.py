@@ -0,0 +1,225 @@
+from collections import OrderedDict
+import hashlib
+import threading
+import numpy as np
+from progress import ProgressReporter
+from .operations import COORDINATE_PARAMS, GEOMETRIC_OPERATIONS, HALOS, OPERATIONS, TILED_OPERATIONS
+
+
+def freeze(value):
+    """Turns a parameter value into something hashable, including NumPy arrays."""
+    if isinstance(value, np.ndarray):
+        return ('ndarray', value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    return value
+
+
+def image_digest(image):
+    """Returns a short digest of an image's shape, type and pixels."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((image.dtype.str, image.shape)).encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()
+
+
+def step_key(input_key, operation, roi=None):
+    """Returns the cache key of a step's output from its input's key, the step's parameters and its region."""
+    key = (input_key, operation.key()) if roi is None else (input_key, operation.key(), tuple(roi))
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+
+class Operation:
+    """One pipeline step: a named operation from ``OPERATIONS`` and its parameters."""
+
+    def __init__(self, name, enabled=True, **params):
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown image operation '{name}'.")
+        self.name = name
+        self.params = params
+        self.enabled = enabled
+
+    def key(self):
+        """Returns a hashable key for the operation and its parameters."""
+        return self.name, freeze(self.params)
+
+    def copy(self):
+        """Returns an independent copy, so editing one pipeline's step leaves the other's alone."""
+        return Operation(self.name, self.enabled, **self.params)
+
+    def scaled_params(self, scale):
+        """Returns the parameters with image coordinates multiplied by the (x, y) ``scale``."""
+        params = dict(self.params)
+        for name in COORDINATE_PARAMS.get(self.name, ()):
+            params[name] = (np.asarray(params[name]) * scale).astype(np.float32)
+        return params
+
+    def region(self, roi):
+        """Returns the region of interest the operation is restricted to: ``roi``, or None for geometric operations."""
+        return None if self.name in GEOMETRIC_OPERATIONS else roi
+
+    def apply(self, image, executor=None, scale=(1.0, 1.0), roi=None):
+        """Applies the operation, tile by tile on the executor when it has a bounded support.
+
+        ``scale`` is the (x, y) size of ``image`` relative to the full-resolution image the
+        parameters refer to, when the operation runs on a downscaled proxy. With a ``roi`` (in
+        full-resolution pixels) a filter only runs on a view of that region and the pixels
+        around it are passed through.
+        """
+        params = self.params if tuple(scale) == (1.0, 1.0) else self.scaled_params(scale)
+        roi = self.region(roi)
+        if roi is None:
+            return self.run(image, executor, params)
+        roi = roi.scaled(scale).clipped(image.shape)
+        return roi.paste(image, self.run(roi.crop(image), executor, params))
+
+    def run(self, image, executor, params):
+        """Applies the operation with the given parameters to the whole of ``image``."""
+        if executor is not None and self.name in TILED_OPERATIONS:
+            return TILED_OPERATIONS[self.name](image, executor, **params)
+        if executor is not None and self.name in HALOS:
+            return executor.run(OPERATIONS[self.name], image, HALOS[self.name](**params), **params)
+        return OPERATIONS[self.name](image, **params)
+
+    def __repr__(self):
+        return f"Operation({self.name!r}, enabled={self.enabled}, {self.params})"
+
+
+class ImagePipeline:
+    """Non-destructive list of image operations whose outputs are memoized in a bounded LRU cache.
+
+    Each step's output is keyed by a hash of its input's key and its own parameters, so the
+    source is never modified. Editing or removing step k leaves the cached outputs of steps
+    before it valid and only steps k..n run again; a disabled step passes its input through,
+    so toggling it back on finds its output still in the cache. With ``roi`` set, the filters
+    after the last warp only process that region of their input and the region is part of
+    their cache keys. The
+    cache is guarded by a lock, so ``run`` can render on a worker thread while the GUI thread
+    runs the pipeline too.
+    """
+
+    def __init__(self, max_cache_bytes=512 * 1024 ** 2, executor=None, scale=(1.0, 1.0)):
+        self.executor = executor  # Optional TiledExecutor for the tileable operations
+        self.scale = scale  # (x, y) size of the source relative to the image the step parameters refer to
+        self.source = None
+        self.source_key = None
+        self.roi = None  # Region of interest the filters are restricted to, in full-resolution pixels
+        self.operations = []
+        self.max_cache_bytes = max_cache_bytes
+        self.cache = OrderedDict()  # step key -> output image, least recently used first
+        self.cache_bytes = 0
+        self.cache_lock = threading.Lock()
+
+    def set_source(self, image, key=None):
+        """Replaces the source image; the steps are kept and will be replayed on it.
+
+        ``key`` identifies the source in the cache; by default it is a digest of the pixels, which
+        would read a memory-mapped source from disk in full, so file-backed sources pass their own.
+        """
+        self.source = image
+        if key is None and image is not None:
+            key = image_digest(image)
+        self.source_key = key
+
+    def add(self, name, **params):
+        """Appends a step and returns it."""
+        operation = Operation(name, **params)
+        self.operations.append(operation)
+        return operation
+
+    def insert(self, index, name, **params):
+        """Inserts a step before the given index and returns it."""
+        operation = Operation(name, **params)
+        self.operations.insert(index, operation)
+        return operation
+
+    def remove(self, index):
+        """Removes the step at the given index and returns it."""
+        return self.operations.pop(index)
+
+    def set_params(self, index, **params):
+        """Updates the parameters of a step."""
+        self.operations[index].params.update(params)
+
+    def set_enabled(self, index, enabled):
+        """Turns a step on or off without forgetting it."""
+        self.operations[index].enabled = enabled
+
+    def clear(self):
+        """Removes all steps; cached outputs stay until they are evicted."""
+        self.operations = []
+
+    def run(self, operations=None, progress=None, cancel=None):
+        """Returns the output of the enabled steps applied to the source, reusing cached step outputs.
+
+        ``operations`` replaces the pipeline's own steps for this run, e.g. a snapshot replayed
+        on a worker thread; ``progress`` and ``cancel`` are as for ProgressReporter.
+        """
+        image, key, roi = self.source, self.source_key, self.roi
+        if image is None:
+            return None
+        operations = [operation for operation in (self.operations if operations is None else operations)
+                      if operation.enabled]
+        reporter = ProgressReporter([operation.name for operation in operations], progress, cancel)
+        for step, (operation, region) in enumerate(zip(operations, self.step_regions(operations, roi)), 1):
+            key = step_key(key, operation, region)
+            cached = self.lookup(key)
+            if cached is not None:
+                image = cached
+            else:
+                reporter.stage(operation.name, step)
+                image = operation.apply(image, self.executor, self.scale, region)
+                self.store(key, image)
+        return image
+
+    @staticmethod
+    def step_regions(operations, roi):
+        """Returns the region of interest each of the enabled ``operations`` is restricted to, or None.
+
+        The ROI is drawn on the pipeline's output, so it only holds for the filters after the last
+        geometric step; the ones before a warp see other coordinates and process the whole frame.
+        """
+        last_warp = max((index for index, operation in enumerate(operations)
+                         if operation.name in GEOMETRIC_OPERATIONS), default=-1)
+        return [operation.region(roi) if index > last_warp else None for index, operation in enumerate(operations)]
+
+    def output_key(self, operations=None):
+        """Returns the key identifying the output of ``run``, from the source key and step parameters alone."""
+        key = self.source_key
+        if key is None:
+            return None
+        operations = [operation for operation in (self.operations if operations is None else operations)
+                      if operation.enabled]
+        for operation, region in zip(operations, self.step_regions(operations, self.roi)):
+            key = step_key(key, operation, region)
+        return key
+
+    def lookup(self, key):
+        """Returns a cached step output, marking it as recently used, or None."""
+        with self.cache_lock:
+            image = self.cache.get(key)
+            if image is not None:
+                self.cache.move_to_end(key)
+            return image
+
+    def store(self, key, image):
+        """Adds a step output to the cache, evicting the least recently used outputs beyond the budget."""
+        if image.nbytes > self.max_cache_bytes:
+            return
+        with self.cache_lock:
+            if key in self.cache:  # Another thread computed the same step
+                self.cache.move_to_end(key)
+                return
+            self.cache[key] = image
+            self.cache_bytes += image.nbytes
+            while self.cache_bytes > self.max_cache_bytes:
+                _, evicted = self.cache.popitem(last=False)
+                self.cache_bytes -= evicted.nbytes
+
+    def clear_cache(self):
+        """Drops every cached step output."""
+        with self.cache_lock:
+            self.cache.clear()
+            self.cache_bytes = 0
@@ -0,0 +1,79 @@
+from collections import namedtuple
+import numpy as np
+
+
+class Roi(namedtuple('Roi', ['x', 'y', 'width', 'height'])):
+    """Rectangular region of interest, such as the plot area of a chart, in integer image pixels.
+
+    ``crop`` returns a NumPy view of the region, so pipelines run on it without copying the
+    image (a memory-mapped image only pages in the rows it covers); ``to_image`` offsets
+    coordinates found in the view back into full-image space.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_rect(cls, x, y, width, height, shape=None):
+        """Returns the ROI covering a floating point rectangle, clipped to an image shape if given."""
+        left, top = int(np.floor(min(x, x + width))), int(np.floor(min(y, y + height)))
+        right, bottom = int(np.ceil(max(x, x + width))), int(np.ceil(max(y, y + height)))
+        if shape is not None:
+            left, top = max(left, 0), max(top, 0)
+            right, bottom = min(right, shape[1]), min(bottom, shape[0])
+        return cls(left, top, max(right - left, 0), max(bottom - top, 0))
+
+    @classmethod
+    def around(cls, points, shape=None, margin=0):
+        """Returns the ROI bounding an (N, 2) array of points, grown by ``margin`` pixels on every side."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        (left, top), (right, bottom) = points.min(axis=0) - margin, points.max(axis=0) + margin + 1
+        return cls.from_rect(left, top, right - left, bottom - top, shape)
+
+    @property
+    def offset(self):
+        """The (x, y) position of the region's top-left pixel in the full image."""
+        return np.array([self.x, self.y], dtype=np.float64)
+
+    def is_empty(self):
+        return self.width <= 0 or self.height <= 0
+
+    def clipped(self, shape):
+        """Returns the part of the ROI inside an image of the given shape."""
+        return Roi.from_rect(self.x, self.y, self.width, self.height, shape)
+
+    def scaled(self, scale):
+        """Returns the ROI on a copy of the image resized by the (x, y) ``scale``, e.g. a preview proxy."""
+        return Roi.from_rect(self.x * scale[0], self.y * scale[1], self.width * scale[0], self.height * scale[1])
+
+    def crop(self, image):
+        """Returns the region of an image as a view sharing its memory."""
+        roi = self.clipped(image.shape)
+        return image[roi.y:roi.y + roi.height, roi.x:roi.x + roi.width]
+
+    def to_image(self, points):
+        """Offsets an (N, 2) array of region coordinates into full-image coordinates."""
+        return np.asarray(points, dtype=np.float64).reshape(-1, 2) + self.offset
+
+    def to_roi(self, points):
+        """Offsets an (N, 2) array of full-image coordinates into region coordinates."""
+        return np.asarray(points, dtype=np.float64).reshape(-1, 2) - self.offset
+
+    def contains(self, points):
+        """Returns a boolean mask of the (N, 2) full-image points that fall inside the region."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return ((points[:, 0] >= self.x) & (points[:, 0] < self.x + self.width) &
+                (points[:, 1] >= self.y) & (points[:, 1] < self.y + self.height))
+
+    def paste(self, image, region):
+        """Returns a copy of an image with the region replaced by ``region``, the output of a filter on ``crop``.
+
+        When the filter changed the channel count, e.g. edge detection on a color image, the
+        pixels outside the region are left blank.
+        """
+        roi = self.clipped(image.shape)
+        if region.shape[2:] == image.shape[2:] and region.dtype == image.dtype:
+            output = np.array(image)
+        else:
+            output = np.zeros(image.shape[:2] + region.shape[2:], dtype=region.dtype)
+        output[roi.y:roi.y + roi.height, roi.x:roi.x + roi.width] = region
+        return output
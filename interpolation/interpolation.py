@@ -1,16 +1,22 @@
-from scipy.interpolate import CubicSpline, Akima1DInterpolator, PchipInterpolator, interp1d
+from scipy.interpolate import CubicSpline, Akima1DInterpolator, PchipInterpolator, PPoly, interp1d
 import numpy as np
-from PyQt5.QtCore import QPointF
-from point import Point
+from observable import Observable
+from point import PointSet
 
-class Interpolation:
+class Interpolation(Observable):
     """Class to handle interpolation of data points."""
 
-    def __init__(self, calibration, main_window):
+    def __init__(self, calibration):
+        super().__init__()
         self.calibration = calibration
-        self.main_window = main_window
-        self.interpolated_points = []
+        self.interpolated_points = PointSet()
         self.method = 'linear'  # Default interpolation method
+        self.tolerance = 0.5  # Maximum deviation of the sampled polyline from the curve, in image pixels
+        self.numeric_tolerance = None  # Optional maximum deviation in real-world y units
+        self.min_samples = 64
+        self.max_samples = 5000  # Hard cap on the number of interpolated samples
+        self.max_refinements = 20
+        self.cache = None  # Last fit: its key, result, segment descriptors and samples
 
     def set_method(self, method):
         """Sets the interpolation method."""
@@ -24,92 +30,222 @@ class Interpolation:
         if len(data_points) < 2:
             raise ValueError("At least two data points are required for interpolation.")
 
-        valid_points = [point for point in data_points if point.get_real_coordinates() is not None]
-        valid_points = sorted(valid_points, key=lambda point: point.get_real_coordinates().x())
+        key = (id(data_points), data_points.version) + self.sampling_settings()
+        cache = self.cache
+        if cache is not None and cache['key'] == key and cache['points'].version == cache['points_version']:
+            self.interpolated_points = cache['points']
+            self.notify('interpolated_points_changed', points=self.interpolated_points)
+            return cache['result']
+
+        real_coordinates = data_points.real_coordinates
+        valid_points = real_coordinates[~np.isnan(real_coordinates).any(axis=1)]
+        valid_points = valid_points[np.argsort(valid_points[:, 0], kind='stable')]
 
         if len(valid_points) < 2:
             raise ValueError("Not enough valid real coordinates for interpolation.")
 
-        x = [point.get_real_coordinates().x() for point in valid_points]
-        y = [point.get_real_coordinates().y() for point in valid_points]
-
+        # Coincident x values would make the fits singular; merge them by averaging y
+        x, inverse = np.unique(valid_points[:, 0], return_inverse=True)
+        y = np.bincount(inverse, weights=valid_points[:, 1]) / np.bincount(inverse)
 
-        distances = np.diff(x)
-        min_distance = np.min(distances) if len(distances) > 0 else 1
-        num_points = int((max(x) - min(x)) / min_distance * 40)  # Adjust the factor as needed
+        if len(x) < 2:
+            raise ValueError("Not enough distinct x coordinates for interpolation.")
 
         if self.method == 'linear':
-            return self.linear_interpolation(x, y, num_points)
+            result = self.linear_interpolation(x, y)
         elif self.method == 'spline':
-            return self.spline_interpolation(x, y, num_points)
+            result = self.spline_interpolation(x, y)
         elif self.method == 'polynomial':
-            return self.polynomial_interpolation(x, y, num_points)
+            result = self.polynomial_interpolation(x, y)
         elif self.method == 'akima':
-            return self.akima_interpolation(x, y, num_points)
+            result = self.akima_interpolation(x, y)
         elif self.method == 'pchip':
-            return self.pchip_interpolation(x, y, num_points)
+            result = self.pchip_interpolation(x, y)
         elif self.method == 'quadratic':
-            return self.quadratic_interpolation(x, y, num_points)
+            result = self.quadratic_interpolation(x, y)
         elif self.method == 'piecewise_linear':
-            return self.piecewise_linear_interpolation(x, y, num_points)
+            result = self.piecewise_linear_interpolation(x, y)
+        self.cache.update(key=key, result=result, points=self.interpolated_points,
+                          points_version=self.interpolated_points.version)
+        self.notify('interpolated_points_changed', points=self.interpolated_points)
+        return result
 
-    def linear_interpolation(self, x, y, num_points):
+    def linear_interpolation(self, x, y):
         """Performs linear interpolation."""
-        x_new = np.linspace(min(x), max(x), num=num_points)
-        y_new = np.interp(x_new, x, y)
-        self.interpolated_points = [Point(QPointF(x_val, y_val), QPointF(x_val, y_val), point_type='interpolated') for x_val, y_val in zip(x_new, y_new)]
+        x_new, y_new, image_coordinates = self.sample_interpolant(lambda x_values: np.interp(x_values, x, y), x, y)
+        self.interpolated_points = self.build_interpolated_points(x_new, y_new, image_coordinates)
         return self.interpolated_points
 
-    def spline_interpolation(self, x, y, num_points):
+    def spline_interpolation(self, x, y):
         """Performs spline interpolation and calculates confidence intervals."""
         cs = CubicSpline(x, y)
-        x_new = np.linspace(min(x), max(x), num=num_points)
-        y_new = cs(x_new)
-        self.interpolated_points = [Point(QPointF(x_val, y_val), QPointF(x_val, y_val), point_type='interpolated') for x_val, y_val in zip(x_new, y_new)]
+        x_new, y_new, image_coordinates = self.sample_interpolant(cs, x, y)
+        self.interpolated_points = self.build_interpolated_points(x_new, y_new, image_coordinates)
         lower_bound, upper_bound = self.calculate_confidence_intervals(y_new)
         return self.interpolated_points, x_new, lower_bound, upper_bound
 
-    def polynomial_interpolation(self, x, y, num_points):
+    def polynomial_interpolation(self, x, y):
         """Performs polynomial interpolation."""
         poly = np.polyfit(x, y, deg=min(len(x)-1, 3))  # Degree 3 polynomial
         poly_func = np.poly1d(poly)
-        x_new = np.linspace(min(x), max(x), num=num_points)
-        y_new = poly_func(x_new)
-        self.interpolated_points = [Point(QPointF(x_val, y_val), QPointF(x_val, y_val), point_type='interpolated') for x_val, y_val in zip(x_new, y_new)]
+        x_new, y_new, image_coordinates = self.sample_interpolant(poly_func, x, y)
+        self.interpolated_points = self.build_interpolated_points(x_new, y_new, image_coordinates)
         return self.interpolated_points
 
-    def akima_interpolation(self, x, y, num_points):
+    def akima_interpolation(self, x, y):
         """Performs Akima interpolation."""
         akima = Akima1DInterpolator(x, y)
-        x_new = np.linspace(min(x), max(x), num=num_points)
-        y_new = akima(x_new)
-        self.interpolated_points = [Point(QPointF(x_val, y_val), QPointF(x_val, y_val), point_type='interpolated') for x_val, y_val in zip(x_new, y_new)]
+        x_new, y_new, image_coordinates = self.sample_interpolant(akima, x, y)
+        self.interpolated_points = self.build_interpolated_points(x_new, y_new, image_coordinates)
         return self.interpolated_points
 
-    def pchip_interpolation(self, x, y, num_points):
+    def pchip_interpolation(self, x, y):
         """Performs Pchip interpolation."""
         pchip = PchipInterpolator(x, y)
-        x_new = np.linspace(min(x), max(x), num=num_points)
-        y_new = pchip(x_new)
-        self.interpolated_points = [Point(QPointF(x_val, y_val), QPointF(x_val, y_val), point_type='interpolated') for x_val, y_val in zip(x_new, y_new)]
+        x_new, y_new, image_coordinates = self.sample_interpolant(pchip, x, y)
+        self.interpolated_points = self.build_interpolated_points(x_new, y_new, image_coordinates)
         return self.interpolated_points
 
-    def quadratic_interpolation(self, x, y, num_points):
+    def quadratic_interpolation(self, x, y):
         """Performs quadratic interpolation."""
         quad = interp1d(x, y, kind='quadratic')
-        x_new = np.linspace(min(x), max(x), num=num_points)
-        y_new = quad(x_new)
-        self.interpolated_points = [Point(QPointF(x_val, y_val), QPointF(x_val, y_val), point_type='interpolated') for x_val, y_val in zip(x_new, y_new)]
+        x_new, y_new, image_coordinates = self.sample_interpolant(quad, x, y)
+        self.interpolated_points = self.build_interpolated_points(x_new, y_new, image_coordinates)
         return self.interpolated_points
 
-    def piecewise_linear_interpolation(self, x, y, num_points):
+    def piecewise_linear_interpolation(self, x, y):
         """Performs piecewise linear interpolation."""
         piecewise_linear = interp1d(x, y, kind='linear')
-        x_new = np.linspace(min(x), max(x), num=num_points)
-        y_new = piecewise_linear(x_new)
-        self.interpolated_points = [Point(QPointF(x_val, y_val), QPointF(x_val, y_val), point_type='interpolated') for x_val, y_val in zip(x_new, y_new)]
+        x_new, y_new, image_coordinates = self.sample_interpolant(piecewise_linear, x, y)
+        self.interpolated_points = self.build_interpolated_points(x_new, y_new, image_coordinates)
         return self.interpolated_points
 
+    def sampling_settings(self):
+        """Returns everything besides the data that the sampled curve depends on."""
+        matrix = self.calibration.inverse_transformation_matrix
+        return (self.method, self.tolerance, self.numeric_tolerance, self.min_samples, self.max_samples,
+                self.max_refinements, None if matrix is None else np.asarray(matrix).tobytes())
+
+    def sample_interpolant(self, interpolant, x, y):
+        """Samples a fitted interpolant, reusing the previous samples wherever its segments did not change.
+
+        Editing one point of a spline only changes the coefficients of nearby segments, so the
+        segments are compared with the last fit and only the x-range between the first and last
+        changed segment is resampled and mapped to image coordinates; the cached samples on
+        either side are kept as they are. Returns the samples' x, y and (N, 2) image coordinates.
+        """
+        settings = self.sampling_settings()
+        segments = self.segment_descriptors(interpolant, x, y)
+        cache = self.cache
+        changed = None
+        if (cache is not None and cache['settings'] == settings and segments is not None
+                and cache['segments'] is not None and cache['segments'].shape[1] == segments.shape[1]):
+            changed = self.changed_range(cache['segments'], segments)
+
+        if changed is None:
+            x_new, y_new = self.adaptive_sampling(interpolant, x)
+            image_coordinates = self.to_image(x_new, y_new)
+        else:
+            lo, hi = changed
+            x_old, y_old, image_old = cache['samples']
+            left = (x_old < lo) & (x_old >= x[0])
+            right = (x_old > hi) & (x_old <= x[-1])
+            kept = np.count_nonzero(left) + np.count_nonzero(right)
+            x_mid, y_mid = self.adaptive_sampling(interpolant, x, lo, hi, self.max_samples - kept)
+            x_new = np.concatenate((x_old[left], x_mid, x_old[right]))
+            y_new = np.concatenate((y_old[left], y_mid, y_old[right]))
+            image_coordinates = np.concatenate((image_old[left], self.to_image(x_mid, y_mid), image_old[right]))
+
+        self.cache = {'key': None, 'settings': settings, 'segments': segments,
+                      'samples': (x_new, y_new, image_coordinates)}
+        return x_new, y_new, image_coordinates
+
+    def segment_descriptors(self, interpolant, x, y):
+        """Returns one row per segment that fully determines the curve on it, or None for global fits."""
+        if isinstance(interpolant, PPoly):
+            coefficients = interpolant.c.reshape(interpolant.c.shape[0], -1).T
+            return np.column_stack((interpolant.x[:-1], interpolant.x[1:], coefficients))
+        if self.method in ('linear', 'piecewise_linear'):
+            return np.column_stack((x[:-1], x[1:], y[:-1], y[1:]))
+        return None  # Polynomial and quadratic fits change everywhere when a point moves
+
+    @staticmethod
+    def changed_range(old, new):
+        """Returns the (lo, hi) x-range covered by the segments of ``new`` that differ from ``old``."""
+        count = min(len(old), len(new))
+        same = np.isclose(old[:count], new[:count], rtol=1e-9, atol=1e-12).all(axis=1)
+        prefix = count if same.all() else int(np.argmin(same))
+        same = np.isclose(old[::-1][:count], new[::-1][:count], rtol=1e-9, atol=1e-12).all(axis=1)
+        suffix = count if same.all() else int(np.argmin(same))
+        if prefix == len(new):
+            return new[-1, 1], new[-1, 1]
+        last = len(new) - suffix - 1
+        if last < prefix:  # Segments were only removed; nothing in between needs resampling
+            return new[prefix, 0], new[prefix, 0]
+        return new[prefix, 0], new[last, 1]
+
+    def adaptive_sampling(self, interpolant, x, lo=None, hi=None, max_samples=None):
+        """Samples a fitted interpolant where it bends, stopping once the polyline is within tolerance.
+
+        Sampling starts from the data points plus a uniform grid of ``min_samples`` and repeatedly
+        bisects the intervals whose midpoint is further than ``tolerance`` image pixels (and,
+        if set, ``numeric_tolerance`` real units) from the chord. The worst intervals are refined
+        first and the total never exceeds ``max_samples``, whatever the spacing of the data.
+        ``lo`` and ``hi`` restrict the sampling to part of the curve, with a proportional grid.
+        """
+        lo = x[0] if lo is None else lo
+        hi = x[-1] if hi is None else hi
+        knots = x[(x >= lo) & (x <= hi)]
+        max_samples = max(self.max_samples if max_samples is None else max_samples, len(knots) + 2)
+        span = (hi - lo) / (x[-1] - x[0])
+        grid_size = max(min(int(np.ceil(self.min_samples * span)), max_samples - len(knots)), 2)
+        x_new = np.union1d(knots, np.linspace(lo, hi, num=grid_size))
+        y_new = interpolant(x_new)
+
+        for _ in range(self.max_refinements):
+            budget = max_samples - len(x_new)
+            if budget <= 0 or len(x_new) < 2:
+                break
+            x_mid = (x_new[:-1] + x_new[1:]) / 2
+            y_mid = interpolant(x_mid)
+            error = self.chord_error(x_new, y_new, x_mid, y_mid)
+            refine = np.flatnonzero(error > 1)
+            if len(refine) == 0:
+                break
+            if len(refine) > budget:
+                refine = refine[np.argsort(error[refine])[-budget:]]
+            x_new = np.concatenate((x_new, x_mid[refine]))
+            y_new = np.concatenate((y_new, y_mid[refine]))
+            order = np.argsort(x_new, kind='stable')
+            x_new = x_new[order]
+            y_new = y_new[order]
+
+        return x_new, y_new
+
+    def chord_error(self, x_new, y_new, x_mid, y_mid):
+        """Returns each interval's midpoint deviation from its chord, as a multiple of the allowed tolerance."""
+        error = np.zeros(len(x_mid))
+        if self.calibration.inverse_transformation_matrix is not None:
+            samples = self.calibration.real_to_image_array(np.column_stack((x_new, y_new)))
+            midpoints = self.calibration.real_to_image_array(np.column_stack((x_mid, y_mid)))
+            chords = (samples[:-1] + samples[1:]) / 2
+            error = np.hypot(*(midpoints - chords).T) / self.tolerance
+        if self.numeric_tolerance is not None:
+            numeric_error = np.abs(y_mid - (y_new[:-1] + y_new[1:]) / 2) / self.numeric_tolerance
+            error = np.maximum(error, numeric_error)
+        return np.nan_to_num(error)
+
+    def to_image(self, x_new, y_new):
+        """Maps samples back to image coordinates in one pass; without a calibration they are used as is."""
+        real_coordinates = np.column_stack((x_new, y_new))
+        if self.calibration.inverse_transformation_matrix is None:
+            return real_coordinates
+        return self.calibration.real_to_image_array(real_coordinates)
+
+    def build_interpolated_points(self, x_new, y_new, image_coordinates):
+        """Builds the interpolated point set from the samples and their image coordinates."""
+        return PointSet.from_arrays(image_coordinates, np.column_stack((x_new, y_new)), point_type='interpolated')
+
     def calculate_confidence_intervals(self, y_new):
         """Calculates confidence intervals for the interpolated points."""
         y_std = np.std(y_new) / np.sqrt(len(y_new))
@@ -122,12 +258,13 @@ class Interpolation:
 
     def calculate_rmse(self, original_points, interpolated_points):
         """Calculates the Root Mean Squared Error (RMSE) for the interpolated points."""
-        errors = [(op.get_real_coordinates().y() - ip.get_real_coordinates().y()) ** 2 for op, ip in zip(original_points, interpolated_points)]
+        count = min(len(original_points), len(interpolated_points))
+        errors = (original_points.real_coordinates[:count, 1] - interpolated_points.real_coordinates[:count, 1]) ** 2
         mse = np.mean(errors)
         rmse = np.sqrt(mse)
         return rmse
 
     def clear_interpolated_points(self):
         """Clears the interpolated points."""
-        self.interpolated_points = []
-        self.main_window.image_view.clear_interpolated_points()
+        self.interpolated_points = PointSet()
+        self.notify('interpolated_points_cleared')
@@ -0,0 +1,24 @@
+class Observable:
+    """Mixin that lets a front end observe events raised by the compute core.
+
+    Observers are plain callables invoked as ``callback(event, **payload)``. The core never
+    depends on them, so it runs the same with or without a GUI attached.
+    """
+
+    def __init__(self):
+        self._observers = []
+
+    def add_observer(self, callback):
+        """Registers a callback to receive events."""
+        if callback not in self._observers:
+            self._observers.append(callback)
+
+    def remove_observer(self, callback):
+        """Unregisters a previously added callback."""
+        if callback in self._observers:
+            self._observers.remove(callback)
+
+    def notify(self, event, **payload):
+        """Sends an event to all registered observers."""
+        for callback in list(self._observers):
+            callback(event, **payload)
@@ -1,26 +1,358 @@
-from PyQt5.QtCore import QPointF
+import numpy as np
+from spatial_index import GridIndex, points_in_polygon
+
+
+POINT_TYPES = ('data', 'calibration', 'interpolated', 'detected')
+POINT_TYPE_CODES = {name: code for code, name in enumerate(POINT_TYPES)}
+
+
+class Coordinates:
+    """Immutable (x, y) pair exposing the same x()/y() accessors as QPointF without importing Qt."""
+
+    __slots__ = ('_x', '_y')
+
+    def __init__(self, x, y):
+        self._x = float(x)
+        self._y = float(y)
+
+    def x(self):
+        return self._x
+
+    def y(self):
+        return self._y
+
+    def __iter__(self):
+        yield self._x
+        yield self._y
+
+    def __eq__(self, other):
+        return hasattr(other, 'x') and hasattr(other, 'y') and self._x == other.x() and self._y == other.y()
+
+    def __hash__(self):
+        return hash((self._x, self._y))
+
+    def __repr__(self):
+        return f"Coordinates({self._x}, {self._y})"
+
+
+class PointSet:
+    """Columnar store of points backed by contiguous float64 arrays.
+
+    Each row holds the image coordinates, the real-world coordinates (NaN when unknown),
+    a small integer type code and a stable id. Rows keep their insertion order, so ids
+    stay sorted and can be looked up with a binary search. ``version`` is bumped on every
+    change so derived results can be cached against it.
+
+    Spatial queries (``nearest``, ``rows_in_rect``, ``rows_in_polygon``) go through a GridIndex
+    over the image coordinates. It is built on the first query and from then on updated in place
+    by every add, move and delete, so sets that are never queried pay nothing for it.
+    """
+
+    INDEX_CELL_SIZE = 32.0
+
+    def __init__(self, capacity=64):
+        capacity = max(int(capacity), 1)
+        self._image = np.empty((capacity, 2), dtype=np.float64)
+        self._real = np.empty((capacity, 2), dtype=np.float64)
+        self._types = np.empty(capacity, dtype=np.int8)
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._size = 0
+        self._next_id = 0
+        self._index = None
+        self.version = 0
+
+    @classmethod
+    def from_arrays(cls, image_coordinates, real_coordinates=None, point_type='data'):
+        """Creates a point set from (N, 2) arrays of image and real-world coordinates."""
+        image_coordinates = np.asarray(image_coordinates, dtype=np.float64).reshape(-1, 2)
+        point_set = cls(capacity=len(image_coordinates))
+        point_set.extend(image_coordinates, real_coordinates, point_type)
+        return point_set
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __iter__(self):
+        for point_id in self.ids.tolist():
+            yield Point.view(self, point_id)
+
+    def __getitem__(self, index):
+        if not isinstance(index, (int, np.integer)):
+            return PointSet.from_arrays(self.image_coordinates[index], self.real_coordinates[index],
+                                        self.point_types[index])
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("Point index out of range.")
+        return Point.view(self, int(self._ids[index]))
+
+    def __contains__(self, point):
+        return isinstance(point, Point) and point.point_set is self and self.find(point.point_id) >= 0
+
+    @property
+    def image_coordinates(self):
+        """Zero-copy (N, 2) view of the image coordinates."""
+        return self._image[:self._size]
+
+    @property
+    def real_coordinates(self):
+        """Zero-copy (N, 2) view of the real-world coordinates."""
+        return self._real[:self._size]
+
+    @property
+    def point_types(self):
+        """Zero-copy (N,) view of the point type codes."""
+        return self._types[:self._size]
+
+    @property
+    def ids(self):
+        """Zero-copy (N,) view of the stable point ids."""
+        return self._ids[:self._size]
+
+    def _reserve(self, extra):
+        """Grows the backing arrays geometrically so appends stay amortized O(1)."""
+        required = self._size + extra
+        capacity = len(self._ids)
+        if required <= capacity:
+            return
+        while capacity < required:
+            capacity *= 2
+        for name in ('_image', '_real', '_types', '_ids'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    @staticmethod
+    def _type_code(point_type):
+        if isinstance(point_type, str):
+            return POINT_TYPE_CODES[point_type]
+        return point_type
+
+    def append(self, image_xy, real_xy=None, point_type='data'):
+        """Appends a single point and returns its id."""
+        self._reserve(1)
+        row = self._size
+        self._image[row] = image_xy
+        self._real[row] = real_xy if real_xy is not None else np.nan
+        self._types[row] = self._type_code(point_type)
+        self._ids[row] = self._next_id
+        self._next_id += 1
+        self._size += 1
+        self.version += 1
+        if self._index is not None:
+            self._index.insert(self._ids[row:row + 1], self._image[row:row + 1])
+        return int(self._ids[row])
+
+    def extend(self, image_coordinates, real_coordinates=None, point_type='data'):
+        """Appends (N, 2) arrays of points in one bulk copy and returns their ids."""
+        image_coordinates = np.asarray(image_coordinates, dtype=np.float64).reshape(-1, 2)
+        count = len(image_coordinates)
+        self._reserve(count)
+        rows = slice(self._size, self._size + count)
+        self._image[rows] = image_coordinates
+        if real_coordinates is None:
+            self._real[rows] = np.nan
+        else:
+            self._real[rows] = np.asarray(real_coordinates, dtype=np.float64).reshape(-1, 2)
+        self._types[rows] = self._type_code(point_type)
+        self._ids[rows] = np.arange(self._next_id, self._next_id + count)
+        self._next_id += count
+        self._size += count
+        self.version += 1
+        if self._index is not None:
+            self._index.insert(self._ids[rows], self._image[rows])
+        return self._ids[rows]
+
+    def find(self, point_id):
+        """Returns the row index of the given id, or -1 if it is not in the set."""
+        ids = self.ids
+        index = int(np.searchsorted(ids, point_id))
+        if index < len(ids) and ids[index] == point_id:
+            return index
+        return -1
+
+    def find_ids(self, point_ids):
+        """Returns the row of each of an array of ids and a boolean mask of those that are in the set.
+
+        Rows where the mask is False are meaningless.
+        """
+        ids = self.ids
+        point_ids = np.asarray(point_ids, dtype=np.int64).reshape(-1)
+        if not len(ids):
+            return np.zeros(len(point_ids), dtype=np.intp), np.zeros(len(point_ids), dtype=bool)
+        rows = np.minimum(np.searchsorted(ids, point_ids), len(ids) - 1)
+        return rows, ids[rows] == point_ids
+
+    def rows_of(self, point_ids):
+        """Returns the row indices of an array of ids, leaving out ids that are not in the set."""
+        rows, found = self.find_ids(point_ids)
+        return rows[found]
+
+    def delete(self, indices):
+        """Deletes the rows at the given index or indices, compacting the arrays in place."""
+        keep = np.ones(self._size, dtype=bool)
+        keep[indices] = False
+        if self._index is not None:
+            removed = ~keep
+            self._index.remove(self.ids[removed], self.image_coordinates[removed])
+        remaining = int(np.count_nonzero(keep))
+        for name in ('_image', '_real', '_types', '_ids'):
+            array = getattr(self, name)
+            array[:remaining] = array[:self._size][keep]
+        self._size = remaining
+        self.version += 1
+
+    def remove(self, point):
+        """Removes the row behind the given point view."""
+        index = self.find(point.point_id)
+        if index < 0:
+            raise ValueError("Point is not in this point set.")
+        self.delete(index)
+
+    def delete_ids(self, point_ids):
+        """Deletes the points with the given ids in one compaction and returns how many were found."""
+        rows = self.rows_of(point_ids)
+        if len(rows):
+            self.delete(rows)
+        return len(rows)
+
+    def pop(self):
+        """Removes and returns the last point as a standalone point."""
+        if self._size == 0:
+            raise IndexError("pop from empty point set")
+        point = self[self._size - 1].detach()
+        if self._index is not None:
+            self._index.remove(self.ids[-1:], self.image_coordinates[-1:])
+        self._size -= 1
+        self.version += 1
+        return point
+
+    def clear(self):
+        """Removes all points."""
+        self._size = 0
+        self.version += 1
+        if self._index is not None:
+            self._index.clear()
+
+    def mark_changed(self, moved=True):
+        """Bumps the version after writing through one of the zero-copy array views.
+
+        ``moved`` says the image coordinates may have changed, which drops the spatial index
+        until the next query; writes to the other columns pass False to keep it.
+        """
+        self.version += 1
+        if moved:
+            self._index = None
+
+    def set_image_coordinates(self, index, x, y):
+        """Sets the image coordinates of the row at the given index."""
+        if self._index is not None:
+            self._index.move(self._ids[index:index + 1], self._image[index:index + 1], [(x, y)])
+        self._image[index] = (x, y)
+        self.version += 1
+
+    def set_real_coordinates(self, index, x, y):
+        """Sets the real-world coordinates of the row at the given index."""
+        self._real[index] = (x, y)
+        self.version += 1
+
+    def spatial_index(self):
+        """Returns the grid index over the image coordinates, building it on first use."""
+        if self._index is None:
+            self._index = GridIndex(self.INDEX_CELL_SIZE)
+            self._index.insert(self.ids, self.image_coordinates)
+        return self._index
+
+    def rows_in_rect(self, x0, y0, x1, y1):
+        """Returns the sorted row indices of the points inside a rectangle, edges included."""
+        rows = np.sort(self.rows_of(self.spatial_index().candidates(x0, y0, x1, y1)))
+        x, y = self._image[rows, 0], self._image[rows, 1]
+        inside = (x >= min(x0, x1)) & (x <= max(x0, x1)) & (y >= min(y0, y1)) & (y <= max(y0, y1))
+        return rows[inside]
+
+    def rows_in_polygon(self, polygon):
+        """Returns the sorted row indices of the points inside a closed (M, 2) polygon, e.g. a lasso."""
+        polygon = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+        if len(polygon) < 3:
+            return np.empty(0, dtype=np.int64)
+        (x0, y0), (x1, y1) = polygon.min(axis=0), polygon.max(axis=0)
+        rows = self.rows_in_rect(x0, y0, x1, y1)
+        return rows[points_in_polygon(self._image[rows], polygon)]
+
+    def nearest(self, x, y, max_distance):
+        """Returns the row index of the point nearest to (x, y) within ``max_distance`` pixels, or -1."""
+        rows = self.rows_in_rect(x - max_distance, y - max_distance, x + max_distance, y + max_distance)
+        if not len(rows):
+            return -1
+        distances = np.hypot(self._image[rows, 0] - x, self._image[rows, 1] - y)
+        best = int(np.argmin(distances))
+        return int(rows[best]) if distances[best] <= max_distance else -1
 
 
 class Point:
-    """Class to represent a point in both image and real-world coordinates."""
+    """Class to represent a point in both image and real-world coordinates.
+
+    A point is a lightweight view onto one row of a PointSet. Constructing a Point directly
+    creates a standalone point backed by its own single-row set.
+    """
+
+    __slots__ = ('point_set', 'point_id')
 
     def __init__(self, image_coordinates, real_coordinates=None, point_type='data'):
-        self.image_coordinates = image_coordinates
-        self.real_coordinates = real_coordinates if real_coordinates is not None else QPointF()
-        self.point_type = point_type
+        self.point_set = PointSet(capacity=1)
+        real_xy = None if real_coordinates is None else (real_coordinates.x(), real_coordinates.y())
+        self.point_id = self.point_set.append((image_coordinates.x(), image_coordinates.y()), real_xy, point_type)
+
+    @classmethod
+    def view(cls, point_set, point_id):
+        """Returns a view onto the row with the given id without copying any data."""
+        point = cls.__new__(cls)
+        point.point_set = point_set
+        point.point_id = point_id
+        return point
+
+    def __eq__(self, other):
+        return isinstance(other, Point) and self.point_set is other.point_set and self.point_id == other.point_id
+
+    def __hash__(self):
+        return hash((id(self.point_set), self.point_id))
+
+    @property
+    def index(self):
+        """Row index of the point inside its point set."""
+        index = self.point_set.find(self.point_id)
+        if index < 0:
+            raise KeyError("Point has been removed from its point set.")
+        return index
+
+    @property
+    def point_type(self):
+        return POINT_TYPES[self.point_set.point_types[self.index]]
+
+    def detach(self):
+        """Returns a standalone copy of the point."""
+        return Point(self.get_image_coordinates(), self.get_real_coordinates(), self.point_type)
 
-    def set_image_coordinates(self, coordinates: QPointF):
+    def set_image_coordinates(self, coordinates):
         """Sets the image coordinates of the point."""
-        self.image_coordinates = coordinates
+        self.point_set.set_image_coordinates(self.index, coordinates.x(), coordinates.y())
 
-    def get_image_coordinates(self) -> QPointF:
+    def get_image_coordinates(self):
         """Returns the image coordinates of the point."""
-        return self.image_coordinates
+        x, y = self.point_set.image_coordinates[self.index]
+        return Coordinates(x, y)
 
-    def set_real_coordinates(self, coordinates: QPointF):
+    def set_real_coordinates(self, coordinates):
         """Sets the real-world coordinates of the point."""
-        self.real_coordinates = coordinates
+        self.point_set.set_real_coordinates(self.index, coordinates.x(), coordinates.y())
 
-    def get_real_coordinates(self) -> QPointF:
-        """Returns the real-world coordinates of the point."""
-        return self.real_coordinates
+    def get_real_coordinates(self):
+        """Returns the real-world coordinates of the point, or None if they are unknown."""
+        x, y = self.point_set.real_coordinates[self.index]
+        if np.isnan(x) or np.isnan(y):
+            return None
+        return Coordinates(x, y)
@@ -0,0 +1,29 @@
+from concurrent.futures import CancelledError
+
+
+class ProgressReporter:
+    """Reports pipeline stages to an optional progress callback and honours cooperative cancellation.
+
+    ``progress`` is called as ``progress(stage, step, total)``; ``cancel`` is any object with an
+    ``is_set()`` method, such as a ``threading.Event``. Both are optional so the same pipeline
+    code runs unchanged on the GUI thread, in a worker thread or in a headless process.
+    """
+
+    def __init__(self, stages, progress=None, cancel=None):
+        self.stages = tuple(stages)
+        self.progress = progress
+        self.cancel = cancel
+
+    def check_cancelled(self):
+        """Raises CancelledError if cancellation has been requested."""
+        if self.cancel is not None and self.cancel.is_set():
+            raise CancelledError()
+
+    def stage(self, name, step=None):
+        """Marks the start of a stage, raising CancelledError if the job has been cancelled.
+
+        ``step`` is the 1-based position of the stage, for pipelines that repeat a stage name.
+        """
+        self.check_cancelled()
+        if self.progress is not None:
+            self.progress(name, step or self.stages.index(name) + 1, len(self.stages))
@@ -0,0 +1,97 @@
+from itertools import chain
+import numpy as np
+
+
+class GridIndex:
+    """Uniform grid over 2-D points, updated in place as points are added, moved and deleted.
+
+    Point ids are bucketed into square cells of ``cell_size`` pixels, so a query only visits the
+    cells it overlaps rather than every point. Bulk inserts and deletes group their points by
+    cell with NumPy and touch each cell once.
+    """
+
+    def __init__(self, cell_size=32.0):
+        self.cell_size = float(cell_size)
+        self.cells = {}  # (cell x, cell y) -> set of point ids
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def cell_of(self, coordinates):
+        """Returns the (N, 2) integer cells of an (N, 2) array of coordinates."""
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        return np.floor(coordinates / self.cell_size).astype(np.int64)
+
+    def grouped(self, ids, coordinates):
+        """Yields (cell, ids in that cell) for the given points."""
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        if not len(ids):
+            return
+        cells = self.cell_of(coordinates)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        cells, ids = cells[order], ids[order]
+        starts = np.flatnonzero(np.concatenate(([True], np.any(cells[1:] != cells[:-1], axis=1))))
+        stops = np.append(starts[1:], len(ids))
+        for start, stop, cell in zip(starts.tolist(), stops.tolist(), map(tuple, cells[starts].tolist())):
+            yield cell, ids[start:stop].tolist()
+
+    def insert(self, ids, coordinates):
+        """Adds points given by an (N,) array of ids and their (N, 2) coordinates."""
+        for cell, members in self.grouped(ids, coordinates):
+            bucket = self.cells.setdefault(cell, set())
+            size = len(bucket)
+            bucket.update(members)
+            self.count += len(bucket) - size
+
+    def remove(self, ids, coordinates):
+        """Removes points given by their ids and the coordinates they were indexed at."""
+        for cell, members in self.grouped(ids, coordinates):
+            bucket = self.cells.get(cell)
+            if bucket is None:
+                continue
+            size = len(bucket)
+            bucket.difference_update(members)
+            self.count -= size - len(bucket)
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, ids, old_coordinates, new_coordinates):
+        """Moves points to new coordinates; only those that change cells are touched."""
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        changed = np.any(self.cell_of(old_coordinates) != self.cell_of(new_coordinates), axis=1)
+        if changed.any():
+            self.remove(ids[changed], np.asarray(old_coordinates, dtype=np.float64).reshape(-1, 2)[changed])
+            self.insert(ids[changed], np.asarray(new_coordinates, dtype=np.float64).reshape(-1, 2)[changed])
+
+    def clear(self):
+        self.cells = {}
+        self.count = 0
+
+    def candidates(self, x0, y0, x1, y1):
+        """Returns the ids of the points in the cells overlapping a rectangle, a superset of those inside it."""
+        (left, top), (right, bottom) = self.cell_of([[min(x0, x1), min(y0, y1)], [max(x0, x1), max(y0, y1)]])
+        if (right - left + 1) * (bottom - top + 1) <= len(self.cells):
+            buckets = (self.cells.get((x, y), ()) for x in range(left, right + 1) for y in range(top, bottom + 1))
+        else:  # A rectangle wider than the occupied cells: visit those instead
+            buckets = (bucket for (x, y), bucket in self.cells.items() if left <= x <= right and top <= y <= bottom)
+        return np.fromiter(chain.from_iterable(buckets), dtype=np.int64)
+
+
+def points_in_polygon(points, polygon):
+    """Returns a boolean mask of the (N, 2) points inside a closed (M, 2) polygon, by the even-odd rule.
+
+    The loop runs over the polygon's edges, each tested against every point at once.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    polygon = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    inside = np.zeros(len(points), dtype=bool)
+    if len(polygon) < 3:
+        return inside
+    x, y = points[:, 0], points[:, 1]
+    for (x1, y1), (x2, y2) in zip(polygon, np.roll(polygon, -1, axis=0)):
+        crosses = (y1 > y) != (y2 > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            at = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < at)
+    return inside
@@ -0,0 +1,103 @@
+from PyQt5.QtCore import QPointF
+from PyQt5.QtWidgets import QDialog
+from point import Coordinates, Point
+from ui.calibration_dialog import CalibrationDialog
+import numpy as np
+
+
+class CalibrationController:
+    """Drives the interactive calibration dialogs on top of the Qt-free Calibration core."""
+
+    def __init__(self, calibration, main_window):
+        self.calibration = calibration
+        self.main_window = main_window
+        self.automatic_calibration_mode = False
+        self.calibration_cancelled = False
+        self.quads = np.empty((0, 4, 2))  # Ranked candidate quads, best first
+        self.quad_index = 0
+
+    def add_calibration_point(self, point: QPointF, automatic=False):
+        """Adds a calibration point and triggers dialog for real coordinates input."""
+        calibration_points = self.calibration.calibration_points
+        if len(calibration_points) < 4:  # Allow selecting 4 calibration points
+            point_obj = Point(point, point_type='calibration')
+            calibration_points.append(point_obj)
+
+            self.main_window.image_view.highlight_point(point_obj)
+            self.main_window.image_view.update_scene()
+            dialog = CalibrationDialog(self.main_window, automatic_calibration=automatic)
+            dialog.setWindowTitle(f"Enter Real Coordinates for Point {len(calibration_points)}")
+            result = dialog.exec()
+            if result == QDialog.Accepted:
+                real_x, real_y = dialog.real_coordinates
+                point_obj.set_real_coordinates(Coordinates(real_x, real_y))
+                self.main_window.image_view.delete_highlight(point_obj)
+                self.main_window.image_view.draw_calibration_points(calibration_points)
+                if len(calibration_points) == 4:  # Calculate, refine transformation matrix
+                    self.calibration.calculate_transformation_matrix()
+                    self.calibration.refine_calibration()
+            elif result == 1000:  # Next point
+                calibration_points.pop()
+                self.main_window.image_view.delete_highlight(point_obj)
+                new_point = self.select_next_point()
+                if new_point is not None and not self.calibration_cancelled:
+                    self.add_calibration_point(new_point, automatic=True)
+            else:
+                calibration_points.pop()
+                self.main_window.image_view.delete_highlight(point_obj)
+                if automatic:
+                    self.calibration_cancelled = True  # Mark calibration as cancelled
+                    self.calibration.clear_calibration_points()
+
+    def automatic_calibration(self, image, image_key=None):
+        """Automatically calibrates the image using enhanced corner detection."""
+        print("Starting automatic calibration...")
+        corners, lines = self.calibration.cached_features(image, image_key)
+        self.calibration.set_detected_corners(corners)
+        self.calibrate_from_corners(corners, image.shape, lines)
+
+    def calibrate_from_corners(self, corners, image_shape=None, lines=None):
+        """Runs the automatic calibration dialogs on an (N, 2) array of already detected corners.
+
+        The points are offered from the best-ranked quad first, bottom-left, bottom-right,
+        top-left then top-right; "Next Point" moves on to the next-ranked quad that agrees
+        with the points accepted so far.
+        """
+        self.automatic_calibration_mode = True
+        self.calibration_cancelled = False  # Reset cancellation flag
+
+        self.quads, _ = self.calibration.rank_quads(corners, image_shape, lines)
+        self.quad_index = 0
+        if len(self.quads):
+            self.calibration.calibration_points = []
+            while len(self.calibration.calibration_points) < 4 and not self.calibration_cancelled:
+                x, y = self.quads[self.quad_index][len(self.calibration.calibration_points)]
+                self.add_calibration_point(QPointF(x, y), automatic=True)
+            if len(self.calibration.calibration_points) == 4:
+                self.calibration.calculate_transformation_matrix()
+            else:
+                self.calibration.clear_calibration_points()
+        else:
+            print("Not enough corners detected for calibration.")
+        self.automatic_calibration_mode = False
+
+    def select_next_point(self):
+        """Returns the point for the current slot from the next-ranked quad that keeps the accepted points.
+
+        Candidates come from the ranked quads, so cycling through them is a lookup, not a new
+        detection run, and wraps around after the last one.
+        """
+        slot = len(self.calibration.calibration_points)
+        if not len(self.quads) or slot >= 4:
+            return None
+        accepted = np.array([[p.get_image_coordinates().x(), p.get_image_coordinates().y()]
+                             for p in self.calibration.calibration_points]).reshape(-1, 2)
+        current = self.quads[self.quad_index][slot]
+        count = len(self.quads)
+        for offset in range(1, count + 1):
+            index = (self.quad_index + offset) % count
+            quad = self.quads[index]
+            if np.allclose(quad[:slot], accepted) and (offset == count or not np.allclose(quad[slot], current)):
+                self.quad_index = index
+                return QPointF(*quad[slot])
+        return None
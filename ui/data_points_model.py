@@ -0,0 +1,168 @@
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+import numpy as np
+from point import Point, PointSet
+
+
+def contiguous_runs(rows):
+    """Splits a sorted array of row numbers into (first, last) runs of consecutive rows."""
+    if len(rows) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+    return [(int(run[0]), int(run[-1])) for run in np.split(rows, breaks)]
+
+
+class DataPointsModel(QAbstractTableModel):
+    """Table model over the data and interpolated point sets, formatting only the rows a view asks for.
+
+    The model keeps a snapshot of each point set's ids and coordinates. ``set_point_sets`` diffs the
+    snapshot against the live sets by point id and emits row insertions, removals and
+    ``dataChanged`` for just the affected rows. While sorted, or when a change is scattered over
+    more than ``MAX_RUNS`` runs of rows (e.g. a bulk delete of a lasso selection), the model is
+    reset instead, as each run would cost a pass over the snapshot.
+    """
+    MAX_RUNS = 64
+    HEADERS = ('Point', 'Image X', 'Image Y', 'Real X', 'Real Y')
+    LABELS = ('Data Point', 'Interpolated Point')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sources = [None, None]
+        self.no_points = PointSet()  # Stands in for a missing interpolated set, so it never looks changed
+        self.versions = [None, None]
+        self.ids = [np.empty(0, dtype=np.int64) for _ in self.LABELS]
+        self.values = [np.empty((0, 4)) for _ in self.LABELS]  # image x, image y, real x, real y
+        self.sort_column = None
+        self.sort_order = Qt.AscendingOrder
+        self.order = None  # Row permutation while sorted
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ids[0]) + len(self.ids[1])
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        section, row = self.locate(index.row())
+        if role == Qt.DisplayRole:
+            if index.column() == 0:
+                return f"{self.LABELS[section]} {row + 1}"
+            value = self.values[section][row, index.column() - 1]
+            return "None" if value != value else f"{value:.2f}"  # NaN marks unknown real coordinates
+        if role == Qt.UserRole:
+            return Point.view(self.sources[section], int(self.ids[section][row]))
+        return None
+
+    def locate(self, row):
+        """Maps a model row to its (section, index within the section)."""
+        if self.order is not None:
+            row = int(self.order[row])
+        data_count = len(self.ids[0])
+        return (0, row) if row < data_count else (1, row - data_count)
+
+    def point_at(self, row):
+        """Returns a view onto the point shown in a model row."""
+        return self.data(self.index(row, 0), Qt.UserRole)
+
+    def set_point_sets(self, data_points, interpolated_points=None):
+        """Points the model at new point sets and emits the changes since the last call."""
+        sources = (data_points, interpolated_points if interpolated_points is not None else self.no_points)
+        changed = [source is not self.sources[section] or source.version != self.versions[section]
+                   for section, source in enumerate(sources)]
+        if not any(changed):
+            return
+        if self.order is not None or any(changed[section] and self.run_count(section, source) > self.MAX_RUNS
+                                         for section, source in enumerate(sources)):
+            self.beginResetModel()
+            for section, source in enumerate(sources):
+                self.take_snapshot(section, source)
+            self.order = self.sorted_order()
+            self.endResetModel()
+            return
+        for section, source in enumerate(sources):
+            if changed[section]:
+                self.sync_section(section, source)
+
+    def run_count(self, section, source):
+        """Returns how many runs of rows were removed from or inserted into a section's point set."""
+        if source is not self.sources[section]:
+            return 0
+        removed = ~np.isin(self.ids[section], source.ids)
+        inserted = ~np.isin(source.ids, self.ids[section])
+        return (np.count_nonzero(np.diff(removed.view(np.int8)) == 1) + bool(len(removed) and removed[0]) +
+                np.count_nonzero(np.diff(inserted.view(np.int8)) == 1) + bool(len(inserted) and inserted[0]))
+
+    def take_snapshot(self, section, source):
+        """Copies the ids and coordinates of a point set into a section's snapshot."""
+        self.ids[section] = source.ids.copy()
+        self.values[section] = np.hstack((source.image_coordinates, source.real_coordinates))
+        self.sources[section] = source
+        self.versions[section] = source.version
+
+    def sync_section(self, section, source):
+        """Emits the row-level changes between a section's snapshot and its live point set."""
+        offset = 0 if section == 0 else len(self.ids[0])
+        if source is not self.sources[section]:
+            if len(self.ids[section]):
+                self.beginRemoveRows(QModelIndex(), offset, offset + len(self.ids[section]) - 1)
+                self.ids[section] = np.empty(0, dtype=np.int64)
+                self.values[section] = np.empty((0, 4))
+                self.endRemoveRows()
+            if len(source):
+                self.beginInsertRows(QModelIndex(), offset, offset + len(source) - 1)
+                self.take_snapshot(section, source)
+                self.endInsertRows()
+            else:
+                self.take_snapshot(section, source)
+            return
+
+        removed = np.flatnonzero(~np.isin(self.ids[section], source.ids))
+        for first, last in reversed(contiguous_runs(removed)):
+            self.beginRemoveRows(QModelIndex(), offset + first, offset + last)
+            self.ids[section] = np.delete(self.ids[section], np.s_[first:last + 1])
+            self.values[section] = np.delete(self.values[section], np.s_[first:last + 1], axis=0)
+            self.endRemoveRows()
+
+        # Ids only ever grow, so the surviving rows keep their order and new rows slot in by position
+        inserted = np.flatnonzero(~np.isin(source.ids, self.ids[section]))
+        for first, last in contiguous_runs(inserted):
+            rows = np.s_[first:last + 1]
+            values = np.hstack((source.image_coordinates[rows], source.real_coordinates[rows]))
+            self.beginInsertRows(QModelIndex(), offset + first, offset + last)
+            self.ids[section] = np.insert(self.ids[section], first, source.ids[rows])
+            self.values[section] = np.insert(self.values[section], first, values, axis=0)
+            self.endInsertRows()
+
+        old_values = self.values[section]
+        self.take_snapshot(section, source)
+        new_values = self.values[section]
+        same = (old_values == new_values) | (np.isnan(old_values) & np.isnan(new_values))
+        for first, last in contiguous_runs(np.flatnonzero(~same.all(axis=1))):
+            self.dataChanged.emit(self.index(offset + first, 0), self.index(offset + last, len(self.HEADERS) - 1))
+        if len(removed) and len(source) > removed[0]:  # Rows after a removal are renumbered
+            self.dataChanged.emit(self.index(offset + int(removed[0]), 0), self.index(offset + len(source) - 1, 0))
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sorts the rows by a column; the point column restores the natural order."""
+        self.layoutAboutToBeChanged.emit()
+        self.sort_column = column if column > 0 else None
+        self.sort_order = order
+        self.order = self.sorted_order()
+        self.layoutChanged.emit()
+
+    def sorted_order(self):
+        """Returns the row permutation for the current sort column, with unknown values last."""
+        if self.sort_column is None:
+            return None
+        keys = np.concatenate([values[:, self.sort_column - 1] for values in self.values])
+        order = np.argsort(keys, kind='stable')
+        if self.sort_order == Qt.DescendingOrder:
+            known = order[~np.isnan(keys[order])]
+            order = np.concatenate((known[::-1], order[np.isnan(keys[order])]))
+        return order
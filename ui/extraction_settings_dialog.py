@@ -0,0 +1,82 @@
+from PyQt5.QtWidgets import (QComboBox, QDialog, QDoubleSpinBox, QFormLayout, QHBoxLayout, QPushButton, QSpinBox,
+                             QVBoxLayout)
+
+
+class ExtractionSettingsDialog(QDialog):
+    """Dialog to choose the blob extraction backend and its filters for automatic point detection."""
+
+    def __init__(self, extraction, parent=None):
+        super().__init__(parent)
+        self.extraction = extraction
+        self.initUI()
+
+    def initUI(self):
+        """Initializes the UI components from the current settings."""
+        self.setWindowTitle("Point Detection Settings")
+        extraction = self.extraction
+
+        self.backend_input = QComboBox()
+        self.backend_input.addItem("Contours", 'contours')
+        self.backend_input.addItem("Connected components (faster on noisy scans)", 'components')
+        self.backend_input.setCurrentIndex(extraction.BACKENDS.index(extraction.backend))
+        self.backend_input.currentIndexChanged.connect(self.update_enabled)
+
+        # Areas are contour areas in both backends, so switching keeps comparable results
+        self.min_area_input = self.spin_box(extraction.min_area, 0)
+        self.max_area_input = self.spin_box(extraction.max_area)
+        self.min_size_input = self.spin_box(extraction.min_size)
+        self.max_size_input = self.spin_box(extraction.max_size)
+        self.max_aspect_input = QDoubleSpinBox()
+        self.max_aspect_input.setRange(0.0, 1000.0)
+        self.max_aspect_input.setSingleStep(0.5)
+        self.max_aspect_input.setSpecialValueText("Off")
+        self.max_aspect_input.setValue(extraction.max_aspect or 0.0)
+
+        form = QFormLayout()
+        form.addRow("Backend:", self.backend_input)
+        form.addRow("Minimum area (px²):", self.min_area_input)
+        form.addRow("Maximum area (px²):", self.max_area_input)
+        form.addRow("Minimum side (px):", self.min_size_input)
+        form.addRow("Maximum side (px):", self.max_size_input)
+        form.addRow("Maximum aspect ratio:", self.max_aspect_input)
+
+        button_layout = QHBoxLayout()
+        ok_button = QPushButton("OK")
+        cancel_button = QPushButton("Cancel")
+        ok_button.clicked.connect(self.accept)
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(ok_button)
+        button_layout.addWidget(cancel_button)
+
+        layout = QVBoxLayout()
+        layout.addLayout(form)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+        self.update_enabled()
+
+    @staticmethod
+    def spin_box(value, minimum=None):
+        """Returns a spin box for a pixel filter; without a ``minimum`` its lowest value, 0, turns the filter off."""
+        box = QSpinBox()
+        box.setRange(0 if minimum is None else minimum, 10 ** 8)
+        if minimum is None:
+            box.setSpecialValueText("Off")
+        box.setValue(value or 0)
+        return box
+
+    def update_enabled(self):
+        """Only the 'components' backend applies the filters other than the minimum area."""
+        components = self.backend_input.currentData() == 'components'
+        for box in (self.max_area_input, self.min_size_input, self.max_size_input, self.max_aspect_input):
+            box.setEnabled(components)
+
+    def settings(self):
+        """Returns the chosen backend and filters as keyword arguments of DataExtraction.set_blob_filters."""
+        return {
+            'backend': self.backend_input.currentData(),
+            'min_area': self.min_area_input.value(),
+            'max_area': self.max_area_input.value() or None,
+            'min_size': self.min_size_input.value() or None,
+            'max_size': self.max_size_input.value() or None,
+            'max_aspect': self.max_aspect_input.value() or None,
+        }
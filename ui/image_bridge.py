@@ -0,0 +1,53 @@
+from PyQt5 import sip
+from PyQt5.QtGui import QImage
+import cv2
+import numpy as np
+
+
+class ImageBridge:
+    """Wraps NumPy images as QImages without intermediate copies.
+
+    Colour images are converted from BGR straight into a persistent RGB buffer with
+    ``cv2.cvtColor(dst=...)``; one buffer is kept per image size, so repeated conversions of
+    same-sized images (such as tiles) allocate nothing. Grayscale images with contiguous pixels
+    are wrapped in place using their real row stride. The returned QImage is only valid until the next call.
+    """
+
+    MAX_BUFFERS = 8
+
+    def __init__(self):
+        self.buffers = {}  # shape -> persistent uint8 buffer
+        self.source = None  # Keeps a wrapped array alive while its QImage is in use
+
+    def to_qimage(self, image):
+        """Returns a QImage over the image data, converting colour images into the persistent buffer."""
+        if image.dtype != np.uint8:
+            raise ValueError(f"Unsupported pixel type {image.dtype}; only 8-bit images can be displayed.")
+        height, width = image.shape[:2]
+        if image.ndim == 3:
+            buffer = self.buffer((height, width, 3))
+            cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=buffer)
+            return self.wrap(buffer, QImage.Format_RGB888)
+        if image.ndim == 2:
+            if image.strides[1] != image.itemsize:  # Pixels must be adjacent within a row
+                buffer = self.buffer((height, width))
+                np.copyto(buffer, image)
+                image = buffer
+            return self.wrap(image, QImage.Format_Grayscale8)
+        raise ValueError("Unsupported image format")
+
+    def buffer(self, shape):
+        """Returns the persistent buffer for a shape, allocating it on first use."""
+        buffer = self.buffers.get(shape)
+        if buffer is None:
+            if len(self.buffers) >= self.MAX_BUFFERS:
+                self.buffers.clear()
+            buffer = self.buffers[shape] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def wrap(self, array, image_format):
+        """Wraps an array whose rows may be padded, honouring its row stride."""
+        self.source = array
+        height, width = array.shape[:2]
+        address = sip.voidptr(array.__array_interface__['data'][0])
+        return QImage(address, width, height, array.strides[0], image_format)
@@ -1,11 +1,32 @@
-from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QGraphicsEllipseItem, QLabel, QInputDialog, QMenu, QRubberBand, QApplication, QGraphicsLineItem, QGraphicsRectItem
-from PyQt5.QtGui import QPixmap, QImage, QPen, QBrush, QFont, QColor, QPainter
+from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QGraphicsEllipseItem, QLabel, QInputDialog, QMenu, QRubberBand, QApplication, QGraphicsPathItem, QGraphicsRectItem
+from PyQt5.QtGui import QPixmap, QImage, QPen, QBrush, QFont, QColor, QPainter, QPainterPath, QPolygonF, QTransform
 from PyQt5.QtCore import Qt, QPointF, QRectF, QRect, QSize
 import numpy as np
-from point import Point
+from point import Point, PointSet
+from ui.point_layer import PointLayer
+from ui.tiled_image_item import TiledImageItem
 import calibration.calibration
+
+
+def array_to_polygon(points):
+    """Builds a QPolygonF from an (N, 2) float array by copying straight into its buffer."""
+    points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+    polygon = QPolygonF(len(points))
+    if len(points):
+        buffer = polygon.data()
+        buffer.setsize(points.nbytes)
+        np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)[:] = points
+    return polygon
+
+
 class ImageView(QGraphicsView):
-    """Class to handle displaying images and interacting with points on the image."""
+    """Class to handle displaying images and interacting with points on the image.
+
+    Clicks, rubber band and lasso selections are resolved with the spatial queries of the point
+    sets rather than by scanning scene items, so they stay interactive with many points.
+    """
+
+    HIT_RADIUS = 3  # Image pixels within which a click picks a point
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -15,10 +36,30 @@ class ImageView(QGraphicsView):
         self.pixmap_item = None
         self.zoom_factor = 1
         self.main_window = parent
-        self.calibration_points_graphics = []
-        self.data_points_graphics = []
-        self.interpolated_points_graphics = []
-        self.detected_points_graphics = []
+        self.highlight_layer = PointLayer(self.scene, 5, QPen(Qt.yellow), QBrush(Qt.yellow), z_value=1)
+        self.detected_points_layer = PointLayer(self.scene, 2, QPen(Qt.green), QBrush(Qt.green), z_value=2)
+        self.detected_corners_layer = PointLayer(self.scene, 1.5, QPen(Qt.green), QBrush(Qt.green), z_value=2)
+        self.data_points_layer = PointLayer(self.scene, 3, QPen(Qt.blue), QBrush(Qt.blue), z_value=3)
+        self.calibration_points_layer = PointLayer(self.scene, 3, QPen(Qt.red), QBrush(Qt.red), z_value=3, labels=True)
+        self.perspective_points_layer = PointLayer(self.scene, 5, QPen(Qt.red), QBrush(Qt.red), z_value=3)
+        self.interpolated_curve = QGraphicsPathItem()  # One polyline for the whole interpolated series
+        self.interpolated_curve.setPen(QPen(Qt.green, 2))
+        self.interpolated_curve.setZValue(2)
+        self.scene.addItem(self.interpolated_curve)
+        self.confidence_band = QGraphicsPathItem()  # One filled polygon between the lower and upper bounds
+        self.confidence_band.setPen(QPen(Qt.NoPen))
+        self.confidence_band.setBrush(QBrush(QColor(255, 0, 0, 64)))
+        self.confidence_band.setZValue(1)
+        self.scene.addItem(self.confidence_band)
+        self.plot_area = QGraphicsRectItem()  # Outline of the region of interest, hidden without one
+        plot_area_pen = QPen(QColor(255, 128, 0), 2, Qt.DashLine)
+        plot_area_pen.setCosmetic(True)
+        self.plot_area.setPen(plot_area_pen)
+        self.plot_area.setZValue(1)
+        self.plot_area.setVisible(False)
+        self.scene.addItem(self.plot_area)
+        self.interpolated_source = None
+        self.interpolated_version = None
         self.highlighted_points = []
         self.perspective_points = []
         self.info_label = QLabel(self)
@@ -34,34 +75,44 @@ class ImageView(QGraphicsView):
         self.selected_items = []
         self.dragging = False
         self.drag_start_position = None
+        self.lasso_points = None  # Scene positions of the lasso being drawn with Shift held
+        self.lasso = QGraphicsPathItem()
+        lasso_pen = QPen(Qt.yellow, 1, Qt.DashLine)
+        lasso_pen.setCosmetic(True)
+        self.lasso.setPen(lasso_pen)
+        self.lasso.setZValue(4)
+        self.scene.addItem(self.lasso)
 
         # Magnifier tool
         self.magnifier = QGraphicsRectItem()
         self.magnifier.setRect(0, 0, 20, 20)
         self.magnifier.setPen(QPen(Qt.green, 2))
         self.magnifier.setVisible(False)
+        self.magnifier.setZValue(4)
         self.scene.addItem(self.magnifier)
+        self.magnifier_content = QGraphicsPixmapItem(self.magnifier)
+        self.magnifier_content.setOpacity(0.5)
 
-    def set_image(self, image):
-        """Sets and displays the given image in the view."""
-        if len(image.shape) == 3:
-            height, width, channel = image.shape
-            bytes_per_line = 3 * width
-            q_image = QImage(image.data, width, height, bytes_per_line, QImage.Format_RGB888).rgbSwapped()
-        elif len(image.shape) == 2:
-            height, width = image.shape
-            bytes_per_line = width
-            q_image = QImage(image.data, width, height, bytes_per_line, QImage.Format_Grayscale8)
-        else:
-            raise ValueError("Unsupported image format")
+    def set_image(self, image, changed_rect=None, scale=(1.0, 1.0)):
+        """Sets and displays the given image in the view.
 
-        self.pixmap = QPixmap.fromImage(q_image)
+        ``changed_rect`` is an optional (x, y, width, height) region; when the size is unchanged
+        only the tiles covering it are rebuilt. ``scale`` is the (x, y) size of a preview proxy
+        relative to the full-resolution image; the proxy is stretched back so scene coordinates stay in
+        full-resolution pixels and points need no remapping.
+        """
         if self.pixmap_item is None:
-            self.pixmap_item = QGraphicsPixmapItem(self.pixmap)
+            self.pixmap_item = TiledImageItem()
+            self.pixmap_item.set_image(image)
+            self.pixmap_item.setTransform(QTransform.fromScale(1 / scale[0], 1 / scale[1]))
             self.scene.addItem(self.pixmap_item)
-            self.fitInView(self.pixmap_item, Qt.KeepAspectRatio)
+            self.reset_view()
         else:
-            self.pixmap_item.setPixmap(self.pixmap)
+            old_size = self.pixmap_item.sceneBoundingRect().size()
+            self.pixmap_item.set_image(image, changed_rect)
+            self.pixmap_item.setTransform(QTransform.fromScale(1 / scale[0], 1 / scale[1]))
+            if self.pixmap_item.sceneBoundingRect().size() != old_size:
+                self.reset_view()  # A differently sized image is a new canvas, so refit it once
         self.update_scene()
 
     def wheelEvent(self, event):
@@ -78,17 +129,19 @@ class ImageView(QGraphicsView):
             self.origin = event.pos()
             if not event.modifiers() & Qt.ControlModifier:
                 self.clear_selection()
-            if self.selection_mode:
+            if self.selection_mode and event.modifiers() & Qt.ShiftModifier and not self.main_window.plot_area_mode:
+                self.lasso_points = [self.mapToScene(event.pos())]
+            elif self.selection_mode:
                 self.rubber_band.setGeometry(QRect(self.origin, QSize()))
                 self.rubber_band.show()
             else:
                 scene_pos = self.mapToScene(event.pos())
-                if self.pixmap_item and self.pixmap_item.contains(scene_pos):
+                if self.pixmap_item and self.pixmap_item.contains(self.pixmap_item.mapFromScene(scene_pos)):
                     if self.main_window.calibration_mode:
-                        self.main_window.calibration.add_calibration_point(scene_pos)
+                        self.main_window.calibration_controller.add_calibration_point(scene_pos)
                         self.update_scene()
                     elif self.main_window.extraction_mode:
-                        self.main_window.extraction.add_data_point(scene_pos)
+                        self.main_window.extraction.add_data_point((scene_pos.x(), scene_pos.y()))
                         self.update_scene()
                     elif self.main_window.perspective_mode:
                         self.add_perspective_point(scene_pos)
@@ -100,13 +153,15 @@ class ImageView(QGraphicsView):
                             self.main_window.update_perspective_info()
                         self.update_scene()
                     elif self.main_window.feature_detection_mode:
-                        for point in self.main_window.extraction.temp_points:
-                            if point.x() - 3 <= scene_pos.x() <= point.x() + 3 and \
-                                    point.y() - 3 <= scene_pos.y() <= point.y() + 3:
-                                self.main_window.extraction.add_data_point(point)
-                                self.main_window.show_data_points()
-                                self.update_scene()
-                                break
+                        # Snap to the nearest detected point
+                        detected = self.main_window.extraction.temp_points
+                        row = detected.nearest(scene_pos.x(), scene_pos.y(), self.HIT_RADIUS)
+                        if row >= 0:
+                            self.main_window.extraction.add_data_point(detected.image_coordinates[row])
+                            self.main_window.show_data_points()
+                            self.update_scene()
+                    elif self.main_window.curve_tracing_mode:
+                        self.main_window.trace_curve_at(scene_pos)
         elif event.button() == Qt.RightButton:
             self.origin = event.pos()
             scene_pos = self.mapToScene(event.pos())
@@ -118,14 +173,19 @@ class ImageView(QGraphicsView):
                 self.selected_items = []
 
     def mouseMoveEvent(self, event):
-        if self.selection_mode and not self.rubber_band.isHidden():
+        if self.lasso_points is not None:
+            self.lasso_points.append(self.mapToScene(event.pos()))
+            path = QPainterPath()
+            path.addPolygon(QPolygonF(self.lasso_points))
+            self.lasso.setPath(path)
+        elif self.selection_mode and not self.rubber_band.isHidden():
             self.rubber_band.setGeometry(QRect(self.origin, event.pos()).normalized())
         elif self.selected_items and self.drag_start_position and (
                 event.pos() - self.drag_start_position).manhattanLength() > QApplication.startDragDistance():
             self.dragging = True
             new_pos = self.mapToScene(event.pos())
             for item in self.selected_items:
-                item.setPos(new_pos - item.boundingRect().center())
+                item.setPos(new_pos)
                 point = item.data(0)
                 if point:
                     point.set_image_coordinates(new_pos)
@@ -134,19 +194,23 @@ class ImageView(QGraphicsView):
             self.update_magnifier(event)
 
     def mouseReleaseEvent(self, event):
-        if self.selection_mode and event.button() == Qt.LeftButton:
+        if self.lasso_points is not None and event.button() == Qt.LeftButton:
+            polygon = np.array([(point.x(), point.y()) for point in self.lasso_points])
+            self.lasso_points = None
+            self.lasso.setPath(QPainterPath())
+            self.clear_selection()
+            self.select_points(lambda point_set: point_set.rows_in_polygon(polygon))
+        elif self.selection_mode and event.button() == Qt.LeftButton:
             self.rubber_band.hide()
             rect = self.rubber_band.geometry()
             selection_rect = self.mapToScene(rect).boundingRect()
-            selected_items = self.scene.items(selection_rect)
+            if self.main_window.plot_area_mode:
+                if self.pixmap_item:
+                    self.main_window.set_plot_area_from_rect(selection_rect)
+                return
             self.clear_selection()
-            for item in selected_items:
-                if isinstance(item, QGraphicsEllipseItem):
-                    point = item.data(0)
-                    if isinstance(point, Point):
-                        self.highlight_point(point)
-                        self.selected_items.append(item)
-            self.update_scene()
+            self.select_points(lambda point_set: point_set.rows_in_rect(
+                selection_rect.left(), selection_rect.top(), selection_rect.right(), selection_rect.bottom()))
         elif event.button() == Qt.RightButton:
             self.selected_items = []
             self.dragging = False
@@ -165,189 +229,159 @@ class ImageView(QGraphicsView):
     def update_magnifier_content(self, scene_pos):
         """Updates the content inside the magnifier."""
         if self.pixmap_item:
-            pixmap = self.pixmap_item.pixmap()
             rect = self.magnifier.rect()
-            magnified_image = pixmap.copy(rect.toRect()).scaled(rect.width() * 2, rect.height() * 2, Qt.KeepAspectRatio)
-            painter = QPainter(self.pixmap_item.pixmap())
-            painter.setOpacity(0.5)
-            painter.drawPixmap(rect.topLeft(), magnified_image)
-            painter.end()
+            # The image item is scaled down in preview mode, so the scene rectangle is mapped to its pixels
+            region = self.pixmap_item.mapRectFromScene(rect).toAlignedRect()
+            magnified_image = self.pixmap_item.region_pixmap(region).scaled(
+                int(rect.width() * 2), int(rect.height() * 2), Qt.KeepAspectRatio)
+            self.magnifier_content.setPixmap(magnified_image)
+            self.magnifier_content.setPos(rect.topLeft())
         self.update()
 
+    def select_points(self, select_rows):
+        """Selects and highlights, in one update, the data and detected points picked by a query.
+
+        ``select_rows(point_set)`` returns the rows of a point set to select, e.g. with
+        PointSet.rows_in_rect.
+        """
+        main_window = self.main_window
+        points = []
+        for point_set, layer in ((main_window.extraction.data_points, self.data_points_layer),
+                                 (main_window.extraction.temp_points, self.detected_points_layer)):
+            if layer.source is not point_set or not len(point_set):
+                continue  # Only points that are drawn can be selected
+            for point_id in point_set.ids[select_rows(point_set)].tolist():
+                item = layer.items.get(point_id)
+                if item is not None:
+                    self.selected_items.append(item)
+                    points.append(item.data(0))
+        self.highlight_points(points)
+
     def clear_selection(self):
         """Clears the current selection."""
-        for item in self.selected_items:
-            point = item.data(0)
-            if isinstance(point, Point):
-                self.delete_highlight(point)
+        self.delete_highlights([item.data(0) for item in self.selected_items if isinstance(item.data(0), Point)])
         self.selected_items = []
         self.update()
 
     def add_perspective_point(self, point):
         """Adds a point for perspective correction."""
-        ellipse = QGraphicsEllipseItem(point.x() - 5, point.y() - 5, 10, 10)
-        ellipse.setBrush(QBrush(Qt.red))
-        ellipse.setPen(QPen(Qt.red))
-        self.scene.addItem(ellipse)
         self.perspective_points.append(point)
+        self.perspective_points_layer.sync_points(self.perspective_points)
         self.update()
 
     def clear_perspective_points(self):
         """Clears all perspective points from the image."""
-        for point in self.perspective_points:
-            items = self.scene.items(QRectF(point.x() - 5, point.y() - 5, 10, 10))
-            for item in items:
-                if isinstance(item, QGraphicsEllipseItem):
-                    self.scene.removeItem(item)
         self.perspective_points = []
+        self.perspective_points_layer.clear()
         self.update_scene()
     def draw_calibration_points(self, calibration_points):
-        """Draws calibration points on the image."""
-        for point_graphic in self.calibration_points_graphics:
-            self.scene.removeItem(point_graphic)
-        self.calibration_points_graphics = []
-        for i, point in enumerate(calibration_points):
-            coords = point.get_image_coordinates()
-            x = coords.x()
-            y = coords.y()
-            point_graphic = self.scene.addEllipse(x - 3, y - 3, 6, 6, QPen(Qt.red), QBrush(Qt.red))
-            text = self.scene.addText(str(i + 1), QFont('Arial', 10))
-            text.setPos(x + 5, y - 10)
-            text.setDefaultTextColor(Qt.red)
-            self.calibration_points_graphics.append(point_graphic)
-            self.calibration_points_graphics.append(text)
+        """Draws numbered calibration points on the image."""
+        self.calibration_points_layer.sync_points(calibration_points)
         self.update()
 
     def draw_detected_corners(self, corners):
-        """Draws detected corners on the image."""
-        for point_graphic in self.detected_points_graphics:
-            self.scene.removeItem(point_graphic)
-        self.detected_points_graphics = []
-        for corner in corners:
-            x = corner.x()
-            y = corner.y()
-            point_graphic = self.scene.addEllipse(x - 1.5, y - 1.5, 3, 3, QPen(Qt.green), QBrush(Qt.green))
-            self.detected_points_graphics.append(point_graphic)
+        """Draws an (N, 2) array of detected corners on the image."""
+        corners = np.asarray(corners, dtype=np.float64).reshape(-1, 2)
+        self.detected_corners_layer.sync(np.arange(len(corners)), corners)
+        self.update()
+
+    def draw_plot_area(self, roi):
+        """Outlines the region of interest, or hides the outline when ``roi`` is None."""
+        if roi is not None:
+            self.plot_area.setRect(QRectF(roi.x, roi.y, roi.width, roi.height))
+        self.plot_area.setVisible(roi is not None)
         self.update()
 
     def draw_data_points(self, data_points):
         """Draws data points on the image."""
-        for point_graphic in self.data_points_graphics:
-            self.scene.removeItem(point_graphic)
-        self.data_points_graphics = []
-        for point in data_points:
-            x = point.get_image_coordinates().x()
-            y = point.get_image_coordinates().y()
-            point_graphic = self.scene.addEllipse(x - 3, y - 3, 6, 6, QPen(Qt.blue), QBrush(Qt.blue))
-            point_graphic.setData(0, point)
-            self.data_points_graphics.append(point_graphic)
+        self.data_points_layer.sync_point_set(data_points)
         self.update()
 
     def draw_interpolated_points(self, points):
-        """Draws interpolated points on the image."""
-        pen = QPen(Qt.green, 4)
-        for point in points:
-            real_coords = point.get_real_coordinates()
-            image_coords = self.main_window.calibration.inverse_transform_point(real_coords.x(), real_coords.y())
-            ellipse = self.scene.addEllipse(image_coords.x() - 2,
-                                            image_coords.y() - 2,
-                                            4, 4, pen)
-            ellipse.setData(0, point)
+        """Draws the interpolated points as a single polyline, rebuilt only when the point set changes."""
+        if points is self.interpolated_source and points.version == self.interpolated_version:
+            return
+        path = QPainterPath()
+        path.addPolygon(array_to_polygon(points.image_coordinates))
+        self.interpolated_curve.setPath(path)
+        self.interpolated_source = points
+        self.interpolated_version = points.version
         self.update()
 
     def draw_confidence_intervals(self, x_new, lower_bound, upper_bound):
-        """Draws confidence intervals for the interpolated points."""
-        pen = QPen(QColor(255, 0, 0, 127), 2, Qt.SolidLine)
-        for x, y_low, y_high in zip(x_new, lower_bound, upper_bound):
-            low_point = self.main_window.calibration.inverse_transform_point(x, y_low)
-            high_point = self.main_window.calibration.inverse_transform_point(x, y_high)
-            line = QGraphicsLineItem(low_point.x(), low_point.y(), high_point.x(), high_point.y())
-            line.setPen(pen)
-            self.scene.addItem(line)
+        """Draws the confidence band of the interpolated points as a single filled polygon."""
+        x_new = np.asarray(x_new, dtype=np.float64)
+        calibration = self.main_window.calibration
+        low_points = calibration.real_to_image_array(np.column_stack((x_new, lower_bound)))
+        high_points = calibration.real_to_image_array(np.column_stack((x_new, upper_bound)))
+        path = QPainterPath()
+        path.addPolygon(array_to_polygon(np.concatenate((low_points, high_points[::-1]))))
+        path.closeSubpath()
+        self.confidence_band.setPath(path)
         self.update()
 
     def clear_interpolated_points(self):
-        """Clears interpolated points from the image."""
-        for item in self.scene.items():
-            if isinstance(item, QGraphicsEllipseItem) and item.pen().color() == Qt.green:
-                self.scene.removeItem(item)
-            if isinstance(item, QGraphicsLineItem) and item.pen().color() == QColor(255, 0, 0, 127):
-                self.scene.removeItem(item)
+        """Clears the interpolated curve and its confidence band from the image."""
+        self.interpolated_curve.setPath(QPainterPath())
+        self.confidence_band.setPath(QPainterPath())
+        self.interpolated_source = None
+        self.interpolated_version = None
         self.update()
 
     def draw_detected_points(self, detected_points):
         """Draws detected points on the image."""
-        for point_graphic in self.detected_points_graphics:
-            self.scene.removeItem(point_graphic)
-        self.detected_points_graphics = []
-        for point in detected_points:
-            if isinstance(point, QPointF):
-                x = point.x()
-                y = point.y()
-            else:
-                point_coords = point.get_image_coordinates()
-                x = point_coords.x()
-                y = point_coords.y()
-            point_graphic = self.scene.addEllipse(x - 2, y - 2, 4, 4, QPen(Qt.green), QBrush(Qt.green))
-            self.detected_points_graphics.append(point_graphic)
+        if isinstance(detected_points, PointSet):
+            self.detected_points_layer.sync_point_set(detected_points)
+        else:
+            self.detected_points_layer.sync_points(detected_points)
 
     def highlight_point(self, point):
         """Highlights a specific point by adding it to the highlighted points list."""
         self.highlighted_points.append(point)
         self.update_scene()
 
+    def highlight_points(self, points):
+        """Highlights several points with a single redraw."""
+        if points:
+            self.highlighted_points.extend(points)
+            self.draw_highlights()
+
     def draw_highlights(self):
         """Draws highlighted points on the image."""
-        for point in self.highlighted_points:
-            coords = point.get_image_coordinates()
-            ellipse = QGraphicsEllipseItem(coords.x() - 5, coords.y() - 5, 10, 10)
-            ellipse.setBrush(QBrush(Qt.yellow))
-            ellipse.setPen(QPen(Qt.yellow))
-            self.scene.addItem(ellipse)
+        self.highlight_layer.sync_points(self.highlighted_points)
         self.update()
 
     def delete_highlight(self, point):
         """Deletes a specific highlight from the image."""
-        new_highlighted_points = []
-        for highlighted_point in self.highlighted_points:
-            if highlighted_point != point:
-                new_highlighted_points.append(highlighted_point)
-            else:
-                coords = highlighted_point.get_image_coordinates()
-                items = self.scene.items(QRectF(coords.x() - 5, coords.y() - 5, 10, 10))
-                for item in items:
-                    if isinstance(item, QGraphicsEllipseItem):
-                        self.scene.removeItem(item)
-        self.highlighted_points = new_highlighted_points
+        self.highlighted_points = [highlighted_point for highlighted_point in self.highlighted_points
+                                   if highlighted_point != point]
         self.update_scene()
 
+    def delete_highlights(self, points):
+        """Deletes the highlights of several points in one pass."""
+        points = set(points)
+        if points:
+            self.highlighted_points = [point for point in self.highlighted_points if point not in points]
+            self.draw_highlights()
+
     def clear_highlights(self):
         """Clears all highlighted points from the image."""
-        for point in self.highlighted_points:
-            coords = point.get_image_coordinates()
-            items = self.scene.items(QRectF(coords.x() - 5, coords.y() - 5, 10, 10))
-            for item in items:
-                if isinstance(item, QGraphicsEllipseItem):
-                    self.scene.removeItem(item)
         self.highlighted_points = []
         self.update_scene()
 
     def clear_calibration_points(self):
         """Clears all calibration points from the image."""
-        for point_graphic in self.calibration_points_graphics:
-            self.scene.removeItem(point_graphic)
-        self.calibration_points_graphics = []
+        self.calibration_points_layer.clear()
         self.clear_highlights()
         self.update()
 
     def clear_detected_points(self):
-        """Clears all detected points from the scene."""
-        for point_graphic in self.detected_points_graphics:
-            self.scene.removeItem(point_graphic)
-        self.detected_points_graphics = []
+        """Clears all detected points and corners from the scene."""
+        self.detected_points_layer.clear()
+        self.detected_corners_layer.clear()
 
     def update_scene(self):
-        """Updates the scene with the current points and image."""
+        """Syncs the point layers with the current points; only the changed points touch the scene."""
         if self.main_window.feature_detection_mode:
             self.draw_detected_points(self.main_window.extraction.temp_points)
         else:
@@ -358,8 +392,6 @@ class ImageView(QGraphicsView):
         self.draw_data_points(self.main_window.extraction.data_points)
         self.draw_interpolated_points(self.main_window.interpolation.interpolated_points)
 
-        self.fitInView(self.sceneRect(), Qt.KeepAspectRatio)
-
     def show_info_label(self, text):
         """Displays an informational label."""
         self.info_label.setText(text)
@@ -387,7 +419,6 @@ class ImageView(QGraphicsView):
         """Deletes the selected data point."""
         point = item.data(0)
         if point:
-            self.scene.removeItem(item)
             self.main_window.extraction.data_points.remove(point)
             self.main_window.image_view.delete_highlight(point)
             self.update_scene()
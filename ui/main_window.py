@@ -1,10 +1,14 @@
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QAction, QFileDialog, QListWidget,
-                             QListWidgetItem, QInputDialog, QMessageBox, QToolTip, QVBoxLayout,
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QAction, QFileDialog, QTableView, QColorDialog, QDialog,
+                             QAbstractItemView, QInputDialog, QMessageBox, QToolTip, QVBoxLayout,
                              QHBoxLayout, QGridLayout, QWidget, QDockWidget, QStatusBar, QLabel, QPushButton,QGraphicsEllipseItem)
 from PyQt5.QtGui import QCursor, QFont, QPen, QIcon
 from PyQt5.QtCore import Qt, QPointF
 from ui.image_view import ImageView
-from image_processing import ImageProcessor
+from ui.calibration_controller import CalibrationController
+from ui.task_runner import TaskRunner
+from ui.data_points_model import DataPointsModel
+from ui.extraction_settings_dialog import ExtractionSettingsDialog
+from image_processing import ImageProcessor, Roi, loader
 from calibration import Calibration
 from data_extraction import DataExtraction
 from interpolation import Interpolation
@@ -19,27 +23,88 @@ from point import Point
 class MainWindow(QMainWindow):
     """Main application window class."""
 
+    TASK_LABELS = {'feature_detection': "Feature detection", 'corner_detection': "Corner detection",
+                   'render': "Full-resolution render", 'curve_tracing': "Curve tracing",
+                   'plot_area_detection': "Plot area detection"}
+    # Detections whose results belong to the mode they were started in; switching modes cancels them
+    MODE_TASKS = ('feature_detection', 'corner_detection', 'plot_area_detection', 'curve_tracing')
+
     def __init__(self, parent=None):
         super(MainWindow, self).__init__(parent)
         self.app = QApplication.instance()
         self.image_processor = ImageProcessor()
-        self.calibration = Calibration(self)
-        self.extraction = DataExtraction(self.calibration, self)
-        self.interpolation = Interpolation(self.calibration, self)
+        self.calibration = Calibration()
+        self.extraction = DataExtraction(self.calibration)
+        self.interpolation = Interpolation(self.calibration)
+        self.calibration_controller = CalibrationController(self.calibration, self)
         self.data_exporter = DataExporter()
+        self.task_runner = TaskRunner(self)
+        self.task_runner.progress.connect(self.show_task_progress)
 
         self.calibration_mode = False
         self.extraction_mode = False
         self.interpolation_mode = False
         self.perspective_mode = False
         self.feature_detection_mode = False
+        self.curve_tracing_mode = False
+        self.plot_area_mode = False
 
-        self.original_image = None
         self.undo_stack = []
         self.redo_stack = []
 
         self.initUI()
 
+        self.calibration.add_observer(self.on_core_event)
+        self.extraction.add_observer(self.on_core_event)
+        self.interpolation.add_observer(self.on_core_event)
+
+    def on_core_event(self, event, **payload):
+        """Reflects events raised by the compute core in the view."""
+        if event == 'calibration_changed':
+            self.interpolationAction.setEnabled(True)
+        elif event == 'calibration_cleared':
+            self.image_view.clear_calibration_points()
+        elif event == 'corners_detected':
+            self.image_view.draw_detected_corners(payload['corners'])
+        elif event == 'data_points_changed':
+            self.image_view.draw_data_points(self.extraction.data_points)
+            if self.interpolation_mode:
+                self.interpolation.interpolate_data(self.extraction.data_points)
+            self.show_data_points()
+        elif event == 'detected_points_changed':
+            self.image_view.draw_detected_points(payload['points'])
+        elif event == 'interpolated_points_cleared':
+            self.image_view.clear_interpolated_points()
+
+    def show_task_progress(self, key, stage, step, total):
+        """Shows the current stage of a background pipeline in the status bar."""
+        self.status_bar.showMessage(f"{self.TASK_LABELS[key]}: {stage} ({step}/{total})...")
+
+    def cancel_mode_tasks(self):
+        """Cancels the background detections, so none of them reports into the mode being switched to."""
+        for key in self.MODE_TASKS:
+            self.task_runner.cancel(key)
+
+    def show_task_error(self, message):
+        """Reports a failed background pipeline."""
+        print(f"Background task failed: {message}")
+        self.status_bar.showMessage(f"Processing failed: {message}", 5000)
+
+    def run_feature_detection(self, message, mode_only=False):
+        """Runs automatic point extraction on a background worker and shows the result when it is done."""
+        image, roi = self.image_processor.image, self.image_processor.roi
+
+        def on_finished(points):
+            if mode_only and not self.feature_detection_mode:
+                return
+            self.extraction.set_detected_points(points)
+            self.image_view.set_image(image)
+            self.status_bar.showMessage(message, 5000)
+
+        self.task_runner.submit('feature_detection',
+                                lambda progress, cancel: self.extraction.detect_points(image, progress, cancel, roi),
+                                on_finished, self.show_task_error)
+
     def initUI(self):
         """Initializes the user interface components."""
         self.setWindowTitle('Numericizer')
@@ -154,6 +219,21 @@ class MainWindow(QMainWindow):
         self.automaticCalibrationAction.setEnabled(False)
         self.automaticCalibrationAction.triggered.connect(self.automatic_calibration)
 
+        self.plotAreaAction = QAction('Set &Plot Area', self)
+        self.plotAreaAction.setToolTip('Drag a rectangle around the plot area; detection and extraction only run inside it')
+        self.plotAreaAction.setEnabled(False)
+        self.plotAreaAction.triggered.connect(self.toggle_plot_area_mode)
+
+        self.detectPlotAreaAction = QAction('&Detect Plot Area', self)
+        self.detectPlotAreaAction.setToolTip('Set the plot area from the detected axis frame')
+        self.detectPlotAreaAction.setEnabled(False)
+        self.detectPlotAreaAction.triggered.connect(self.detect_plot_area)
+
+        self.clearPlotAreaAction = QAction('C&lear Plot Area', self)
+        self.clearPlotAreaAction.setToolTip('Process the whole image again')
+        self.clearPlotAreaAction.setEnabled(False)
+        self.clearPlotAreaAction.triggered.connect(lambda: self.set_plot_area(None))
+
         self.extractionAction = QAction(QIcon('icons/extract.png'), '&Extract Data', self)
         self.extractionAction.setToolTip('Extract data points from the image')
         self.extractionAction.setEnabled(False)
@@ -169,6 +249,20 @@ class MainWindow(QMainWindow):
         self.detectedPointsAction.setEnabled(False)
         self.detectedPointsAction.triggered.connect(self.toggle_feature_detection_mode)
 
+        self.extractionSettingsAction = QAction('Point Detection &Settings...', self)
+        self.extractionSettingsAction.setToolTip('Choose the blob extraction backend and filters of automatic point detection')
+        self.extractionSettingsAction.triggered.connect(self.edit_extraction_settings)
+
+        self.curveTracingAction = QAction('&Trace Curve', self)
+        self.curveTracingAction.setToolTip('Click a curve to trace every curve of its color into data points')
+        self.curveTracingAction.setEnabled(False)
+        self.curveTracingAction.triggered.connect(self.toggle_curve_tracing_mode)
+
+        self.traceColorAction = QAction('Trace Curve by &Color...', self)
+        self.traceColorAction.setToolTip('Pick a series color and trace its curves into data points')
+        self.traceColorAction.setEnabled(False)
+        self.traceColorAction.triggered.connect(self.trace_curve_by_color)
+
         self.histogramAction = QAction(QIcon('icons/histogram.png'), '&Equalize Histogram', self)
         self.histogramAction.setToolTip('Apply histogram equalization to the image')
         self.histogramAction.setEnabled(False)
@@ -194,6 +288,18 @@ class MainWindow(QMainWindow):
         self.rotateAction.setEnabled(False)
         self.rotateAction.triggered.connect(self.rotate_image)
 
+        self.previewAction = QAction('&Preview Mode', self)
+        self.previewAction.setToolTip('Try image processing on a fast, downscaled preview; '
+                                      'turning it off applies the steps at full resolution')
+        self.previewAction.setCheckable(True)
+        self.previewAction.setEnabled(False)
+        self.previewAction.triggered.connect(self.toggle_preview_mode)
+
+        self.discardPreviewAction = QAction('&Discard Preview', self)
+        self.discardPreviewAction.setToolTip('Leave preview mode without applying the previewed steps')
+        self.discardPreviewAction.setEnabled(False)
+        self.discardPreviewAction.triggered.connect(self.discard_preview)
+
         self.deletePointAction = QAction('&Delete Data Point', self)
         self.deletePointAction.setToolTip('Delete a selected data point')
         self.deletePointAction.triggered.connect(self.delete_data_point)
@@ -245,9 +351,15 @@ class MainWindow(QMainWindow):
         toolsMenu = menubar.addMenu('&Tools')
         toolsMenu.addAction(self.calibrationAction)
         toolsMenu.addAction(self.automaticCalibrationAction)
+        toolsMenu.addAction(self.plotAreaAction)
+        toolsMenu.addAction(self.detectPlotAreaAction)
+        toolsMenu.addAction(self.clearPlotAreaAction)
         toolsMenu.addAction(self.extractionAction)
         toolsMenu.addAction(self.interpolationAction)
         toolsMenu.addAction(self.detectedPointsAction)
+        toolsMenu.addAction(self.extractionSettingsAction)
+        toolsMenu.addAction(self.curveTracingAction)
+        toolsMenu.addAction(self.traceColorAction)
         toolsMenu.addAction(self.deletePointAction)
         toolsMenu.addAction(self.selectionToolAction)
         toolsMenu.addAction(self.undoAction)
@@ -259,6 +371,9 @@ class MainWindow(QMainWindow):
         imageProcessingMenu.addAction(self.denoiseAction)
         imageProcessingMenu.addAction(self.perspectiveAction)
         imageProcessingMenu.addAction(self.rotateAction)
+        imageProcessingMenu.addSeparator()
+        imageProcessingMenu.addAction(self.previewAction)
+        imageProcessingMenu.addAction(self.discardPreviewAction)
 
         viewMenu = menubar.addMenu('&View')
         viewMenu.addAction(self.plotPointsAction)
@@ -282,6 +397,8 @@ class MainWindow(QMainWindow):
             self.interpolation_mode = False
             self.perspective_mode = False
             self.feature_detection_mode = False
+            self.curve_tracing_mode = False
+            self.cancel_mode_tasks()
             self.image_view.selection_mode = False
 
             self.image_view.clear_selection()
@@ -351,9 +468,16 @@ class MainWindow(QMainWindow):
         interpolationMenu.addAction(piecewiseLinearAction)
 
     def init_data_points_list(self):
-        data_points_list = QListWidget(self)
+        self.data_points_model = DataPointsModel(self)
+        data_points_list = QTableView(self)
+        data_points_list.setModel(self.data_points_model)
         data_points_list.setGeometry(800, 50, 200, 500)
-        data_points_list.itemDoubleClicked.connect(self.edit_data_point)
+        data_points_list.setSortingEnabled(True)
+        data_points_list.sortByColumn(0, Qt.AscendingOrder)
+        data_points_list.setSelectionBehavior(QAbstractItemView.SelectRows)
+        data_points_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        data_points_list.verticalHeader().hide()
+        data_points_list.doubleClicked.connect(self.edit_data_point)
         return data_points_list
 
     def enable_selection_tool(self):
@@ -363,6 +487,9 @@ class MainWindow(QMainWindow):
         self.interpolation_mode = False
         self.perspective_mode = False
         self.feature_detection_mode = False
+        self.curve_tracing_mode = False
+        self.plot_area_mode = False
+        self.cancel_mode_tasks()
         self.image_view.selection_mode = True
         self.setCursor(QCursor(Qt.ArrowCursor))
         self.image_view.clear_selection()
@@ -370,23 +497,46 @@ class MainWindow(QMainWindow):
     def open_image(self):
         """Opens an image file and displays it."""
         options = QFileDialog.Options()
+        patterns = ' '.join(f"*{extension}" for extension in loader.IMAGE_EXTENSIONS)
         file_path, _ = QFileDialog.getOpenFileName(self, "Open Image File", "",
-                                                   "Images (*.png *.xpm *.jpg *.jpeg *.bmp);;All Files (*)",
+                                                   f"Images ({patterns});;All Files (*)",
                                                    options=options)
         if file_path:
-            self.image_processor.load_image(file_path)
-            self.original_image = self.image_processor.image.copy()
+            try:
+                info = loader.probe(file_path)
+            except (ValueError, OSError) as e:
+                QMessageBox.warning(self, "Error", str(e))
+                return
+            page = 0
+            if info.pages > 1:
+                page, ok = QInputDialog.getInt(self, "Select Page",
+                                               f"The file has {info.pages} pages. Page to open:", 1, 1, info.pages)
+                if not ok:
+                    return
+                page -= 1
+            self.task_runner.cancel_all()
+            self.image_processor.load_image(file_path, page)
+            self.calibration.clear_corner_cache()
             self.image_view.set_image(self.image_processor.image)
+            self.image_view.draw_plot_area(None)
 
             self.calibrationAction.setEnabled(True)
             self.automaticCalibrationAction.setEnabled(True)
+            self.plotAreaAction.setEnabled(True)
+            self.detectPlotAreaAction.setEnabled(True)
+            self.clearPlotAreaAction.setEnabled(False)
             self.extractionAction.setEnabled(True)
             self.histogramAction.setEnabled(True)
             self.edgeAction.setEnabled(True)
             self.denoiseAction.setEnabled(True)
+            self.previewAction.setEnabled(True)
+            self.previewAction.setChecked(False)
+            self.discardPreviewAction.setEnabled(False)
             self.perspectiveAction.setEnabled(True)
             self.rotateAction.setEnabled(True)
             self.detectedPointsAction.setEnabled(True)
+            self.curveTracingAction.setEnabled(True)
+            self.traceColorAction.setEnabled(True)
             self.status_bar.showMessage(f"Image {os.path.basename(file_path)} loaded.", 5000)
 
     def set_interpolation_method(self, method):
@@ -404,6 +554,9 @@ class MainWindow(QMainWindow):
         self.interpolation_mode = False
         self.perspective_mode = False
         self.feature_detection_mode = False
+        self.curve_tracing_mode = False
+        self.plot_area_mode = False
+        self.cancel_mode_tasks()
         self.image_view.selection_mode = True
         self.setCursor(QCursor(Qt.ArrowCursor))
         self.image_view.clear_selection()
@@ -419,9 +572,12 @@ class MainWindow(QMainWindow):
         self.image_view.update()
         self.extraction_mode = not self.extraction_mode
         self.feature_detection_mode = False
+        self.cancel_mode_tasks()
         self.calibration_mode = False
         self.interpolation_mode = False
         self.perspective_mode = False
+        self.curve_tracing_mode = False
+        self.plot_area_mode = False
         self.setCursor(QCursor(Qt.CrossCursor if self.extraction_mode else Qt.ArrowCursor))
 
         if self.extraction_mode:
@@ -439,13 +595,128 @@ class MainWindow(QMainWindow):
         self.image_view.update_scene()
         self.image_view.update()
 
+    def toggle_curve_tracing_mode(self):
+        """Toggles the curve tracing mode, in which clicking a curve traces every curve of its color."""
+        if not self.calibration.calibration_done or len(self.calibration.calibration_points) < 4:
+            QMessageBox.warning(self, "Calibration Required",
+                                "Calibration is required before curve tracing. Please calibrate at least 4 points.")
+            return
+
+        self.curve_tracing_mode = not self.curve_tracing_mode
+        self.calibration_mode = False
+        self.extraction_mode = False
+        self.interpolation_mode = False
+        self.perspective_mode = False
+        self.feature_detection_mode = False
+        self.plot_area_mode = False
+        self.cancel_mode_tasks()
+        self.setCursor(QCursor(Qt.CrossCursor if self.curve_tracing_mode else Qt.ArrowCursor))
+        self.image_view.selection_mode = not self.curve_tracing_mode
+        if self.curve_tracing_mode:
+            self.status_bar.showMessage("Curve tracing mode enabled. Click a curve to trace it.", 5000)
+        else:
+            self.status_bar.showMessage("Curve tracing mode disabled.", 5000)
+
+    def trace_curve_by_color(self):
+        """Asks for a series color and traces its curves."""
+        if not self.calibration.calibration_done or len(self.calibration.calibration_points) < 4:
+            QMessageBox.warning(self, "Calibration Required",
+                                "Calibration is required before curve tracing. Please calibrate at least 4 points.")
+            return
+        color = QColorDialog.getColor(Qt.black, self, "Series Color")
+        if color.isValid():
+            self.trace_curves((color.blue(), color.green(), color.red()))
+
+    def trace_curve_at(self, scene_pos):
+        """Traces the curves with the color of the clicked seed pixel."""
+        image = self.image_processor.image
+        self.trace_curves(self.extraction.curve_tracer.seed_color(image, scene_pos.x(), scene_pos.y()))
+
+    def trace_curves(self, color):
+        """Traces the curves of a BGR color on a background worker and adds their points in one step."""
+        image, roi = self.image_processor.image, self.image_processor.roi
+
+        def on_finished(polylines):
+            ids = self.extraction.add_traced_curves(polylines)
+            self.status_bar.showMessage(f"Traced {len(polylines)} curve(s) into {len(ids)} data points.", 5000)
+
+        self.task_runner.submit('curve_tracing',
+                                lambda progress, cancel: self.extraction.trace_curves(image, color, progress, cancel, roi),
+                                on_finished, self.show_task_error)
+
+    def toggle_plot_area_mode(self):
+        """Toggles the plot area mode, in which dragging a rectangle sets the region of interest."""
+        self.plot_area_mode = not self.plot_area_mode
+        self.calibration_mode = False
+        self.extraction_mode = False
+        self.interpolation_mode = False
+        self.perspective_mode = False
+        self.feature_detection_mode = False
+        self.curve_tracing_mode = False
+        self.cancel_mode_tasks()
+        self.setCursor(QCursor(Qt.CrossCursor if self.plot_area_mode else Qt.ArrowCursor))
+        self.image_view.selection_mode = True  # The rubber band draws the plot area
+        if self.plot_area_mode:
+            self.status_bar.showMessage("Drag a rectangle around the plot area.", 5000)
+        else:
+            self.status_bar.showMessage("Plot area mode disabled.", 5000)
+
+    def set_plot_area(self, roi):
+        """Restricts detection, extraction and the filters to a region of interest, or lifts it with None."""
+        self.plot_area_mode = False
+        self.setCursor(QCursor(Qt.ArrowCursor))
+        if self.image_processor.image is None:
+            return
+        if self.task_runner.is_running('render'):
+            self.status_bar.showMessage("The preview is being applied; set the plot area once it is done.", 5000)
+            return
+        try:
+            self.image_processor.set_roi(roi)
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        roi = self.image_processor.roi
+        self.image_view.draw_plot_area(roi)
+        self.clearPlotAreaAction.setEnabled(roi is not None)
+        self.update_image()
+        if roi is None:
+            self.status_bar.showMessage("Plot area cleared; the whole image is processed.", 5000)
+        else:
+            self.status_bar.showMessage(f"Plot area set to {roi.width}x{roi.height} at ({roi.x}, {roi.y}).", 5000)
+
+    def set_plot_area_from_rect(self, rect):
+        """Sets the plot area from a rectangle dragged in scene coordinates."""
+        roi = Roi.from_rect(rect.x(), rect.y(), rect.width(), rect.height(), self.image_processor.image.shape)
+        if roi.width < 2 or roi.height < 2:
+            self.status_bar.showMessage("The plot area is too small; drag a larger rectangle.", 5000)
+            return
+        self.set_plot_area(roi)
+
+    def detect_plot_area(self):
+        """Detects the axis frame on the whole image in the background and makes it the plot area."""
+        if self.image_processor.image is None:
+            self.status_bar.showMessage("Load an image first.", 5000)
+            return
+        image, image_key = self.image_processor.image, self.image_processor.image_key()
+
+        def on_finished(features):
+            corners, lines = features
+            roi = self.calibration.plot_area(corners, image.shape, lines)
+            if roi is None:
+                self.status_bar.showMessage("No axis frame found; draw the plot area instead.", 5000)
+            else:
+                self.set_plot_area(roi)
+
+        self.task_runner.submit('plot_area_detection',
+                                lambda progress, cancel: self.calibration.cached_features(image, image_key,
+                                                                                          progress, cancel),
+                                on_finished, self.show_task_error)
+
     def advanced_feature_detection(self):
         """Performs advanced feature detection on the image."""
         if self.image_processor.image is not None:
             print("Running advanced feature detection...")
-            result_image = self.extraction.automatic_extraction(self.image_processor.image)
-            self.image_view.set_image(result_image)
-            self.status_bar.showMessage("Advanced feature detection completed.", 5000)
+            self.run_feature_detection("Advanced feature detection completed.")
         else:
             print("Load an image first.")
             self.status_bar.showMessage("Load an image first.", 5000)
@@ -462,6 +733,17 @@ class MainWindow(QMainWindow):
         self.image_view.clear_perspective_points()  # Clear the perspective points after correction
         self.status_bar.showMessage("Perspective corrected.", 5000)
 
+    def edit_extraction_settings(self):
+        """Lets the user choose the blob extraction backend and filters, and redetects the points if they are shown."""
+        dialog = ExtractionSettingsDialog(self.extraction, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        self.extraction.set_blob_filters(**dialog.settings())
+        if self.feature_detection_mode and self.image_processor.image is not None:
+            self.run_feature_detection("Points redetected with the new settings.", mode_only=True)
+        else:
+            self.status_bar.showMessage("Point detection settings updated.", 5000)
+
     def toggle_feature_detection_mode(self):
         """Toggles the advanced feature detection mode."""
         if not self.calibration.calibration_done or len(self.calibration.calibration_points) < 4:
@@ -475,15 +757,15 @@ class MainWindow(QMainWindow):
         self.extraction_mode = False
         self.interpolation_mode = False
         self.perspective_mode = False
+        self.curve_tracing_mode = False
+        self.plot_area_mode = False
+        self.cancel_mode_tasks()
         self.setCursor(QCursor(Qt.CrossCursor if self.feature_detection_mode else Qt.ArrowCursor))
 
         if self.feature_detection_mode:
             if self.image_processor.image is not None:
                 print("Running advanced feature detection...")
-                result_image = self.extraction.automatic_extraction(self.image_processor.image)
-                self.image_view.set_image(result_image)
-                self.image_view.draw_detected_points(self.extraction.temp_points)
-                self.status_bar.showMessage("Advanced feature detection enabled.", 5000)
+                self.run_feature_detection("Advanced feature detection enabled.", mode_only=True)
             else:
                 print("Load an image first.")
                 self.status_bar.showMessage("Load an image first.", 5000)
@@ -496,11 +778,7 @@ class MainWindow(QMainWindow):
         self.image_view.selection_mode = not self.feature_detection_mode
     def draw_confidence_intervals(self, x_new, lower_bound, upper_bound):
         """Draws confidence intervals for the interpolated points."""
-        for x, y_low, y_high in zip(x_new, lower_bound, upper_bound):
-            low_point = self.calibration.inverse_transform_point(x, y_low)
-            high_point = self.calibration.inverse_transform_point(x, y_high)
-            self.image_view.scene.addLine(low_point.x(), low_point.y(), high_point.x(), high_point.y(),
-                                          QPen(Qt.red, 0.5))
+        self.image_view.draw_confidence_intervals(x_new, lower_bound, upper_bound)
     def show_error_metric(self, rmse):
         """Displays the RMSE of the interpolation."""
         QMessageBox.information(self, "Interpolation Error", f"Root Mean Squared Error (RMSE): {rmse:.2f}")
@@ -513,6 +791,9 @@ class MainWindow(QMainWindow):
         self.extraction_mode = False
         self.interpolation_mode = False
         self.feature_detection_mode = False
+        self.curve_tracing_mode = False
+        self.plot_area_mode = False
+        self.cancel_mode_tasks()
         self.setCursor(QCursor(Qt.CrossCursor if self.perspective_mode else Qt.ArrowCursor))
         self.update_perspective_info()
         self.image_view.selection_mode = not self.perspective_mode
@@ -545,10 +826,71 @@ class MainWindow(QMainWindow):
 
     def update_image(self):
         """Updates the displayed image."""
-        if self.image_processor.image is not None:
+        if self.image_processor.previewing:
+            self.image_view.set_image(self.image_processor.preview, scale=self.image_processor.preview_scale)
+            self.status_bar.showMessage("Preview updated.", 5000)
+        elif self.image_processor.image is not None:
             self.image_view.set_image(self.image_processor.image)
             self.status_bar.showMessage("Image updated.", 5000)
 
+    def toggle_preview_mode(self):
+        """Starts preview mode, or leaves it by replaying the previewed steps at full resolution."""
+        if self.previewAction.isChecked():
+            # Size the proxy to the viewport in device pixels, with a floor for tiny windows
+            viewport = self.image_view.viewport().size() * self.image_view.devicePixelRatioF()
+            self.image_processor.start_preview(max(viewport.width(), 640), max(viewport.height(), 640))
+            self.discardPreviewAction.setEnabled(True)
+            self.update_image()
+            self.status_bar.showMessage("Preview mode enabled.", 5000)
+        else:
+            self.commit_preview()
+
+    def commit_preview(self):
+        """Replays the previewed steps at full resolution on a background worker.
+
+        The actions that change the steps or the plot area are disabled until the render is done;
+        a step added meanwhile would go to the preview and be lost when the replayed steps are adopted.
+        """
+        operations = self.image_processor.preview_operations()
+        if self.perspective_mode:
+            self.toggle_perspective_mode()
+        if self.plot_area_mode:
+            self.toggle_plot_area_mode()
+        self.set_processing_enabled(False)
+
+        def on_finished(image):
+            self.image_processor.commit_preview(operations, image)
+            self.discardPreviewAction.setEnabled(False)
+            self.set_processing_enabled(True)
+            self.update_image()
+            self.status_bar.showMessage("Preview applied at full resolution.", 5000)
+
+        def on_failed(message):
+            self.previewAction.setChecked(True)  # Still previewing
+            self.set_processing_enabled(True)
+            self.show_task_error(message)
+
+        self.task_runner.submit('render',
+                                lambda progress, cancel: self.image_processor.render(operations, progress, cancel),
+                                on_finished, on_failed)
+
+    def set_processing_enabled(self, enabled):
+        """Enables or disables the actions that change the image processing steps or the plot area."""
+        for action in (self.histogramAction, self.edgeAction, self.denoiseAction, self.perspectiveAction,
+                       self.rotateAction, self.previewAction, self.plotAreaAction, self.detectPlotAreaAction):
+            action.setEnabled(enabled)
+        self.clearPlotAreaAction.setEnabled(enabled and self.image_processor.roi is not None)
+
+    def discard_preview(self):
+        """Leaves preview mode without applying the previewed steps."""
+        self.task_runner.cancel('render')
+        self.set_processing_enabled(True)
+        self.image_processor.stop_preview()
+        self.previewAction.setChecked(False)
+        self.discardPreviewAction.setEnabled(False)
+        self.update_image()
+        self.status_bar.showMessage("Preview discarded.", 5000)
+
     def equalize_histogram(self):
         """Equalizes the histogram of the image."""
         self.image_processor.equalize_histogram()
@@ -573,6 +915,9 @@ class MainWindow(QMainWindow):
         self.interpolation_mode = False
         self.perspective_mode = False
         self.feature_detection_mode = False
+        self.curve_tracing_mode = False
+        self.plot_area_mode = False
+        self.cancel_mode_tasks()
         self.setCursor(QCursor(Qt.CrossCursor if self.calibration_mode else Qt.ArrowCursor))
         self.image_view.selection_mode = not self.calibration_mode
         if self.calibration_mode:
@@ -590,7 +935,10 @@ class MainWindow(QMainWindow):
         self.calibration_mode = False
         self.extraction_mode = False
         self.feature_detection_mode = False
+        self.cancel_mode_tasks()
         self.perspective_mode = False
+        self.curve_tracing_mode = False
+        self.plot_area_mode = False
 
         if self.interpolation_mode:
             if len(self.extraction.data_points) >= 2:
@@ -627,11 +975,11 @@ class MainWindow(QMainWindow):
             return
 
         if self.interpolation_mode:
-            real_coordinates = [point.get_real_coordinates() for point in self.interpolation.interpolated_points]
+            real_coordinates = self.interpolation.interpolated_points.real_coordinates
         else:
-            real_coordinates = [point.get_real_coordinates() for point in self.extraction.data_points]
+            real_coordinates = self.extraction.data_points.real_coordinates
 
-        if real_coordinates:
+        if len(real_coordinates):
             options = QFileDialog.Options()
             filepath, _ = QFileDialog.getSaveFileName(self, "Save Data", "", "CSV Files (*.csv);;All Files (*)",
                                                       options=options)
@@ -646,11 +994,11 @@ class MainWindow(QMainWindow):
             return
 
         if self.interpolation_mode:
-            real_coordinates = [point.get_real_coordinates() for point in self.interpolation.interpolated_points]
+            real_coordinates = self.interpolation.interpolated_points.real_coordinates
         else:
-            real_coordinates = [point.get_real_coordinates() for point in self.extraction.data_points]
+            real_coordinates = self.extraction.data_points.real_coordinates
 
-        if real_coordinates:
+        if len(real_coordinates):
             options = QFileDialog.Options()
             filepath, _ = QFileDialog.getSaveFileName(self, "Save Data", "", "JSON Files (*.json);;All Files (*)",
                                                       options=options)
@@ -663,37 +1011,29 @@ class MainWindow(QMainWindow):
         """Performs automatic calibration of the image."""
         if self.image_processor.image is not None:
             print("Running automatic calibration...")
-            self.calibration.automatic_calibration(self.image_processor.image)
-            self.status_bar.showMessage("Automatic calibration completed.", 5000)
+            image, image_key = self.image_processor.image, self.image_processor.image_key()
+            roi = self.image_processor.roi
+
+            def on_finished(features):
+                if self.image_processor.image is not image:
+                    return  # The image changed while the corners were being detected
+                corners, lines = features
+                self.calibration.set_detected_corners(corners)
+                self.calibration_controller.calibrate_from_corners(corners, image.shape, lines)
+                self.status_bar.showMessage("Automatic calibration completed.", 5000)
+
+            self.task_runner.submit('corner_detection',
+                                    lambda progress, cancel: self.calibration.cached_features(image, image_key,
+                                                                                              progress, cancel, roi),
+                                    on_finished, self.show_task_error)
         else:
             print("Load an image first.")
             self.status_bar.showMessage("Load an image first.", 5000)
 
     def show_data_points(self):
-        """Displays the list of data points."""
-        self.data_points_list.clear()
-        data_points = self.extraction.get_data_points()
-        interpolated_points = self.interpolation.interpolated_points if self.interpolation_mode else []
-
-        for i, point in enumerate(data_points):
-            real_coords = point.get_real_coordinates()
-            if real_coords is not None:
-                coord_str = f"({real_coords.x():.2f}, {real_coords.y():.2f})"
-            else:
-                coord_str = "(None)"
-            item = QListWidgetItem(f"Data Point {i + 1}: {coord_str}")
-            item.setData(Qt.UserRole, point)  # Store the Point instance
-            self.data_points_list.addItem(item)
-
-        for i, point in enumerate(interpolated_points):
-            real_coords = point.get_real_coordinates()
-            if real_coords is not None:
-                coord_str = f"({real_coords.x():.2f}, {real_coords.y():.2f})"
-            else:
-                coord_str = "(None)"
-            item = QListWidgetItem(f"Interpolated Point {i + 1}: {coord_str}")
-            item.setData(Qt.UserRole, point)  # Store the Point instance
-            self.data_points_list.addItem(item)
+        """Updates the data point table; only the rows that changed since the last call are touched."""
+        interpolated_points = self.interpolation.interpolated_points if self.interpolation_mode else None
+        self.data_points_model.set_point_sets(self.extraction.get_data_points(), interpolated_points)
     def edit_data_point(self, item):
         """Edits the selected data point."""
 
@@ -706,8 +1046,8 @@ class MainWindow(QMainWindow):
                 # Update real coordinates
                 new_real_coords = QPointF(x, y)
                 # Convert new real coordinates to image coordinates
-                new_image_coords = self.calibration.inverse_transform_point(x, y)
-                point.set_image_coordinates(new_image_coords)
+                image_x, image_y = self.calibration.real_to_image_array([[x, y]])[0]
+                point.set_image_coordinates(QPointF(image_x, image_y))
                 point.set_real_coordinates(new_real_coords)
                 self.image_view.update_scene()
                 self.show_data_points()
@@ -725,8 +1065,8 @@ class MainWindow(QMainWindow):
                 # Update real coordinates
                 new_real_coords = QPointF(x, y)
                 # Convert new real coordinates to image coordinates
-                new_image_coords = self.calibration.inverse_transform_point(x, y)
-                point.set_image_coordinates(new_image_coords)
+                image_x, image_y = self.calibration.real_to_image_array([[x, y]])[0]
+                point.set_image_coordinates(QPointF(image_x, image_y))
                 point.set_real_coordinates(new_real_coords)
                 self.image_view.update_scene()
                 self.show_data_points()
@@ -735,26 +1075,19 @@ class MainWindow(QMainWindow):
             else:
                 QMessageBox.warning(self, "Invalid Selection", "Cannot edit an interpolated point.")
     def delete_data_point(self, item=None):
-        """Deletes a selected data point or multiple selected data points."""
-        if item:
-            point = item.data(0)
-            if point in self.extraction.data_points:
-                self.extraction.data_points.remove(point)
-            elif point in self.interpolation.interpolated_points:
-                self.interpolation.interpolated_points.remove(point)
-            self.image_view.delete_highlight(point)
-        else:
-            items = self.image_view.selected_items
-            for item in items:
-                point = item.data(0)
-                if point in self.extraction.data_points:
-                    self.extraction.data_points.remove(point)
-                elif point in self.interpolation.interpolated_points:
-                    self.interpolation.interpolated_points.remove(point)
-                self.image_view.delete_highlight(point)
+        """Deletes a selected data point or multiple selected data points.
+
+        The points are deleted by id, one compaction per point set, so bulk deletes stay linear.
+        """
+        items = [item] if item else self.image_view.selected_items
+        points = [item.data(0) for item in items if isinstance(item.data(0), Point)]
+        self.image_view.delete_highlights(points)
+        data_points, interpolated_points = self.extraction.data_points, self.interpolation.interpolated_points
+        self.extraction.delete_data_points([point.point_id for point in points if point.point_set is data_points])
+        interpolated_points.delete_ids([point.point_id for point in points if point.point_set is interpolated_points])
         self.image_view.clear_selection()
         self.show_data_points()
-        self.update_image()
+        self.image_view.update_scene()
         self.status_bar.showMessage("Data point(s) deleted.", 5000)
 
 
@@ -784,7 +1117,10 @@ class MainWindow(QMainWindow):
             self.edit_data_point(item)
         elif action == "delete_data_point":
             self.redo_stack.append((action, item, point))
-            self.extraction.data_points.append(point)
+            image_coords = point.get_image_coordinates()
+            real_coords = point.get_real_coordinates()
+            self.extraction.data_points.append((image_coords.x(), image_coords.y()),
+                                               (real_coords.x(), real_coords.y()))
             self.show_data_points()
             self.update_image()
 
@@ -804,11 +1140,13 @@ class MainWindow(QMainWindow):
 
     def reset_application(self):
         """Resets the application to its initial state."""
+        self.task_runner.cancel_all()
+
         # Clear calibration points
         self.calibration.clear_calibration_points()
 
         # Clear data points
-        self.extraction.data_points = []
+        self.extraction.clear_data_points()
 
 
         #temporary points
@@ -819,7 +1157,9 @@ class MainWindow(QMainWindow):
         self.interpolation.clear_interpolated_points()
 
         #image
-        self.image_processor.image = None
+        self.image_processor.clear()
+        self.calibration.clear_corner_cache()
+        self.image_view.draw_plot_area(None)
 
 
         # Reset UI
@@ -829,6 +1169,9 @@ class MainWindow(QMainWindow):
         # Disable actions
         self.calibrationAction.setEnabled(False)
         self.automaticCalibrationAction.setEnabled(False)
+        self.plotAreaAction.setEnabled(False)
+        self.detectPlotAreaAction.setEnabled(False)
+        self.clearPlotAreaAction.setEnabled(False)
         self.extractionAction.setEnabled(False)
         self.histogramAction.setEnabled(False)
         self.edgeAction.setEnabled(False)
@@ -836,5 +1179,10 @@ class MainWindow(QMainWindow):
         self.perspectiveAction.setEnabled(False)
         self.rotateAction.setEnabled(False)
         self.detectedPointsAction.setEnabled(False)
+        self.curveTracingAction.setEnabled(False)
+        self.traceColorAction.setEnabled(False)
+        self.previewAction.setEnabled(False)
+        self.previewAction.setChecked(False)
+        self.discardPreviewAction.setEnabled(False)
 
         self.status_bar.showMessage("Application reset to initial state.", 5000)
\ No newline at end of file
@@ -2,6 +2,7 @@ from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QCom
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
+import numpy as np
 
 
 class PlotWindow(QDialog):
@@ -54,9 +55,10 @@ class PlotWindow(QDialog):
         ax = self.canvas.figure.subplots()
         ax.clear()
 
-        valid_data_points = [point for point in self.data_points if point.get_real_coordinates() is not None]
-        x_coords = [point.get_real_coordinates().x() for point in valid_data_points]
-        y_coords = [point.get_real_coordinates().y() for point in valid_data_points]
+        real_coordinates = self.data_points.real_coordinates
+        valid_data_points = real_coordinates[~np.isnan(real_coordinates).any(axis=1)]
+        x_coords = valid_data_points[:, 0]
+        y_coords = valid_data_points[:, 1]
 
         graph_type = self.graph_type_combo.currentText()
         if graph_type == "Scatter":
@@ -67,10 +69,10 @@ class PlotWindow(QDialog):
             ax.bar(x_coords, y_coords, color='blue', label='Data Points')
 
         if self.interpolated_points:
-            valid_interpolated_points = [point for point in self.interpolated_points if
-                                         point.get_real_coordinates() is not None]
-            x_interp_coords = [point.get_real_coordinates().x() for point in valid_interpolated_points]
-            y_interp_coords = [point.get_real_coordinates().y() for point in valid_interpolated_points]
+            real_coordinates = self.interpolated_points.real_coordinates
+            valid_interpolated_points = real_coordinates[~np.isnan(real_coordinates).any(axis=1)]
+            x_interp_coords = valid_interpolated_points[:, 0]
+            y_interp_coords = valid_interpolated_points[:, 1]
             if graph_type == "Scatter":
                 ax.scatter(x_interp_coords, y_interp_coords, c='red', label='Interpolated Points')
             elif graph_type == "Line":
@@ -91,6 +93,5 @@ class PlotWindow(QDialog):
         except ValueError:
             return  # Invalid input, ignore
 
-        filtered_data_points = [point for point in self.data_points if point.get_real_coordinates().y() > filter_value]
-        self.data_points = filtered_data_points
+        self.data_points = self.data_points[self.data_points.real_coordinates[:, 1] > filter_value]
         self.plot_data()
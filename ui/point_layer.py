@@ -0,0 +1,110 @@
+from PyQt5.QtWidgets import QGraphicsEllipseItem, QGraphicsTextItem
+from PyQt5.QtGui import QBrush, QFont
+import numpy as np
+from point import Point
+
+
+class PointLayer:
+    """Retained graphics items for one group of points, keyed so that an update only touches what changed.
+
+    Every point owns one ellipse centred on its position. Syncing the layer against new keys and
+    coordinates removes the items of vanished keys, moves the items whose coordinates changed and
+    creates items only for new keys, instead of rebuilding the whole layer.
+    """
+
+    def __init__(self, scene, radius, pen, brush=None, z_value=0, labels=False):
+        self.scene = scene
+        self.radius = radius
+        self.pen = pen
+        self.brush = brush if brush is not None else QBrush()
+        self.z_value = z_value
+        self.labels = labels  # Number each point with its key + 1
+        self.items = {}
+        self.keys = np.empty(0, dtype=np.int64)
+        self.coordinates = np.empty((0, 2))
+        self.source = None
+        self.version = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def sync_point_set(self, point_set):
+        """Syncs the layer with a PointSet keyed by point id; does nothing if the set has not changed."""
+        if point_set is self.source and point_set.version == self.version:
+            return
+        if point_set is not self.source:
+            self.clear()  # The same id in another set is a different point
+        self.sync(point_set.ids, point_set.image_coordinates, point_set)
+        self.source = point_set
+        self.version = point_set.version
+
+    def sync_points(self, points):
+        """Syncs the layer with a sequence of Point or QPointF objects keyed by their position in the sequence.
+
+        The rows of Point views are looked up in bulk, one binary search per point set; views of
+        points that were removed from their set are left out.
+        """
+        coordinates = np.empty((len(points), 2))
+        keep = np.ones(len(points), dtype=bool)
+        views = {}  # id(point set) -> (point set, positions, point ids)
+        for position, point in enumerate(points):
+            if isinstance(point, Point):
+                group = views.setdefault(id(point.point_set), (point.point_set, [], []))
+                group[1].append(position)
+                group[2].append(point.point_id)
+            else:
+                coordinates[position] = point.x(), point.y()
+        for point_set, positions, point_ids in views.values():
+            rows, found = point_set.find_ids(point_ids)
+            positions = np.asarray(positions)
+            coordinates[positions[found]] = point_set.image_coordinates[rows[found]]
+            keep[positions[~found]] = False
+        self.sync(np.flatnonzero(keep), coordinates[keep])
+
+    def sync(self, keys, coordinates, point_set=None):
+        """Syncs the layer with an (N,) array of keys and an (N, 2) array of image coordinates."""
+        keys = np.asarray(keys, dtype=np.int64)
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+
+        for key in self.keys[~np.isin(self.keys, keys)].tolist():
+            self.scene.removeItem(self.items.pop(key))
+
+        _, old_rows, new_rows = np.intersect1d(self.keys, keys, assume_unique=True, return_indices=True)
+        moved = new_rows[(self.coordinates[old_rows] != coordinates[new_rows]).any(axis=1)]
+        for row in moved.tolist():
+            self.items[int(keys[row])].setPos(*coordinates[row])
+
+        for row in np.flatnonzero(~np.isin(keys, self.keys)).tolist():
+            key = int(keys[row])
+            self.items[key] = self.create_item(key, coordinates[row], point_set)
+
+        self.keys = keys.copy()
+        self.coordinates = coordinates.copy()
+
+    def create_item(self, key, coordinates, point_set):
+        """Creates and adds the ellipse for one point."""
+        radius = self.radius
+        item = QGraphicsEllipseItem(-radius, -radius, 2 * radius, 2 * radius)
+        item.setPen(self.pen)
+        item.setBrush(self.brush)
+        item.setZValue(self.z_value)
+        item.setPos(*coordinates)
+        if point_set is not None:
+            item.setData(0, Point.view(point_set, key))
+        if self.labels:
+            text = QGraphicsTextItem(str(key + 1), item)
+            text.setFont(QFont('Arial', 10))
+            text.setDefaultTextColor(self.pen.color())
+            text.setPos(5, -10)
+        self.scene.addItem(item)
+        return item
+
+    def clear(self):
+        """Removes every item of the layer from the scene."""
+        for item in self.items.values():
+            self.scene.removeItem(item)
+        self.items = {}
+        self.keys = np.empty(0, dtype=np.int64)
+        self.coordinates = np.empty((0, 2))
+        self.source = None
+        self.version = None
@@ -0,0 +1,100 @@
+from concurrent.futures import CancelledError
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TaskSignals(QObject):
+    """Signals emitted by a background task; they are delivered on the GUI thread."""
+    progress = pyqtSignal(str, int, int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Task(QRunnable):
+    """Runs ``function(progress=..., cancel=...)`` on a pool thread."""
+
+    def __init__(self, function):
+        super().__init__()
+        self.function = function
+        self.cancel_event = threading.Event()
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.function(progress=self.signals.progress.emit, cancel=self.cancel_event)
+        except CancelledError:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            if self.cancel_event.is_set():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.finished.emit(result)
+
+
+class TaskRunner(QObject):
+    """Runs compute pipelines off the GUI thread, one job per key.
+
+    Submitting a job while another with the same key is running cancels the running one and
+    queues the new one; a later submission replaces the queued job, so repeated triggers
+    coalesce into at most one running and one pending job per key.
+    """
+    progress = pyqtSignal(str, str, int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.thread_pool = QThreadPool.globalInstance()
+        self.running = {}
+        self.pending = {}
+
+    def submit(self, key, function, on_finished, on_failed=None):
+        """Schedules ``function`` to run in the background and calls ``on_finished(result)`` on the GUI thread."""
+        if key in self.running:
+            self.running[key][0].cancel_event.set()
+            self.pending[key] = (function, on_finished, on_failed)
+        else:
+            self._start(key, function, on_finished, on_failed)
+
+    def cancel(self, key):
+        """Cancels the running and pending jobs for a key."""
+        self.pending.pop(key, None)
+        if key in self.running:
+            self.running[key][0].cancel_event.set()
+
+    def cancel_all(self):
+        """Cancels every running and pending job."""
+        for key in list(self.running) + list(self.pending):
+            self.cancel(key)
+
+    def is_running(self, key):
+        return key in self.running
+
+    def _start(self, key, function, on_finished, on_failed):
+        task = Task(function)
+        task.signals.progress.connect(lambda stage, step, total: self._progress(key, task, stage, step, total))
+        task.signals.finished.connect(lambda result: self._done(key, task, on_finished, result))
+        task.signals.failed.connect(lambda message: self._done(key, task, on_failed, message))
+        task.signals.cancelled.connect(lambda: self._done(key, task, None, None))
+        self.running[key] = (task, on_finished, on_failed)
+        self.thread_pool.start(task)
+
+    def _is_current(self, key, task):
+        """Whether a task is the live job of its key: running, and neither replaced nor cancelled."""
+        return key in self.running and self.running[key][0] is task and not task.cancel_event.is_set()
+
+    def _progress(self, key, task, stage, step, total):
+        """Forwards the progress of the live job of a key; stale and cancelled tasks stay silent."""
+        if self._is_current(key, task):
+            self.progress.emit(key, stage, step, total)
+
+    def _done(self, key, task, callback, value):
+        """Finishes a task on the GUI thread; a task cancelled after its result was queued gets no callback."""
+        if key not in self.running or self.running[key][0] is not task:
+            return
+        self.running.pop(key)
+        if key in self.pending:
+            self._start(key, *self.pending.pop(key))
+        elif callback is not None and not task.cancel_event.is_set():
+            callback(value)
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+import math
+from PyQt5.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem
+from PyQt5.QtGui import QPixmap, QPainter
+from PyQt5.QtCore import QRectF
+import cv2
+from ui.image_bridge import ImageBridge
+
+
+class TiledImageItem(QGraphicsItem):
+    """Draws a NumPy image from a lazily built tile pyramid instead of one full-resolution pixmap.
+
+    Level ``k`` of the pyramid is the image downsampled by ``2 ** k`` and cut into fixed-size
+    tiles. Only the tiles that intersect the exposed area at the level matching the current zoom
+    are built, on first paint, and kept in an LRU cache of at most ``max_tiles`` pixmaps.
+    """
+    TILE_SIZE = 256
+
+    def __init__(self, max_tiles=512, parent=None):
+        super().__init__(parent)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.image = None
+        self.width = 0
+        self.height = 0
+        self.max_level = 0
+        self.max_tiles = max_tiles
+        self.bridge = ImageBridge()
+        self.tiles = OrderedDict()  # (level, column, row) -> QPixmap, least recently used first
+
+    def set_image(self, image, changed_rect=None):
+        """Shows a new image; with ``changed_rect`` (x, y, width, height) only the tiles it covers are rebuilt."""
+        if image.ndim not in (2, 3):
+            raise ValueError("Unsupported image format")
+        height, width = image.shape[:2]
+        resized = (width, height) != (self.width, self.height)
+        if resized:
+            self.prepareGeometryChange()
+            self.width, self.height = width, height
+            largest = max(width, height)
+            self.max_level = max(0, math.ceil(math.log2(largest / self.TILE_SIZE))) if largest else 0
+        self.image = image
+        if resized or changed_rect is None:
+            self.tiles.clear()
+            self.update()
+        else:
+            self.invalidate(changed_rect)
+
+    def invalidate(self, rect):
+        """Drops the cached tiles of every level that overlap an (x, y, width, height) image region."""
+        x, y, width, height = rect
+        for key in list(self.tiles):
+            left, top, right, bottom = self.tile_bounds(*key)
+            if left < x + width and x < right and top < y + height and y < bottom:
+                del self.tiles[key]
+        self.update(QRectF(x, y, width, height))
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.width, self.height)
+
+    def level_for_scale(self, scale):
+        """Returns the coarsest level that still has at least one image pixel per screen pixel."""
+        if scale <= 0 or scale >= 1:
+            return 0
+        return min(int(math.floor(math.log2(1 / scale))), self.max_level)
+
+    def tile_bounds(self, level, column, row):
+        """Returns the (left, top, right, bottom) full-resolution pixels covered by a tile."""
+        span = self.TILE_SIZE << level
+        left, top = column * span, row * span
+        return left, top, min(left + span, self.width), min(top + span, self.height)
+
+    def paint(self, painter, option, widget=None):
+        if self.image is None:
+            return
+        level = self.level_for_scale(QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()))
+        span = self.TILE_SIZE << level
+        exposed = option.exposedRect.intersected(self.boundingRect())
+        first_column, first_row = int(exposed.left()) // span, int(exposed.top()) // span
+        last_column = min(int(math.ceil(exposed.right())) // span, (self.width - 1) // span)
+        last_row = min(int(math.ceil(exposed.bottom())) // span, (self.height - 1) // span)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, level > 0)
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                left, top, right, bottom = self.tile_bounds(level, column, row)
+                pixmap = self.tile(level, column, row)
+                painter.drawPixmap(QRectF(left, top, right - left, bottom - top), pixmap, QRectF(pixmap.rect()))
+
+    def tile(self, level, column, row):
+        """Returns a tile pixmap from the cache, building it on a miss."""
+        key = (level, column, row)
+        pixmap = self.tiles.get(key)
+        if pixmap is not None:
+            self.tiles.move_to_end(key)
+            return pixmap
+        pixmap = self.build_tile(level, column, row)
+        self.tiles[key] = pixmap
+        while len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+        return pixmap
+
+    def build_tile(self, level, column, row):
+        """Cuts a tile out of the image, downsampling it to its level."""
+        left, top, right, bottom = self.tile_bounds(level, column, row)
+        region = self.image[top:bottom, left:right]
+        if level:
+            size = (max(1, -(-(right - left) >> level)), max(1, -(-(bottom - top) >> level)))
+            region = cv2.resize(region, size, interpolation=cv2.INTER_AREA)
+        return self.to_pixmap(region)
+
+    def to_pixmap(self, region):
+        """Converts a BGR or grayscale array region to a QPixmap through the persistent bridge buffers."""
+        return QPixmap.fromImage(self.bridge.to_qimage(region))
+
+    def region_pixmap(self, rect):
+        """Returns a full-resolution pixmap of a QRect of the image, clipped to its bounds."""
+        rect = rect.intersected(self.boundingRect().toRect())
+        if self.image is None or rect.isEmpty():
+            return QPixmap()
+        region = self.image[rect.top():rect.bottom() + 1, rect.left():rect.right() + 1]
+        return self.to_pixmap(region)